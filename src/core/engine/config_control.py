@@ -11,6 +11,7 @@ from src.core.errors import (
     ValidateSchemaError, ConfigNotFound, ValidateTypeError
 )
 from src.core.utils import path_join, merge_dicts, import_string
+from src.core.utils.path_parser import defaultCrawler
 from src.core.io import parse_config, load_dotenv
 from src.core.io.database import postgresql
 from src.core.io.storage import local
@@ -186,13 +187,14 @@ class ConfigParser:
         """Get config enhance function base on `parse_config`"""
         sub_path: str = f'{module}/' if module else ''
         conf: dict = {}
-        for path_object in Path(ConfigParser.CONF_PATH).glob(f'{sub_path}{prefix}*{suffix}.yaml'):
-            if path_object.is_file() and path_object.stat().st_size != 0:
-                catalog_data: Dict[str, Any] = parse_config(str(path_object), encoding=encoding)
-                if not conf_name:
-                    conf: dict = merge_dicts(conf, catalog_data)
-                elif conf_name in catalog_data:
-                    return catalog_data[conf_name]
+        for path in defaultCrawler.glob(
+                os.path.join(ConfigParser.CONF_PATH, f'{sub_path}{prefix}*{suffix}.yaml'), non_empty=True
+        ):
+            catalog_data: Dict[str, Any] = parse_config(path, encoding=encoding)
+            if not conf_name:
+                conf: dict = merge_dicts(conf, catalog_data)
+            elif conf_name in catalog_data:
+                return catalog_data[conf_name]
         return conf
 
 
@@ -252,7 +254,8 @@ class ConfigDefaultMapping(ConfigMapping):
     CONF_SUB_PATH: ClassVar[str] = 'defaults'
     CLASS_VALIDATE: List[object] = [
         postgresql.PostgresTable,
-        local.LocalCSVFile
+        local.LocalCSVFile,
+        local.LocalParquetFile
     ]
 
 
@@ -260,5 +263,6 @@ class ConfigDefaultConvert(ConfigConvert):
     CONF_SUB_PATH: ClassVar[str] = 'defaults'
     CLASS_VALIDATE: List[object] = [
         postgresql.PostgresTable,
-        local.LocalCSVFile
+        local.LocalCSVFile,
+        local.LocalParquetFile
     ]
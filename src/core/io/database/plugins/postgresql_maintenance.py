@@ -0,0 +1,307 @@
+import time
+import queue
+import logging
+from typing import Dict, Any, Optional, List, Set
+import pandas as pd
+from psycopg.sql import SQL
+from src.core.utils.threader import ThreadWithControl
+from .postgresql_plugin import PostgresConn, PostgresPool, capture_error
+
+logger = logging.getLogger(__name__)
+
+
+def _error_message(err: Exception) -> str:
+    return f"{type(err).__module__.removesuffix('.errors')}:{type(err).__name__}: {str(err).rstrip()}"
+
+
+class MaterializedViewRefresher(PostgresConn):
+    """
+    Refresh materialized views with dependency order from `pg_depend`. The materialized view
+    will refresh when all materialized views that it depends on, directly or through normal
+    views, were refreshed, so independent materialized views refresh in parallel on pooled
+    connections. The `concurrently` option will use when materialized view has unique index.
+    usage:
+        >> refresher = MaterializedViewRefresher(db_conn, schemas=['ai'])
+        >> refresher.refresh()
+        {'ai.vw_ai_opt_forecast_mch3': {'status': 'success', 'concurrently': True, 'duration': 1.25}, ...}
+    """
+
+    def __init__(
+            self,
+            db_conn: Dict[str, Any],
+            views: Optional[List[str]] = None,
+            schemas: Optional[List[str]] = None,
+            pool_size: int = 4
+    ):
+        super(MaterializedViewRefresher, self).__init__(db_conn)
+        self.mv_schemas: List[str] = schemas or ['public']
+        self.mv_properties: Dict[str, Dict[str, Any]] = self._properties(views)
+        self.mv_pool_size: int = pool_size
+        self.mv_results: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def views(self) -> List[str]:
+        return list(self.mv_properties.keys())
+
+    @property
+    def results(self) -> Dict[str, Dict[str, Any]]:
+        return self.mv_results
+
+    def _properties(self, views: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        { <schema-name>.<materialized-view-name>: {
+            populated: bool : [True, False],
+            concurrently: bool : [True, False]
+            }
+        }
+        """
+        _condition: str = (
+            f"""concat(mv.schemaname, '.', mv.matviewname) in ({", ".join(f"'{_}'" for _ in views)})""" if views
+            else f"""mv.schemaname in ({", ".join(f"'{_}'" for _ in self.mv_schemas)})"""
+        )
+        return {
+            _property.pop('view_name'): _property
+            for _property in self.query(
+                f"""select  concat(mv.schemaname, '.', mv.matviewname)                  as view_name
+                ,       mv.ispopulated                                              as populated
+                ,       mv.ispopulated and exists(
+                            select from pg_index as i
+                            where i.indrelid = format('%I.%I', mv.schemaname, mv.matviewname)::regclass
+                            and i.indisunique and i.indpred is null and i.indexprs is null
+                        )                                                           as concurrently
+                from    pg_matviews                                                 as mv
+                where   {_condition}"""
+            ).to_dict('records')
+        }
+
+    def dependencies(self) -> Dict[str, Set[str]]:
+        """
+        Dependency of materialized views from rewrite rules in `pg_depend`, the dependency
+        through normal views will follow until it meets materialized view
+        :return:
+        { <schema-name>.<materialized-view-name>: {<schema-name>.<materialized-view-name>, ...} }
+        """
+        _edges: Dict[str, Set[str]] = {}
+        _kinds: Dict[str, str] = {}
+        for _edge in self.query(
+                """select  distinct
+                        concat(dn.nspname, '.', dc.relname)         as view_name
+                ,       dc.relkind::text                            as view_kind
+                ,       concat(sn.nspname, '.', sc.relname)         as depend_name
+                ,       sc.relkind::text                            as depend_kind
+                from    pg_depend                                   as d
+                join    pg_rewrite                                  as r    on r.oid = d.objid
+                join    pg_class                                    as dc   on dc.oid = r.ev_class
+                join    pg_namespace                                as dn   on dn.oid = dc.relnamespace
+                join    pg_class                                    as sc   on sc.oid = d.refobjid
+                join    pg_namespace                                as sn   on sn.oid = sc.relnamespace
+                where   d.classid = 'pg_rewrite'::regclass
+                and     d.refclassid = 'pg_class'::regclass
+                and     dc.relkind in ('m', 'v') and sc.relkind in ('m', 'v')
+                and     dc.oid <> sc.oid""",
+                result_type='list'
+        ):
+            view_name, view_kind, depend_name, depend_kind = _edge
+            _edges.setdefault(view_name, set()).add(depend_name)
+            _kinds[view_name], _kinds[depend_name] = view_kind, depend_kind
+
+        def _walk(_name: str, _seen: Set[str]) -> Set[str]:
+            _depends: Set[str] = set()
+            for _depend in _edges.get(_name, set()) - _seen:
+                _seen.add(_depend)
+                if _kinds.get(_depend) == 'm':
+                    _depends.add(_depend)
+                else:
+                    _depends |= _walk(_depend, _seen)
+            return _depends
+
+        return {view: _walk(view, {view}) & set(self.views) for view in self.views}
+
+    def _refresh(self, pool: PostgresPool, view_name: str, done: queue.Queue) -> None:
+        concurrently: bool = self.mv_properties[view_name]['concurrently']
+        result: Dict[str, Any] = {'status': 'success', 'concurrently': concurrently}
+        start: float = time.perf_counter()
+        try:
+            with pool.connection() as conn:
+                conn.execute(SQL(
+                    f"refresh materialized view {('concurrently ' if concurrently else '')}{view_name}"
+                ))
+        except Exception as err:
+            result.update({'status': 'failed', 'error': _error_message(err)})
+        finally:
+            result['duration'] = round(time.perf_counter() - start, 3)
+            done.put((view_name, result))
+
+    def refresh(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Refresh all materialized views, the materialized view that depends on failed
+        materialized view will be skipped
+        """
+        pending: Dict[str, Set[str]] = self.dependencies()
+        done: queue.Queue = queue.Queue()
+        failed: Set[str] = set()
+        running: int = 0
+        self.mv_results: Dict[str, Dict[str, Any]] = {}
+        with PostgresPool(self.db_conn, pool_size=self.mv_pool_size) as pool:
+            while pending or running:
+                for view_name in [_ for _, depends in pending.items() if not depends]:
+                    pending.pop(view_name)
+                    _thread = ThreadWithControl(target=self._refresh, args=(pool, view_name, done))
+                    _thread.daemon = True
+                    _thread.start()
+                    running += 1
+                if not running:
+                    for view_name in pending:
+                        self.mv_results[view_name] = {'status': 'skipped', 'error': 'circular dependency'}
+                    break
+                view_name, result = done.get()
+                running -= 1
+                self.mv_results[view_name] = result
+                logger.info(f"Refresh materialized view {view_name!r}: {result['status']} ({result['duration']} sec)")
+                if result['status'] != 'success':
+                    failed.add(view_name)
+                while skipped := [_ for _, depends in pending.items() if depends & failed]:
+                    for _view_name in skipped:
+                        pending.pop(_view_name)
+                        failed.add(_view_name)
+                        self.mv_results[_view_name] = {'status': 'skipped', 'error': f'depends on {view_name!r}'}
+                for depends in pending.values():
+                    depends.discard(view_name)
+        return self.mv_results
+
+
+class TableMaintainer(PostgresConn):
+    """
+    Schedule `analyze` and `vacuum` after bulk load for tables that were touched in a run
+    from statistics in `pg_stat_user_tables`, so query plans do not wait for autovacuum.
+    The table is analyzed when rows that modified since last analyze are over `analyze_ratio`
+    of live rows, and vacuumed with analyze when dead rows are over `vacuum_ratio`. The worst
+    tables run first on `pool_size` pooled connections and only `limit` tables run per call.
+    usage:
+        >> maintainer = TableMaintainer(db_conn, tables=['public.customer', 'ai.order_transaction'])
+        >> maintainer.plan()
+        [{'table_name': 'public.customer', 'action': 'vacuum analyze', 'score': 0.85, ...}]
+        >> maintainer.run()
+        {'public.customer': {'action': 'vacuum analyze', 'status': 'success', 'duration': 2.31, ...}}
+    """
+
+    def __init__(
+            self,
+            db_conn: Dict[str, Any],
+            tables: List[str],
+            pool_size: int = 2,
+            analyze_ratio: float = 0.1,
+            vacuum_ratio: float = 0.2,
+            min_rows: int = 1000,
+            limit: Optional[int] = None
+    ):
+        super(TableMaintainer, self).__init__(db_conn)
+        self.mt_tables: List[str] = [(_ if '.' in _ else f'public.{_}') for _ in tables]
+        self.mt_pool_size: int = pool_size
+        self.mt_analyze_ratio: float = analyze_ratio
+        self.mt_vacuum_ratio: float = vacuum_ratio
+        self.mt_min_rows: int = min_rows
+        self.mt_limit: Optional[int] = limit
+        self.mt_results: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def results(self) -> Dict[str, Dict[str, Any]]:
+        return self.mt_results
+
+    def statistics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        { <schema-name>.<table-name>: {
+            live_rows: int : <n_live_tup>,
+            dead_rows: int : <n_dead_tup>,
+            modified_rows: int : <n_mod_since_analyze>,
+            last_analyze: (optional: datetime : None): <latest-of-manual-and-auto-analyze>,
+            last_vacuum: (optional: datetime : None): <latest-of-manual-and-auto-vacuum>
+            }
+        }
+        """
+        if not self.mt_tables:
+            return {}
+        return {
+            _stat.pop('table_name'): _stat
+            for _stat in self.query(
+                f"""select  concat(schemaname, '.', relname)                        as table_name
+                ,       n_live_tup                                              as live_rows
+                ,       n_dead_tup                                              as dead_rows
+                ,       n_mod_since_analyze                                     as modified_rows
+                ,       greatest(last_analyze, last_autoanalyze)                as last_analyze
+                ,       greatest(last_vacuum, last_autovacuum)                  as last_vacuum
+                from    pg_stat_user_tables
+                where   concat(schemaname, '.', relname) in ({", ".join(f"'{_}'" for _ in self.mt_tables)})"""
+            ).to_dict('records')
+        }
+
+    def plan(self) -> List[Dict[str, Any]]:
+        """
+        Maintenance actions of tables that order by score, the ratio of dead or modified rows
+        to live rows, and the table that never analyzed gets the highest score
+        """
+        _plans: List[Dict[str, Any]] = []
+        for table_name, _stat in self.statistics().items():
+            _live: int = max(int(_stat['live_rows'] or 0), 1)
+            _dead_ratio: float = int(_stat['dead_rows'] or 0) / _live
+            _mod_ratio: float = int(_stat['modified_rows'] or 0) / _live
+            if int(_stat['dead_rows'] or 0) >= self.mt_min_rows and _dead_ratio > self.mt_vacuum_ratio:
+                action: str = 'vacuum analyze'
+            elif pd.isna(_stat['last_analyze']) and int(_stat['modified_rows'] or 0) > 0:
+                action: str = 'analyze'
+                _mod_ratio = float('inf')
+            elif int(_stat['modified_rows'] or 0) >= self.mt_min_rows and _mod_ratio > self.mt_analyze_ratio:
+                action: str = 'analyze'
+            else:
+                continue
+            _plans.append({
+                'table_name': table_name, 'action': action, 'score': round(max(_dead_ratio, _mod_ratio), 4), **_stat
+            })
+        return sorted(_plans, key=lambda _: _['score'], reverse=True)[:self.mt_limit]
+
+    @staticmethod
+    def _maintain(pool: PostgresPool, _plan: Dict[str, Any]) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            'action': _plan['action'], 'status': 'success', 'score': _plan['score'],
+            'dead_rows': _plan['dead_rows'], 'modified_rows': _plan['modified_rows']
+        }
+        start: float = time.perf_counter()
+        try:
+            with pool.connection() as conn:
+                conn.execute(SQL(f"{_plan['action']} {_plan['table_name']}"))
+        except Exception as err:
+            result.update({'status': 'failed', 'error': _error_message(err)})
+        result['duration'] = round(time.perf_counter() - start, 3)
+        return result
+
+    def run(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Run maintenance actions from `plan` with bounded concurrency and record results, the table
+        that its worker raises or does not return result records as failed, so other tables still
+        record their results
+        """
+        self.mt_results: Dict[str, Dict[str, Any]] = {}
+        threads: List[tuple] = []
+        with PostgresPool(self.db_conn, pool_size=self.mt_pool_size) as pool:
+            for _plan in self.plan():
+                _thread = ThreadWithControl(target=capture_error(self._maintain), args=(pool, _plan))
+                _thread.daemon = True
+                _thread.start()
+                threads.append((_plan, _thread))
+            for _plan, _thread in threads:
+                table_name: str = _plan['table_name']
+                if not isinstance(result := _thread.join(), dict):
+                    result = {
+                        'action': _plan['action'], 'status': 'failed', 'score': _plan['score'],
+                        'error': (
+                            _error_message(result) if isinstance(result, Exception)
+                            else f"Thread {_thread.name} does not return result"
+                        ),
+                        'duration': None
+                    }
+                self.mt_results[table_name] = result
+                logger.info(
+                    f"Maintain table {table_name!r} with {result['action']}: {result['status']} "
+                    f"({result['duration']} sec)"
+                )
+        return self.mt_results
@@ -1,39 +1,179 @@
+import io
+import json
+import asyncio
+import hashlib
+import functools
+import time
+import queue
+import threading
 import pandas as pd
-from typing import Dict, Any, Optional, List, Union, Tuple
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List, Union, Tuple, Callable, Iterable, Iterator, AsyncIterator
 import psycopg
-from psycopg.sql import SQL
+from psycopg.sql import SQL, Composable, Identifier, Literal
 from psycopg.rows import tuple_row
+from src.core.utils.threader import ThreadWithControl
+
+
+class HiddenAttribute:
+    """
+    Descriptor of excluded attribute that raises `AttributeError` like the attribute does not exist,
+    so the attribute lookup of class does not need `__getattribute__` hook
+    """
+    def __init__(self, name: str):
+        self.name: str = name
+
+    def __get__(self, instance, owner):
+        raise AttributeError(f"{owner} does not have attribute `{self.name}`")
 
 
 class HideMeta(type):
     """
+    Metaclass that hides attributes in `__excluded__` of class and its bases at class-definition
+    time with `HiddenAttribute`, the method of parent class still calls with `super()`
     Reference:
     `https://stackoverflow.com/questions/23181442/how-to-hide-remove-some-methods-in-inherited-class-in-python`
     """
     def __new__(mcs, cls_name, cls_bases, cls_dict):
-        cls_dict.setdefault("__excluded__", [])
+        _excluded: set = set(cls_dict.get('__excluded__', ()))
+        for _base in cls_bases:
+            _excluded |= set(getattr(_base, '__excluded__', ()))
+        cls_dict['__excluded__'] = frozenset(_excluded)
+        for name in _excluded:
+            cls_dict[name] = HiddenAttribute(name)
+
+        def __dir__(self):
+            return sorted(set(super(out_cls, self).__dir__()) - _excluded)
+
+        cls_dict['__dir__'] = __dir__
         out_cls = super(HideMeta, mcs).__new__(mcs, cls_name, cls_bases, cls_dict)
+        return out_cls
 
-        def __getattribute__(self, name):
-            if name in cls_dict["__excluded__"]:
-                raise AttributeError(name)
-            else:
-                return super(out_cls, self).__getattribute__(name)
 
-        out_cls.__getattribute__ = __getattribute__
+def capture_error(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap target of `ThreadWithControl` to return its error instead of raise, so the error does not
+    lose in worker thread and `join_threads` raises it in caller thread
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs) -> Any:
+        try:
+            return func(*args, **kwargs)
+        except Exception as err:
+            return err
+    return wrapper
+
 
-        def __dir__(self):
-            return sorted((set(dir(out_cls)) | set(self.__dict__.keys())) - set(cls_dict["__excluded__"]))
+def join_threads(threads: List[ThreadWithControl]) -> List[Any]:
+    """
+    Join threads and return their results in order, it raises the first error that targets wrapped
+    with `capture_error` return, and the target that does not return, like the thread that stops
+    with `terminate`, raises `RuntimeError`
+    """
+    results: List[Any] = [_thread.join() for _thread in threads]
+    for _thread, _result in zip(threads, results):
+        if isinstance(_result, Exception):
+            raise _result
+        if _result is None:
+            raise RuntimeError(f"Thread {_thread.name} does not return result")
+    return results
 
-        out_cls.__dir__ = __dir__
 
-        return out_cls
+def columns_statement(db_name: str, condition: str, with_table: bool = False) -> str:
+    """
+    Statement of column properties from `information_schema.columns` that filter
+    with `condition`, the `table_name` column will add when `with_table` is True
+    """
+    return f"""select	{('table_name, ' if with_table else '')}column_name
+            ,		column_position
+            ,		column_nullable											as nullable
+            ,		column_default											as default
+            ,		concat(data_type, data_type_length, with_time_zone)		as data_type
+            from	(	select	table_name
+            ,       column_name
+            ,		ordinal_position										as column_position
+            , 		case when lower(is_nullable) = 'yes'
+                         then true
+                         else false
+                    end	                                                    as column_nullable
+            ,		column_default											as column_default
+            ,		case when data_type like '%with%'
+                         then substring(data_type, 1, position(' ' in data_type) - 1)
+                         when data_type like 'char%'
+                         then ('{{"character varying": "varchar", "character": "char"}}'::jsonb ->> data_type)
+                         when data_type = 'interval' and interval_type is not null
+                         then concat(data_type, ' ', lower(interval_type))
+                         else lower(data_type)
+                    end                                                     as data_type
+            ,		case when data_type like '%with time zone%'
+                         then substring(data_type, position(' ' in data_type))
+                         else ''
+                    end                                                     as with_time_zone
+            ,		case when character_maximum_length is not null and character_maximum_length > 1
+                         then concat('( ', character_maximum_length, ' )') 
+                         when numeric_precision is not null and numeric_scale > 0
+                         then concat('( ', numeric_precision, ', ', numeric_scale, ' )')
+                         when numeric_precision is not null and numeric_scale = 0 and udt_name not like 'int%'
+                         then concat('( ', numeric_precision, ' )')
+                         when datetime_precision between 1 and 5
+                         then concat('(', datetime_precision,') ')
+                         else ''
+                    end                                                     as data_type_length
+            from {db_name}.information_schema.columns
+            where   {condition}) as a"""
+
+
+def constraints_statement(db_name: str, condition: str, with_table: bool = False) -> str:
+    """
+    Statement of column constraints from `information_schema.table_constraints` that
+    filter with `condition`, the `table_name` column will add when `with_table` is True
+    """
+    return f"""select	{('tc.table_name, ' if with_table else '')}tc.constraint_name
+            ,		lower(tc.constraint_type)                                       as constraint_type
+            ,		coalesce(kcu.column_name, ccu.column_name)                      as column_name
+            ,		case when tc.constraint_type = 'FOREIGN KEY'
+                         then ccu.table_name
+                         else null
+                    end                                                             as foreign_table_name
+            ,	    case when tc.constraint_type = 'FOREIGN KEY'
+                         then ccu.column_name else null
+                    end                                                             as foreign_column_name 
+            ,		case when tc.constraint_type = 'PRIMARY KEY'
+                         then format('(primary key ( %s )', ccu.column_name)
+                         when tc.constraint_type = 'FOREIGN KEY'
+                         then format('(foreign key ( %s ) references %s( %s ))',
+                            kcu.column_name, ccu.table_name, ccu.column_name)
+                         else lower(cc.check_clause)
+                    end                                                             as constraint_desc
+            from {db_name}.information_schema.table_constraints             as tc
+            left join {db_name}.information_schema.key_column_usage         as kcu
+                on tc.constraint_name = kcu.constraint_name
+            left join {db_name}.information_schema.constraint_column_usage  as ccu
+                on ccu.constraint_name = tc.constraint_name
+            left join {db_name}.information_schema.check_constraints        as cc
+                on cc.constraint_name = tc.constraint_name 
+            where {condition}
+            and tc.constraint_name not like '%not_null'"""
 
 
 class PostgresConn:
     """
     PostgresSQL connection class
+    detail
+    ------
+        All connections to database open with `connect`, that goes through circuit breaker of
+        connection. The health state caches per connection, the password keeps only its hash in
+        key, for `HEALTH_TTL` seconds and shares between all objects. After `HEALTH_FAILURES`
+        failed connects in a row, the circuit opens, so `connectable` returns False and `connect`
+        raises without connect until `HEALTH_COOLDOWN` seconds pass, then the next connect will
+        try again. The connection that does not set `connect_timeout` uses `CONNECT_TIMEOUT`.
     """
+    HEALTH_TTL: float = 5.0
+    HEALTH_FAILURES: int = 3
+    HEALTH_COOLDOWN: float = 30.0
+    CONNECT_TIMEOUT: int = 10
+    health_states: Dict[tuple, Dict[str, Any]] = {}
+    health_lock = threading.Lock()
 
     def __init__(self, db_conn: Dict[str, Any]):
         self.error_stm: str = ""
@@ -48,20 +188,98 @@ class PostgresConn:
         return self.db_conn['dbname']
 
     @property
-    def connectable(self) -> bool:
+    def health_key(self) -> tuple:
+        """Key of connection from all its arguments, the password changes key with its hash"""
+        return tuple(sorted(
+            (k, hashlib.sha256(str(v).encode('utf-8')).hexdigest() if k == 'password' else str(v))
+            for k, v in self.db_conn.items()
+        ))
+
+    @property
+    def health(self) -> Dict[str, Any]:
+        """Shared health state of connection"""
+        with PostgresConn.health_lock:
+            return PostgresConn.health_states.setdefault(self.health_key, {
+                'connectable': False, 'checked': None, 'failures': 0, 'opened': None, 'lock': threading.Lock()
+            })
+
+    @classmethod
+    def reset_health(cls) -> None:
+        with cls.health_lock:
+            cls.health_states: Dict[tuple, Dict[str, Any]] = {}
+
+    def _circuit_opened(self, _health: Dict[str, Any]) -> bool:
+        return _health['opened'] is not None and time.monotonic() - _health['opened'] < self.HEALTH_COOLDOWN
+
+    def _record_health(self, _health: Dict[str, Any], connectable: bool) -> None:
+        """Record result of connect to health state, the caller holds lock of health state"""
+        if connectable:
+            _health.update({'connectable': True, 'failures': 0, 'opened': None})
+        else:
+            _health['connectable'] = False
+            _health['failures'] += 1
+            if _health['failures'] >= self.HEALTH_FAILURES:
+                _health['opened'] = time.monotonic()
+        _health['checked'] = time.monotonic()
+
+    def _connect_options(self, **kwargs) -> Dict[str, Any]:
+        _health: Dict[str, Any] = self.health
+        with _health['lock']:
+            if self._circuit_opened(_health):
+                raise psycopg.OperationalError(
+                    f"Circuit of connection to {self.db_name} opens after {_health['failures']} failed connects"
+                )
+        return {'connect_timeout': self.CONNECT_TIMEOUT, **self.db_conn, **kwargs}
+
+    def _connected(self, connectable: bool) -> None:
+        _health: Dict[str, Any] = self.health
+        with _health['lock']:
+            self._record_health(_health, connectable)
+
+    def connect(self, **kwargs) -> psycopg.Connection:
+        """Connect to database through circuit breaker, the `kwargs` pass to `psycopg.connect`"""
+        options: Dict[str, Any] = self._connect_options(**kwargs)
         try:
-            with psycopg.connect(connect_timeout=1, **self.db_conn):
-                return True
-        except psycopg.Error as err:
-            print(
-                f"{type(err).__module__.removesuffix('.errors')}:{type(err).__name__}: {str(err).rstrip()}"
-            )
-            return False
+            conn: psycopg.Connection = psycopg.connect(**options)
+        except psycopg.Error:
+            self._connected(False)
+            raise
+        self._connected(True)
+        return conn
+
+    async def connect_async(self, **kwargs) -> psycopg.AsyncConnection:
+        """Connect to database with async connection through circuit breaker"""
+        options: Dict[str, Any] = self._connect_options(**kwargs)
+        try:
+            conn: psycopg.AsyncConnection = await psycopg.AsyncConnection.connect(**options)
+        except psycopg.Error:
+            self._connected(False)
+            raise
+        self._connected(True)
+        return conn
+
+    @property
+    def connectable(self) -> bool:
+        _health: Dict[str, Any] = self.health
+        with _health['lock']:
+            if _health['checked'] is not None and time.monotonic() - _health['checked'] < self.HEALTH_TTL:
+                return _health['connectable']
+            if self._circuit_opened(_health):
+                return False
+            try:
+                with psycopg.connect(**{**self.db_conn, 'connect_timeout': 1}):
+                    self._record_health(_health, True)
+            except psycopg.Error as err:
+                print(
+                    f"{type(err).__module__.removesuffix('.errors')}:{type(err).__name__}: {str(err).rstrip()}"
+                )
+                self._record_health(_health, False)
+            return _health['connectable']
 
-    def execute(self, query) -> None:
-        with psycopg.connect(**self.db_conn) as conn:
+    def execute(self, query: Union[str, Composable]) -> None:
+        with self.connect() as conn:
             with conn.cursor() as cur:
-                cur.execute(SQL(query))
+                cur.execute(query if isinstance(query, Composable) else SQL(query))
 
     def query(
             self,
@@ -71,7 +289,7 @@ class PostgresConn:
     ) -> Union[pd.DataFrame, List[Any]]:
         result_type = result_type or 'df'
         assert result_type in {"list", "df"}
-        with psycopg.connect(**self.db_conn) as conn:
+        with self.connect() as conn:
             with conn.cursor() as cur:
                 cur.execute(SQL(query))
                 data = cur.fetchall()
@@ -102,6 +320,67 @@ class PostgresConn:
         """
         pass
 
+    def contention(self) -> Dict[str, Any]:
+        """
+        Pressure on database from sessions in current database that wait for lock and replay lag
+        of replication in seconds
+        """
+        return PostgresConn.query(
+            self,
+            """select  ( select count(*) from pg_stat_activity
+                         where wait_event_type = 'Lock' and datname = current_database() )    as lock_waits
+            ,       coalesce(( select extract(epoch from max(replay_lag))
+                               from pg_stat_replication ), 0)::float                         as replication_lag"""
+        ).to_dict('records')[0]
+
+    @staticmethod
+    def notify_statement(channel: str, payload: Dict[str, Any]) -> Composable:
+        """
+        Statement of `pg_notify` with json payload, it can queue to transaction of load, and the
+        channel and payload quote as literals
+        """
+        return SQL("select pg_notify({}, {});").format(Literal(channel), Literal(json.dumps(payload, default=str)))
+
+    def notify(self, channel: str, payload: Dict[str, Any]) -> None:
+        PostgresConn.execute(self, self.notify_statement(channel, payload))
+
+    async def listen(
+            self,
+            channels: Union[str, List[str]],
+            timeout: Optional[float] = None,
+            stop_after: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Listen notifications of channels on async connection, so the subscriber reacts when
+        notification arrives instead of polling tables. The loop stops after `timeout` seconds
+        without notification or `stop_after` notifications.
+        usage:
+            >> async for notify in PostgresConn(db_conn).listen('public.customer'):
+            >>     print(notify)
+            {'channel': 'public.customer', 'payload': {'action': 'shadow_load', 'rows': 1200}, 'pid': 4312}
+        """
+        async with await self.connect_async(autocommit=True) as conn:
+            for channel in ([channels] if isinstance(channels, str) else channels):
+                await conn.execute(SQL("listen {}").format(Identifier(channel)))
+            # The `timeout` and `stop_after` of `notifies` need psycopg 3.2, so the loop stops
+            # with `asyncio.wait_for` on generator of pinned version
+            notifies: AsyncIterator[psycopg.Notify] = conn.notifies()
+            received: int = 0
+            try:
+                while stop_after is None or received < stop_after:
+                    try:
+                        notify: psycopg.Notify = await asyncio.wait_for(notifies.__anext__(), timeout)
+                    except (asyncio.TimeoutError, StopAsyncIteration):
+                        break
+                    received += 1
+                    try:
+                        payload: Any = json.loads(notify.payload)
+                    except ValueError:
+                        payload: Any = notify.payload
+                    yield {'channel': notify.channel, 'payload': payload, 'pid': notify.pid}
+            finally:
+                await notifies.aclose()
+
     def explain(
             self,
             query: str,
@@ -120,7 +399,7 @@ class PostgresConn:
         """
         for param in {costs, analyze, verbose, settings, summary, buffers}:
             assert param in {True, False}
-        with psycopg.connect(**self.db_conn) as conn:
+        with self.connect() as conn:
             with conn.cursor(**self.db_cursor_conf) as cur:
                 try:
                     cur.execute(SQL(f"""explain( format json, costs {costs}, analyze {analyze}, verbose {verbose},
@@ -136,6 +415,72 @@ class PostgresConn:
         return result
 
 
+class PostgresPool:
+    """
+    Pool of PostgresSQL connections that share between threads, the connection will create
+    when it is requested and the pool does not have idle connection until `pool_size`, and it
+    connects through circuit breaker of `PostgresConn`
+    usage:
+        >> pool = PostgresPool(db_conn, pool_size=4)
+        >> with pool.connection() as conn:
+        >>     conn.execute(SQL("select 1"))
+        >> pool.close()
+    """
+
+    def __init__(
+            self,
+            db_conn: Dict[str, Any],
+            pool_size: int = 4,
+            autocommit: bool = True
+    ):
+        self.db_conn: Dict[str, Any] = db_conn
+        self.pool_connector: PostgresConn = PostgresConn(db_conn)
+        self.pool_size: int = pool_size
+        self.autocommit: bool = autocommit
+        self.pool_idle: queue.LifoQueue = queue.LifoQueue()
+        self.pool_limiter = threading.BoundedSemaphore(pool_size)
+        self.pool_conns: List[psycopg.Connection] = []
+        self.pool_lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[psycopg.Connection]:
+        self.pool_limiter.acquire()
+        try:
+            try:
+                conn: psycopg.Connection = self.pool_idle.get_nowait()
+            except queue.Empty:
+                conn: psycopg.Connection = self.pool_connector.connect(autocommit=self.autocommit)
+                with self.pool_lock:
+                    self.pool_conns.append(conn)
+            try:
+                yield conn
+            except Exception:
+                if not conn.closed and not self.autocommit:
+                    try:
+                        conn.rollback()
+                    except psycopg.Error:
+                        conn.close()
+                raise
+            finally:
+                if not conn.closed:
+                    self.pool_idle.put(conn)
+        finally:
+            self.pool_limiter.release()
+
+    def close(self) -> None:
+        with self.pool_lock:
+            for conn in self.pool_conns:
+                conn.close()
+            self.pool_conns: List[psycopg.Connection] = []
+        self.pool_idle: queue.LifoQueue = queue.LifoQueue()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
 class PostgresObject(PostgresConn):
     """
     Postgres object
@@ -186,7 +531,7 @@ class PostgresObject(PostgresConn):
             super(PostgresObject, self).execute(query)
         else:
             if self.statement:
-                with psycopg.connect(**self.db_conn) as conn:
+                with self.connect() as conn:
                     with conn.cursor() as cur:
                         try:
                             for _query in self.statement:
@@ -293,6 +638,9 @@ class ColumnObject:
         'timedelta64[ns]': 'interval',
     }
 
+    __slots__ = 'col_name', 'col_position', 'col_datatype', 'col_nullable', 'col_default', 'col_constraints', \
+                'col_foreign_table_name', 'col_foreign_column_name', 'col_primary_key', 'col_unique'
+
     def __init__(
             self,
             column_name: str,
@@ -335,6 +683,13 @@ class ColumnObject:
                     return True
         return False
 
+    def constraint_names(self, const_type: str) -> List[str]:
+        """Return names of column constraints that match with `const_type`"""
+        return [
+            _constraint.get('constraint_name') for _constraint in (self.col_constraints or [])
+            if _constraint.get('constraint_type') == const_type
+        ]
+
     @property
     def position(self):
         return self.col_position
@@ -415,9 +770,7 @@ class ColumnObject:
         ON DELETE CASCADE
         ON UPDATE RESTRICT;
         """
-        reference_table, reference_column = reference.split('.')
-        self.col_foreign_key['reference_table'] = reference_table
-        self.col_foreign_key['reference_column'] = reference_column
+        self.col_foreign_table_name, self.col_foreign_column_name = reference.split('.')
 
     # @property
     # def comment(self):
@@ -479,11 +832,16 @@ class TableObject(PostgresObject):
         self.alive: bool = self.exists
 
     def generate_columns(self) -> Dict[str, ColumnObject]:
+        return self.build_columns(self._columns().values(), self._constraints().values())
+
+    @staticmethod
+    def build_columns(columns: Iterable[dict], constraints: Iterable[dict]) -> Dict[str, ColumnObject]:
+        """Build column objects from rows of `columns_statement` and `constraints_statement`"""
         _columns: Dict[str, dict] = {
-            col_name: v for v in self._columns().values() if (col_name := v.get('column_name'))
+            col_name: v for v in columns if (col_name := v.get('column_name'))
         }
         _constraints: Dict[str, list] = {}
-        for value in self._constraints().values():
+        for value in constraints:
             if col_name := value.pop('column_name', None):
                 if col_name in _constraints:
                     _constraints[col_name].append(value)
@@ -517,42 +875,9 @@ class TableObject(PostgresObject):
         }
         """
         return super(TableObject, self).query(
-            f"""select	column_name
-            ,		column_position
-            ,		column_nullable											as nullable
-            ,		column_default											as default
-            ,		concat(data_type, data_type_length, with_time_zone)		as data_type
-            from	(	select	column_name
-            ,		ordinal_position										as column_position
-            , 		case when lower(is_nullable) = 'yes'
-                         then true
-                         else false
-                    end	                                                    as column_nullable
-            ,		column_default											as column_default
-            ,		case when data_type like '%with%'
-                         then substring(data_type, 1, position(' ' in data_type) - 1)
-                         when data_type like 'char%'
-                         then ('{{"character varying": "varchar", "character": "char"}}'::jsonb ->> data_type)
-                         when data_type = 'interval' and interval_type is not null
-                         then concat(data_type, ' ', lower(interval_type))
-                         else lower(data_type)
-                    end                                                     as data_type
-            ,		case when data_type like '%with time zone%'
-                         then substring(data_type, position(' ' in data_type))
-                         else ''
-                    end                                                     as with_time_zone
-            ,		case when character_maximum_length is not null and character_maximum_length > 1
-                         then concat('( ', character_maximum_length, ' )') 
-                         when numeric_precision is not null and numeric_scale > 0
-                         then concat('( ', numeric_precision, ', ', numeric_scale, ' )')
-                         when numeric_precision is not null and numeric_scale = 0 and udt_name not like 'int%'
-                         then concat('( ', numeric_precision, ' )')
-                         when datetime_precision between 1 and 5
-                         then concat('(', datetime_precision,') ')
-                         else ''
-                    end                                                     as data_type_length
-            from {self.db_name}.information_schema.columns
-            where   table_schema = '{self.schema_name}' and table_name = '{self.tbl_name}') as a"""
+            columns_statement(
+                self.db_name, f"table_schema = '{self.schema_name}' and table_name = '{self.tbl_name}'"
+            )
         ).reset_index(drop=True).to_dict('index')
 
     def _constraints(self) -> Dict[int, dict]:
@@ -569,32 +894,9 @@ class TableObject(PostgresObject):
         :rtype: Dict[int, dict]
         """
         return super(TableObject, self).query(
-            f"""select	tc.constraint_name
-            ,		lower(tc.constraint_type)                                       as constraint_type
-            ,		coalesce(kcu.column_name, ccu.column_name)                      as column_name
-            ,		case when tc.constraint_type = 'FOREIGN KEY'
-                         then ccu.table_name
-                         else null
-                    end                                                             as foreign_table_name
-            ,	    case when tc.constraint_type = 'FOREIGN KEY'
-                         then ccu.column_name else null
-                    end                                                             as foreign_column_name 
-            ,		case when tc.constraint_type = 'PRIMARY KEY'
-                         then format('(primary key ( %s )', ccu.column_name)
-                         when tc.constraint_type = 'FOREIGN KEY'
-                         then format('(foreign key ( %s ) references %s( %s ))',
-                            kcu.column_name, ccu.table_name, ccu.column_name)
-                         else lower(cc.check_clause)
-                    end                                                             as constraint_desc
-            from {self.db_name}.information_schema.table_constraints             as tc
-            left join {self.db_name}.information_schema.key_column_usage         as kcu
-                on tc.constraint_name = kcu.constraint_name
-            left join {self.db_name}.information_schema.constraint_column_usage  as ccu
-                on ccu.constraint_name = tc.constraint_name
-            left join {self.db_name}.information_schema.check_constraints        as cc
-                on cc.constraint_name = tc.constraint_name 
-            where tc.table_schema = '{self.schema_name}' and tc.table_name = '{self.tbl_name}'
-            and tc.constraint_name not like '%not_null'"""
+            constraints_statement(
+                self.db_name, f"tc.table_schema = '{self.schema_name}' and tc.table_name = '{self.tbl_name}'"
+            )
         ).reset_index(drop=True).to_dict('index')
 
     @property
@@ -625,6 +927,11 @@ class TableObject(PostgresObject):
     def fullname(self):
         return self.tbl_name_full
 
+    @property
+    def channel(self) -> str:
+        """Notification channel of table that emits after load"""
+        return f"{self.schema_name}.{self.tbl_name}"
+
     @property
     def exists(self) -> bool:
         if super(TableObject, self).schema_exists:
@@ -638,7 +945,7 @@ class TableObject(PostgresObject):
     def rename(self, table_name):
         self.statement.append(f"alter {self.OBJECT_TYPE} {self.obj_name_full} rename to {table_name};")
         if self.auto_execute:
-            self.execute()
+            super(TableObject, self).execute()
         self.obj_name = table_name
         return self
 
@@ -648,16 +955,254 @@ class TableObject(PostgresObject):
             f"""create {self.OBJECT_TYPE} {('if not exists' if if_not_exists else '')} {self.obj_name_full} ();"""
         )
         if self.auto_execute:
-            self.execute()
+            super(TableObject, self).execute()
         return self
 
     def drop(self, if_exists: Optional[bool] = False):
         self.statement.append(f"drop {self.OBJECT_TYPE} {('if exists' if if_exists else '')} {self.obj_name_full};")
         if self.auto_execute:
-            self.execute()
+            super(TableObject, self).execute()
         self.alive = False
         return self
 
+    def delete_batches(
+            self,
+            condition: str,
+            key: str,
+            batch_size: int = 10000,
+            pause: float = 1.0,
+            max_pause: float = 60.0,
+            max_lock_waits: int = 0,
+            max_replication_lag: float = 10.0,
+            lock_timeout: str = '5s',
+            max_lock_retries: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Delete rows that match `condition` in batches of `batch_size` rows with keyset range
+        on indexed column, `key`, and each batch commits in its own transaction, so it does not
+        keep long lock or write all WAL in one transaction. Before each batch, it will pause
+        when `contention` of database is over `max_lock_waits` or `max_replication_lag`. The keyset
+        range includes the last key because the deleted rows are gone and `key` may not be unique,
+        so the batch deletes by `ctid` of selected rows and checks `condition` again, then the other
+        rows that have same key but do not match `condition` do not delete. The batch that waits
+        for lock over `lock_timeout` retries, and it raises after `max_lock_retries` retries in a row.
+        raw-example
+        -----------
+            (i)     with batch as (
+                        select ctid from {table-name} where {condition} and {key} >= {last-key}
+                        order by {key} limit {batch-size}
+                    )
+                    delete from {table-name} where ctid = any(array(select ctid from batch))
+                    and ({condition}) returning {key}
+        """
+        result: Dict[str, Any] = {'deleted': 0, 'batches': 0, 'pauses': 0, 'duration': 0.0}
+        start: float = time.perf_counter()
+        last_key: Optional[Any] = None
+        retries: int = 0
+        with self.connect() as conn:
+            conn.execute(SQL(f"set lock_timeout = '{lock_timeout}'"))
+            conn.commit()
+            while True:
+                waiting: float = 0.0
+                while waiting < max_pause and (
+                        (state := self.contention())['lock_waits'] > max_lock_waits
+                        or state['replication_lag'] > max_replication_lag
+                ):
+                    time.sleep(pause)
+                    waiting += pause
+                    result['pauses'] += 1
+                try:
+                    with conn.cursor() as cur:
+                        cur.execute(SQL(
+                            f"""with batch as (
+                                select ctid from {self.obj_name_full}
+                                where ({condition}){(f' and {key} >= %(last_key)s' if last_key is not None else '')}
+                                order by {key} limit {batch_size}
+                            )
+                            delete from {self.obj_name_full} where ctid = any(array(select ctid from batch))
+                            and ({condition}) returning {key}"""
+                        ), ({'last_key': last_key} if last_key is not None else None))
+                        keys: list = [row[0] for row in cur.fetchall()]
+                    conn.commit()
+                except psycopg.errors.LockNotAvailable:
+                    conn.rollback()
+                    if (retries := retries + 1) > max_lock_retries:
+                        raise
+                    time.sleep(pause)
+                    result['pauses'] += 1
+                    continue
+                retries = 0
+                if not keys:
+                    break
+                last_key = max(keys)
+                result['deleted'] += len(keys)
+                result['batches'] += 1
+        result['duration'] = round(time.perf_counter() - start, 3)
+        return result
+
+    def stats(self, exact: bool = False) -> Dict[str, Any]:
+        """
+        Statistics of table from `pg_class` and `pg_stats` without scan table, the number
+        of rows estimates like planner, `reltuples` per page of last analyze multiplies current
+        pages, and it falls back to exact `count(*)` when `exact` or the table never analyzed
+        :return:
+        {   rows: int : <number-of-rows>,
+            estimated: bool : [True, False],
+            size: { table: int : <bytes>, indexes: int : <bytes>, total: int : <bytes> },
+            columns: { <column-name>: {
+                null_frac: float : <fraction-of-null>,
+                n_distinct: int : <number-of-distinct-values>
+                }
+            }
+        }
+        """
+        _relation: dict = super(TableObject, self).query(
+            f"""select  c.reltuples::float8                                    as reltuples
+            ,       c.relpages                                              as relpages
+            ,       pg_relation_size(c.oid)                                 as table_size
+            ,       pg_indexes_size(c.oid)                                  as indexes_size
+            ,       pg_total_relation_size(c.oid)                           as total_size
+            ,       current_setting('block_size')::int                      as block_size
+            from    pg_catalog.pg_class                                     as c
+            where   c.oid = '{self.schema_name}.{self.tbl_name}'::regclass"""
+        ).to_dict('records')[0]
+        _pages: float = _relation['table_size'] / _relation['block_size']
+        if _relation['reltuples'] < 0 or (_relation['relpages'] == 0 and _pages > 0):
+            rows: Optional[int] = None
+        else:
+            rows: Optional[int] = round(
+                _relation['reltuples'] / _relation['relpages'] * _pages if _relation['relpages'] > 0 else 0
+            )
+        result: Dict[str, Any] = {
+            'rows': rows,
+            'estimated': not exact and rows is not None,
+            'size': {
+                'table': int(_relation['table_size']),
+                'indexes': int(_relation['indexes_size']),
+                'total': int(_relation['total_size'])
+            },
+            'columns': {}
+        }
+        if not result['estimated']:
+            result['rows'] = super(TableObject, self).query(
+                f"select count(*) from {self.tbl_name_full}", 'list'
+            )[0][0]
+        for col_name, null_frac, n_distinct in super(TableObject, self).query(
+                f"""select  attname, null_frac, n_distinct
+                from    pg_catalog.pg_stats
+                where   schemaname = '{self.schema_name}' and tablename = '{self.tbl_name}'
+                and     not inherited""", 'list'
+        ):
+            result['columns'][col_name] = {
+                'null_frac': float(null_frac),
+                'n_distinct': int(
+                    n_distinct if n_distinct >= 0 else round(-n_distinct * result['rows'])
+                )
+            }
+        return result
+
+    def definitions(self) -> Dict[str, Dict[str, str]]:
+        """
+        Definition statements of constraints and indexes that do not belong to constraint,
+        it uses to rebuild them on other table like staging table of shadow load
+        :return:
+        {   'constraints': { <constraint-name>: <constraint-definition> },
+            'indexes': { <index-name>: <create-index-statement> }
+        }
+        """
+        _oid: str = f"'{self.schema_name}.{self.tbl_name}'::regclass"
+        return {
+            'constraints': dict(super(TableObject, self).query(
+                f"""select  conname, pg_get_constraintdef(oid)
+                from    pg_catalog.pg_constraint
+                where   conrelid = {_oid} and contype in ('p', 'u', 'f', 'c', 'x')
+                order by case contype when 'p' then 0 when 'u' then 1 else 2 end, conname""", 'list'
+            )),
+            'indexes': dict(super(TableObject, self).query(
+                f"""select  i.relname, pg_get_indexdef(x.indexrelid)
+                from    pg_catalog.pg_index as x
+                join    pg_catalog.pg_class as i on i.oid = x.indexrelid
+                where   x.indrelid = {_oid} and not exists (
+                            select from pg_catalog.pg_constraint as c
+                            where c.conrelid = x.indrelid and c.conindid = x.indexrelid )
+                order by i.relname""", 'list'
+            ))
+        }
+
+    def dependents(self) -> Dict[str, Any]:
+        """
+        Objects of other relations that depend on table, so the table can not drop while they
+        exist, the foreign keys of other tables that reference table and the views or materialized
+        views that select from table
+        :return:
+        {   'foreign_keys': [
+                { table_name: str : <schema-name>.<table-name>,
+                  constraint_name: str : <constraint-name>,
+                  definition: str : <constraint-definition> }, ...
+            ],
+            'views': { <schema-name>.<view-name>: str : ['view', 'materialized view'] }
+        }
+        """
+        _oid: str = f"'{self.schema_name}.{self.tbl_name}'::regclass"
+        return {
+            'foreign_keys': super(TableObject, self).query(
+                f"""select  concat(n.nspname, '.', c.relname)                       as table_name
+                ,       con.conname                                             as constraint_name
+                ,       pg_get_constraintdef(con.oid)                           as definition
+                from    pg_catalog.pg_constraint                                as con
+                join    pg_catalog.pg_class                                     as c    on c.oid = con.conrelid
+                join    pg_catalog.pg_namespace                                 as n    on n.oid = c.relnamespace
+                where   con.contype = 'f' and con.confrelid = {_oid} and con.conrelid <> {_oid}
+                order by table_name, constraint_name"""
+            ).to_dict('records'),
+            'views': dict(super(TableObject, self).query(
+                f"""select  distinct
+                        concat(n.nspname, '.', v.relname)
+                ,       case v.relkind when 'm' then 'materialized view' else 'view' end
+                from    pg_catalog.pg_depend                                    as d
+                join    pg_catalog.pg_rewrite                                   as r    on r.oid = d.objid
+                join    pg_catalog.pg_class                                     as v    on v.oid = r.ev_class
+                join    pg_catalog.pg_namespace                                 as n    on n.oid = v.relnamespace
+                where   d.classid = 'pg_rewrite'::regclass and d.refclassid = 'pg_class'::regclass
+                and     d.refobjid = {_oid} and v.oid <> {_oid}""", 'list'
+            ))
+        }
+
+    def copy_frame(self, df: pd.DataFrame, pool: PostgresPool, chunk_size: int = 50000) -> int:
+        """
+        Copy dataframe to table with COPY in csv format, the chunks of `chunk_size` rows copy
+        concurrently with connections from `pool`, so each chunk commits in its own transaction
+        and the table should be new or staging table that does not have any reader. The float
+        columns that have only integral values, like integer column with null, write as integer.
+        The error of any chunk raises after all chunks finish, so the caller does not count rows
+        of table that loads partially.
+        """
+        df = df.assign(**{
+            col: df[col].astype('Int64') for col in df.select_dtypes('float').columns
+            if (values := df[col].dropna()).eq(values.round()).all()
+        })
+        _statement: str = (
+            f"""copy {self.obj_name_full} ({', '.join(df.columns)}) from stdin (format csv, null '\\N')"""
+        )
+
+        @capture_error
+        def _copy(chunk: pd.DataFrame) -> int:
+            buffer = io.StringIO()
+            chunk.to_csv(buffer, index=False, header=False, na_rep='\\N')
+            with pool.connection() as conn:
+                with conn.cursor() as cur:
+                    with cur.copy(SQL(_statement)) as copy:
+                        copy.write(buffer.getvalue())
+            return len(chunk)
+
+        threads: List[ThreadWithControl] = []
+        for _ in range(0, len(df), chunk_size):
+            _thread = ThreadWithControl(target=_copy, args=(df.iloc[_:_ + chunk_size],))
+            _thread.daemon = True
+            _thread.start()
+            threads.append(_thread)
+        return sum(join_threads(threads))
+
     def select(self, *args, **kwargs):
         _columns = args if isinstance(args[0], str) else args[0]
         # TODO: validate `_columns`
@@ -667,6 +1212,70 @@ class TableObject(PostgresObject):
         )
 
 
+class SchemaObject(PostgresObject):
+    """
+    Schema Object
+    -------------
+    detail
+    ------
+        Introspection of columns and constraints for many tables in the same schema with one
+        round trip per statement, `TableObject` sends two statements for each table.
+    raw-example
+    -----------
+        (i)     select  table_name, column_name, ...
+                from    {database_name}.information_schema.columns
+                where   table_schema = 'public' and table_name in ('customer', 'billing')
+    """
+    OBJECT_TYPE = "schema"
+
+    def __init__(
+            self,
+            db_conn: Dict[str, Any],
+            schema_name: str,
+            auto_execute: Optional[bool] = False
+    ):
+        super().__init__(db_conn, schema_name, schema_name, auto_execute)
+
+    @property
+    def obj_name_full(self) -> str:
+        return f"{self.db_name}.{self.schema_name}"
+
+    def generate_columns(self, tables: Optional[List[str]] = None) -> Dict[str, Dict[str, ColumnObject]]:
+        """
+        :return:
+        { <table-name>: {
+            <column-name>: ColumnObject
+            }
+        }
+        """
+        _columns: Dict[str, list] = {}
+        for value in self._columns(tables):
+            _columns.setdefault(value.pop('table_name'), []).append(value)
+        _constraints: Dict[str, list] = {}
+        for value in self._constraints(tables):
+            _constraints.setdefault(value.pop('table_name'), []).append(value)
+        return {
+            tbl_name: TableObject.build_columns(values, _constraints.get(tbl_name, []))
+            for tbl_name, values in _columns.items()
+        }
+
+    def _condition(self, tables: Optional[List[str]] = None, alias: str = '') -> str:
+        _condition: str = f"{alias}table_schema = '{self.schema_name}'"
+        if tables:
+            _condition += f""" and {alias}table_name in ({", ".join(f"'{_}'" for _ in tables)})"""
+        return _condition
+
+    def _columns(self, tables: Optional[List[str]] = None) -> List[dict]:
+        return super(SchemaObject, self).query(
+            columns_statement(self.db_name, self._condition(tables), with_table=True)
+        ).to_dict('records')
+
+    def _constraints(self, tables: Optional[List[str]] = None) -> List[dict]:
+        return super(SchemaObject, self).query(
+            constraints_statement(self.db_name, self._condition(tables, alias='tc.'), with_table=True)
+        ).to_dict('records')
+
+
 class ViewObject(PostgresObject):
     """
     View Object
@@ -743,10 +1352,26 @@ class MaterializedViewObject(PostgresObject):
     """
     OBJECT_TYPE = "materialized view"
 
-    def refresh(self):
-        self.statement.append(f"refresh {self.OBJECT_TYPE} {self.obj_name_full};")
+    def refresh(self, concurrently: bool = False):
+        self.statement.append(
+            f"refresh {self.OBJECT_TYPE} {('concurrently ' if concurrently else '')}{self.obj_name_full};"
+        )
         return self
 
+    @property
+    def concurrently(self) -> bool:
+        """
+        Refresh with `concurrently` does not lock out select on materialized view, but it needs
+        the data was populated and at least one unique index that does not have where clause
+        or expression on materialized view
+        """
+        return super(MaterializedViewObject, self).query(
+            f"""select exists( select from pg_matviews as mv
+            join pg_index as i on i.indrelid = format('%I.%I', mv.schemaname, mv.matviewname)::regclass
+            where mv.schemaname = '{self.schema_name}' and mv.matviewname = '{self.obj_name}'
+            and mv.ispopulated and i.indisunique and i.indpred is null and i.indexprs is null ) as check_exists"""
+        )['check_exists'].to_dict().get(0, False)
+
 
 class FunctionObject(PostgresObject):
     """
@@ -754,7 +1379,8 @@ class FunctionObject(PostgresObject):
     ---------------
     detail
     ------
-        NOTE: `select count_if_exists('ai', 'ai_date_master')`
+        NOTE: `select count_if_exists('ai', 'ai_date_master')`, it scans all rows, so use
+              `TableObject.stats` for estimated number of rows
     raw-example
     -----------
         (i)     create or replace function {database_name}.{ai_schema_name}.count_if_exists(
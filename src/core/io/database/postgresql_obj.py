@@ -1,12 +1,22 @@
 import os
 import re
+import sys
+import functools
+import time
 import itertools
+import pandas as pd
+import psycopg
+from psycopg.sql import SQL, Composable
 from pathlib import Path
-from typing import Any, Dict, Union, Optional
-from src.core.utils import path_join, str_to_bool
+from typing import Any, Dict, Union, Optional, List, Tuple, Callable
+from src.core.utils import path_join, str_to_bool, split_iterable
+from src.core.utils.threader import ThreadWithControl
 from src.core.io import parse_config, load_dotenv
+from src.core.io.dataframe.validation import FrameValidator
+from src.core.io.dataframe.lookup import KeyCache
 from .plugins.postgresql_plugin import (
-    TableObject, ViewObject, MaterializedViewObject, FunctionObject, ProcedureObject
+    HideMeta, PostgresConn, PostgresPool, ColumnObject, TableObject, SchemaObject, ViewObject,
+    MaterializedViewObject, FunctionObject, ProcedureObject, capture_error, join_threads
 )
 
 os.environ.setdefault('PROJ_PATH', path_join(Path(__file__).parent, '../../../..'))
@@ -35,6 +45,7 @@ class PostgresColumn:
     COL_CONSTS: set = {
         'unique', 'not null', 'null', 'primary key', 'references', 'constraint', 'check', 'default', '--'
     }
+    COL_CONSTS_REGEX = re.compile(f"({'|'.join(re.escape(_) for _ in sorted(COL_CONSTS, key=len, reverse=True))})")
 
     __slots__ = 'ps_col_datatype', 'ps_col_unique', 'ps_col_nullable', 'ps_col_check', 'ps_col_desc', \
                 'ps_col_primary_key', 'ps_col_foreign_key', 'ps_col_default'
@@ -53,7 +64,8 @@ class PostgresColumn:
         self.ps_col_foreign_key: Optional[dict] = None
         if isinstance(ps_col, str):
             self.convert_from_string(ps_col)
-        self.convert_from_mapping(ps_col)
+        else:
+            self.convert_from_mapping(dict(ps_col))
 
     def convert_from_string(self, _ps_col: str):
         """
@@ -67,24 +79,9 @@ class PostgresColumn:
             (v)     birth_date: "date CHECK (birth_date > '1900-01-01')"
             (vi)    joined_date: "date NOT NULL CHECK (joined_date > birth_date)"
             (vii)   order_id integer NOT NULL DEFAULT nextval('tablename_colname_seq')
+        the parsed mapping memoizes with `parse_column`, so the same definition parses once
         """
-        _ps_detail_lower = _ps_col.lower()
-        match_list: list = re.split(f"({'|'.join(list(self.COL_CONSTS))})", _ps_detail_lower.strip())
-        match_datatype: str = match_list.pop(0).strip()
-        match_dict: dict = dict(itertools.zip_longest(*[iter(match_list)] * 2, fillvalue=""))
-        for k in self.COL_CONSTS:
-            if k in match_dict:
-                # Set True when column constraint in {`not null`, `null`, `unique`, `primary key`}
-                match_dict[k] = True if (value := match_dict[k].strip()) == '' else value
-            else:
-                match_dict[k] = None if k in {'default', 'check', 'constraint', '--'} else False
-        match_dict['nullable'] = not not_null if (not_null := match_dict.pop('not null')) else True
-        match_dict['datatype'] = match_datatype
-        match_dict['description'] = match_dict.pop('--')
-        match_dict['primary_key'] = match_dict.pop('primary key')
-        match_dict['foreign_key'] = match_dict.pop('references')
-        match_dict.pop('null')
-        self.convert_from_mapping(match_dict)
+        self.convert_from_mapping(dict(parse_column(_ps_col)))
 
     def convert_from_mapping(self, _ps_col: Dict[str, Any]):
         """
@@ -168,7 +165,33 @@ class PostgresColumn:
         }
 
 
-class PostgresTable(TableObject):
+@functools.lru_cache(maxsize=8192)
+def parse_column(definition: str) -> Tuple[Tuple[str, Any], ...]:
+    """
+    Parse inline column definition to mapping items with compiled regex of `PostgresColumn`, the
+    result memoizes per definition, so identical definitions of wide tables share one parsed and
+    interned result
+    """
+    _ps_detail_lower = definition.lower()
+    match_list: list = PostgresColumn.COL_CONSTS_REGEX.split(_ps_detail_lower.strip())
+    match_datatype: str = match_list.pop(0).strip()
+    match_dict: dict = dict(itertools.zip_longest(*[iter(match_list)] * 2, fillvalue=""))
+    for k in PostgresColumn.COL_CONSTS:
+        if k in match_dict:
+            # Set True when column constraint in {`not null`, `null`, `unique`, `primary key`}
+            match_dict[k] = True if (value := match_dict[k].strip()) == '' else value
+        else:
+            match_dict[k] = None if k in {'default', 'check', 'constraint', '--'} else False
+    match_dict['nullable'] = not not_null if (not_null := match_dict.pop('not null')) else True
+    match_dict['datatype'] = sys.intern(match_datatype)
+    match_dict['description'] = match_dict.pop('--')
+    match_dict['primary_key'] = match_dict.pop('primary key')
+    match_dict['foreign_key'] = match_dict.pop('references')
+    match_dict.pop('null')
+    return tuple(match_dict.items())
+
+
+class PostgresTable(TableObject, metaclass=HideMeta):
     """
     Postgres table object
     config
@@ -197,9 +220,22 @@ class PostgresTable(TableObject):
                 constraints (optional):
                     <constraint-name>: <constraint-detail>
                     ...
+                indexes (optional):
+                    (i)   <index-name>:
+                                columns: [<column-name or expression>, ...]
+                                method (optional): <btree, brin, gin, gist or hash>
+                                unique (optional): <unique>
+                                include (optional): [<column-name>, ...]
+                                where (optional): <partial-index-predicate>
+
+                    (ii)  <index-name>: [<column-name>, ...]
+                    ...
                 ...
             retentions:
-                ...
+                retention_schemas: [<column-name>, ...]
+                retention_value: <number-of-days or interval>
+                retention_key (optional): <indexed-column-name>
+                retention_batch (optional): <number-of-rows-per-batch>
     example
     -------
         (i)   customer_table:
@@ -228,11 +264,21 @@ class PostgresTable(TableObject):
                     foreign_key:
                         customer_owner: 'customer_table(customer_id)'
                     unique: ['order_id']
+                    indexes:
+                        order_transaction_create_brin:
+                            columns: ['create_datetime']
+                            method: 'brin'
+                        order_transaction_customer_idx:
+                            columns: ['customer_owner']
+                            include: ['order_value']
+                            where: 'order_quantity > 0'
     """
     # TODO: Change way to read config database connection with different environment
     CONF_DB = CONF_DB
     CONF_DELIMITER = '.'
     SCHEMA_NAME = 'public'
+    SHADOW_SUFFIX = '_shadow'
+    NOT_VALID_REGEX = re.compile(r'\s+not\s+valid\s*$', flags=re.IGNORECASE)
 
     def __init__(
             self,
@@ -245,13 +291,14 @@ class PostgresTable(TableObject):
         self.ps_tbl_name: str = self.ps_cat_name.pop(-1)
         self.ps_schema_name: str = self.ps_cat_name.pop(-1) if self.ps_cat_name else self.SCHEMA_NAME
         self.ps_tbl_type: str = properties.pop('catalog_type', catalog_name)
-        self.ps_cols: Optional[Dict[str, Any]] = properties.pop('schemas', None)
 
         # Properties for Postgres table
-        self.ps_tbl_primary_key: list = self.get_str_or_list(properties, 'primary_key')
-        self.ps_tbl_unique = self.get_str_or_list(properties, 'unique')
-        self.ps_tbl_foreign_key = properties.pop('foreign_key', {})
+        self.ps_tbl_schemas: Optional[Tuple[int, Dict[str, PostgresColumn]]] = None
+        self.ps_tbl_validator: Optional[Tuple[int, FrameValidator]] = None
+        self.ps_tbl_foreign_keys: Optional[Tuple[int, Dict[str, KeyCache]]] = None
+        self.load_config(properties)
         self.ps_tbl_constraint = properties.pop('constraints', {})
+        self.ps_tbl_indexes: Dict[str, Any] = properties.pop('indexes', None) or {}
 
         # Optional arguments for Postgres table
         self.ps_tbl_retentions: Optional[Dict[str, Any]] = kwargs.pop('retentions', {})
@@ -262,28 +309,586 @@ class PostgresTable(TableObject):
             self.ps_tbl_name
         )
 
-    def __getattribute__(self, attr):
-        if attr in super(PostgresTable, self).__excluded__:
-            raise AttributeError(f"{self.__class__} does not have attribute `{attr}`")
-        return super(PostgresTable, self).__getattribute__(attr)
-
     def _schemas(self) -> Dict[str, PostgresColumn]:
         """Generate raw configuration from schemas"""
         return {k: PostgresColumn(v) for k, v in self.ps_cols.items()}
 
+    def load_config(self, properties: Dict[str, Any]) -> None:
+        """
+        Load `schemas`, `primary_key`, `unique` and `foreign_key` of config and compute its version
+        once, the schemas, validator and foreign key caches of earlier version rebuild when they are
+        used. The config changes with this method only, not with its attributes.
+        """
+        self.ps_cols: Optional[Dict[str, Any]] = properties.pop('schemas', None)
+        self.ps_tbl_primary_key: list = self.get_str_or_list(properties, 'primary_key')
+        self.ps_tbl_unique = self.get_str_or_list(properties, 'unique')
+        self.ps_tbl_foreign_key = properties.pop('foreign_key', {})
+        self.ps_tbl_version: int = hash(repr((
+            self.ps_cols, self.ps_tbl_primary_key, self.ps_tbl_unique, self.ps_tbl_foreign_key
+        )))
+
     @property
-    def schemas(self):
-        """Mapping optional properties and raw schemas together"""
-        return self._schemas()
+    def config_version(self) -> int:
+        """Version of schemas config, it changes when `load_config` loads different columns or keys"""
+        return self.ps_tbl_version
+
+    @property
+    def schemas(self) -> Dict[str, PostgresColumn]:
+        """Mapping optional properties and raw schemas together, it parses once per `config_version`"""
+        version: int = self.ps_tbl_version
+        if self.ps_tbl_schemas is None or self.ps_tbl_schemas[0] != version:
+            self.ps_tbl_schemas = (version, self.merge_schemas(
+                self._schemas(), self.ps_tbl_primary_key, self.ps_tbl_unique, self.ps_tbl_foreign_key
+            ))
+        return self.ps_tbl_schemas[1]
+
+    @property
+    def indexes(self) -> Dict[str, str]:
+        """Mapping of index name and create index statement from `indexes` config"""
+        return {
+            idx_name: index_statement(self.tbl_name_full, idx_name, index)
+            for idx_name, index in self.ps_tbl_indexes.items()
+        }
+
+    def create_indexes(self, pool_size: int = 2) -> Dict[str, Dict[str, Any]]:
+        """
+        Create indexes from `indexes` config with `create index concurrently`, so writes to table
+        do not block, and `pool_size` indexes build at the same time. The index that exists in
+        `pg_indexes` will skip, but the invalid index, that leaves from failed concurrent build,
+        will drop and build again.
+        :return:
+        { <index-name>: {
+            status: str : ['exists', 'success', 'failed'],
+            duration (optional): float : <seconds>,
+            error (optional): str : <error-message>,
+            drop_error (optional): str : <error-message-of-drop-failed-index>
+            }
+        }
+        """
+        _existing: Dict[str, bool] = dict(PostgresConn.query(
+            self,
+            f"""select  ix.indexname, x.indisvalid
+            from    pg_catalog.pg_indexes                                   as ix
+            join    pg_catalog.pg_namespace                                 as n    on n.nspname = ix.schemaname
+            join    pg_catalog.pg_class                                     as i    on i.relname = ix.indexname
+                                                                                   and i.relnamespace = n.oid
+            join    pg_catalog.pg_index                                     as x    on x.indexrelid = i.oid
+            where   ix.schemaname = '{self.schema_name}' and ix.tablename = '{self.tbl_name}'""", 'list'
+        ))
+        results: Dict[str, Dict[str, Any]] = {
+            idx_name: {'status': 'exists'} for idx_name in self.ps_tbl_indexes if _existing.get(idx_name)
+        }
+
+        def _error(err: Exception) -> str:
+            return f"{type(err).__module__.removesuffix('.errors')}:{type(err).__name__}: {str(err).rstrip()}"
+
+        def _create_index(idx_name: str, statement: str) -> Dict[str, Any]:
+            result: Dict[str, Any] = {'status': 'success'}
+            start: float = time.perf_counter()
+            with pool.connection() as conn:
+                try:
+                    if idx_name in _existing:
+                        conn.execute(SQL(
+                            f"drop index concurrently if exists {self.db_name}.{self.schema_name}.{idx_name}"
+                        ))
+                    conn.execute(SQL(statement))
+                except Exception as err:
+                    result.update({'status': 'failed', 'error': _error(err)})
+                    try:
+                        conn.execute(SQL(
+                            f"drop index concurrently if exists {self.db_name}.{self.schema_name}.{idx_name}"
+                        ))
+                    except Exception as drop_err:
+                        result['drop_error'] = _error(drop_err)
+            result['duration'] = round(time.perf_counter() - start, 3)
+            return result
+
+        threads: List[Tuple[str, ThreadWithControl]] = []
+        with PostgresPool(self.db_conn, pool_size=pool_size) as pool:
+            for idx_name, statement in self.indexes.items():
+                if idx_name in results:
+                    continue
+                _thread = ThreadWithControl(target=capture_error(_create_index), args=(idx_name, statement))
+                _thread.daemon = True
+                _thread.start()
+                threads.append((idx_name, _thread))
+            for idx_name, _thread in threads:
+                if not isinstance(result := _thread.join(), dict):
+                    result = {
+                        'status': 'failed',
+                        'error': (
+                            _error(result) if isinstance(result, Exception)
+                            else f"Thread {_thread.name} does not return result"
+                        )
+                    }
+                results[idx_name] = result
+        return results
 
     @property
     def retention(self):
         return self.ps_tbl_retentions
 
-    def validate_mapping(self):
+    def purge(self, **kwargs) -> Dict[str, Any]:
+        """
+        Delete expired rows from `retentions` config with `delete_batches`, the row is expired when
+        the latest value of `retention_schemas` columns is older than `retention_value`. The keyset
+        column is `retention_key` or single primary key column or the first retention column.
+        """
+        _retentions: Dict[str, Any] = dict(self.ps_tbl_retentions or {})
+        _columns: list = [_ for _ in self.get_str_or_list(_retentions, 'retention_schemas') if _]
+        if not _columns or str(_value := _retentions.get('retention_value', 0)).strip() in {'', '0'}:
+            return {'deleted': 0, 'batches': 0, 'pauses': 0, 'duration': 0.0}
+        _primary_key: list = [k for k, v in self.schemas.items() if v.primary_key]
+        result: Dict[str, Any] = self.delete_batches(
+            f"""greatest({', '.join(_columns)}) < now() - interval '{(
+                f"{_value} days" if str(_value).strip().isdigit() else _value
+            )}'""",
+            _retentions.get('retention_key') or (_primary_key[0] if len(_primary_key) == 1 else _columns[0]),
+            batch_size=int(_retentions.get('retention_batch', 10000)),
+            **kwargs
+        )
+        if result['deleted']:
+            self.notify(self.channel, {'catalog': self.channel, 'action': 'purge', 'rows': result['deleted']})
+        return result
+
+    @property
+    def validator(self) -> FrameValidator:
+        """Validator of column constraints that compiles once per `config_version`"""
+        version: int = self.ps_tbl_version
+        if self.ps_tbl_validator is None or self.ps_tbl_validator[0] != version:
+            self.ps_tbl_validator = (version, FrameValidator(self.schemas, self.foreign_keys))
+        return self.ps_tbl_validator[1]
+
+    @property
+    def foreign_keys(self) -> Dict[str, KeyCache]:
+        """
+        Cache of reference keys for each foreign key column per `config_version`, the keys load
+        when it is used first
+        """
+        version: int = self.ps_tbl_version
+        if self.ps_tbl_foreign_keys is None or self.ps_tbl_foreign_keys[0] != version:
+            self.ps_tbl_foreign_keys = (version, {
+                col_name: KeyCache(self._reference_loader(column.foreign_key))
+                for col_name, column in self.schemas.items() if get_reference(column.foreign_key)[0]
+            })
+        return self.ps_tbl_foreign_keys[1]
+
+    def _reference_loader(self, reference: str) -> Callable[[Optional[Any]], list]:
+        """Loader of reference keys that greater than watermark for `KeyCache`"""
+        _ref_tbl, _ref_col = get_reference(reference)
+        _ref_names: list = reference.split('(')[0].strip().split('.')
+        _ref_tbl_full: str = f"{self.db_name}.{(_ref_names[-2] if len(_ref_names) > 1 else self.schema_name)}.{_ref_tbl}"
+
+        def _loader(watermark: Optional[Any]) -> list:
+            _condition: str = (
+                f""" where {_ref_col} > '{str(watermark).replace("'", "''")}'""" if watermark is not None else ''
+            )
+            return PostgresConn.query(self, f"select {_ref_col} from {_ref_tbl_full}{_condition}", 'list')
+        return _loader
+
+    def validate_frame(self, df: pd.DataFrame, refresh_keys: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Split batch to good rows and rejected rows with column constraints before load, the foreign
+        key values check with cache of reference keys, so the load can defer or drop foreign key
+        constraints. The `refresh_keys` will load new reference keys before validate.
+        """
+        if refresh_keys:
+            for cache in self.foreign_keys.values():
+                cache.refresh()
+        return self.validator.split(df)
+
+    def shadow_load(
+            self,
+            df: pd.DataFrame,
+            chunk_size: int = 50000,
+            pool_size: int = 4,
+            validate: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Full reload of table with shadow load, the dataframe copies to unlogged staging table,
+        that has only column definitions of table, with concurrent COPY. After that, constraints
+        and indexes rebuild on staging table, and it swaps with table by `rename` in one transaction,
+        so readers never see the half-loaded table, and the notification to `channel` of table
+        emits only when the swap commits. The foreign keys of other tables that reference table
+        drop and add again to the new table as `not valid` in the swap transaction, then they
+        validate after commit without blocking writes, and the constraint that does not validate
+        keeps `not valid` with its error in result. The table that views or materialized views
+        depend on does not load, the error raises before staging table creates because the views
+        would drop with table. The staging table drops, and the error raises without swap, when
+        any chunk of COPY, any constraint or index on staging table, or the swap fails.
+        raw-example
+        -----------
+            (i)     create unlogged table {table-name}_shadow (like {table-name} including defaults ...);
+                    copy {table-name}_shadow ({column-name}, ...) from stdin (format csv);
+                    alter table {table-name}_shadow add constraint {constraint-name}_shadow ..., ...;
+                    create index {index-name}_shadow on {table-name}_shadow ...;
+                    alter table {table-name}_shadow set logged;
+                    analyze {table-name}_shadow;
+                    begin;
+                        alter table {reference-table-name} drop constraint {foreign-key-name};
+                        drop table {table-name};
+                        alter table {table-name}_shadow rename to {table-name};
+                        alter table {table-name} rename constraint {constraint-name}_shadow to {constraint-name};
+                        alter index {index-name}_shadow rename to {index-name};
+                        alter table {reference-table-name} add constraint {foreign-key-name} ... not valid;
+                        select pg_notify('{schema-name}.{table-name}', '{"action": "shadow_load", ...}');
+                    commit;
+                    alter table {reference-table-name} validate constraint {foreign-key-name};
+        :return:
+        {   loaded: int : <number-of-copied-rows>,
+            rejected: pd.DataFrame : <rejected-rows-from-`validate_frame`>,
+            swapped: bool : <swap-success-flag>,
+            foreign_keys: { <schema-name>.<table-name>.<foreign-key-name>: str : ['valid', <error-message>] },
+            duration: float : <seconds>
+        }
+        """
+        result: Dict[str, Any] = {
+            'loaded': 0, 'rejected': df.iloc[0:0], 'swapped': False, 'foreign_keys': {}, 'duration': 0.0
+        }
+        start: float = time.perf_counter()
+        _dependents: Dict[str, Any] = self.dependents()
+        if _dependents['views']:
+            raise psycopg.errors.DependentObjectsStillExist(
+                f"Shadow load can not swap {self.tbl_name_full} because views depend on it: "
+                f"{', '.join(f'{kind} {name}' for name, kind in _dependents['views'].items())}"
+            )
+        if validate:
+            df, result['rejected'] = self.validate_frame(df, refresh_keys=True)
+        _definitions: Dict[str, Dict[str, str]] = self.definitions()
+        _shadow_name: str = f"{self.tbl_name}{self.SHADOW_SUFFIX}"
+        _shadow_name_full: str = f"{self.db_name}.{self.schema_name}.{_shadow_name}"
+        PostgresConn.execute(
+            self,
+            f"""drop table if exists {_shadow_name_full};
+            create unlogged table {_shadow_name_full} (like {self.tbl_name_full}
+            including defaults including identity including generated including storage including comments)"""
+        )
+        _shadow: TableObject = TableObject(self.db_conn, self.schema_name, _shadow_name)
+        try:
+            with PostgresPool(self.db_conn, pool_size=pool_size) as pool:
+                result['loaded'] = _shadow.copy_frame(df, pool, chunk_size=chunk_size)
+                if result['loaded'] != len(df):
+                    raise RuntimeError(
+                        f"Shadow load copies {result['loaded']} of {len(df)} rows to {_shadow_name_full}"
+                    )
+                if _definitions['constraints']:
+                    PostgresConn.execute(self, f"alter table {_shadow_name_full} " + ', '.join(
+                        f"add constraint {const_name}{self.SHADOW_SUFFIX} {const_def}"
+                        for const_name, const_def in _definitions['constraints'].items()
+                    ))
+
+                @capture_error
+                def _create_index(statement: str) -> str:
+                    with pool.connection() as conn:
+                        conn.execute(SQL(statement))
+                    return statement
+
+                threads: List[ThreadWithControl] = []
+                for idx_name, idx_def in _definitions['indexes'].items():
+                    _thread = ThreadWithControl(target=_create_index, args=(re.sub(
+                        r'^(create\s+(?:unique\s+)?index)\s+\S+\s+on\s+(only\s+)?\S+',
+                        lambda m: f"{m.group(1)} {idx_name}{self.SHADOW_SUFFIX} on {m.group(2) or ''}{_shadow_name_full}",
+                        idx_def, count=1, flags=re.IGNORECASE
+                    ),))
+                    _thread.daemon = True
+                    _thread.start()
+                    threads.append(_thread)
+                join_threads(threads)
+            PostgresConn.execute(self, f"alter table {_shadow_name_full} set logged; analyze {_shadow_name_full}")
+            _foreign_keys: List[Dict[str, str]] = _dependents['foreign_keys']
+            statements: List[Union[str, Composable]] = [
+                *(f"alter table {_fk['table_name']} drop constraint {_fk['constraint_name']};" for _fk in _foreign_keys),
+                f"drop table {self.tbl_name_full};",
+                f"alter table {_shadow_name_full} rename to {self.tbl_name};",
+                *(
+                    f"alter table {self.tbl_name_full} rename constraint {const_name}{self.SHADOW_SUFFIX} to {const_name};"
+                    for const_name in _definitions['constraints']
+                ),
+                *(
+                    f"alter index {self.db_name}.{self.schema_name}.{idx_name}{self.SHADOW_SUFFIX} rename to {idx_name};"
+                    for idx_name in _definitions['indexes']
+                ),
+                *(
+                    f"alter table {_fk['table_name']} add constraint {_fk['constraint_name']} "
+                    f"{self.NOT_VALID_REGEX.sub('', _fk['definition'])} not valid;"
+                    for _fk in _foreign_keys
+                ),
+                self.notify_statement(
+                    self.channel, {'catalog': self.channel, 'action': 'shadow_load', 'rows': result['loaded']}
+                ),
+            ]
+            with self.connect() as conn:
+                with conn.cursor() as cur:
+                    for statement in statements:
+                        cur.execute(statement if isinstance(statement, Composable) else SQL(statement))
+            result['swapped'] = True
+        except Exception:
+            PostgresConn.execute(self, f"drop table if exists {_shadow_name_full}")
+            raise
+
+        for _fk in _dependents['foreign_keys']:
+            _fk_name: str = f"{_fk['table_name']}.{_fk['constraint_name']}"
+            try:
+                PostgresConn.execute(
+                    self, f"alter table {_fk['table_name']} validate constraint {_fk['constraint_name']}"
+                )
+                result['foreign_keys'][_fk_name] = 'valid'
+            except psycopg.Error as err:
+                result['foreign_keys'][_fk_name] = (
+                    f"{type(err).__module__.removesuffix('.errors')}:{type(err).__name__}: {str(err).rstrip()}"
+                )
+        self.tbl_columns = self.generate_columns()
+        self.tbl_constraints = self.generate_constraints()
+        self.alive = self.exists
+        result['duration'] = round(time.perf_counter() - start, 3)
+        return result
+
+    def validate_mapping(self) -> Dict[str, Any]:
         """Validate between configuration and existing"""
-        pass
+        return compare_schemas(self.tbl_name_full, self.schemas, self.columns)
+
+    @staticmethod
+    def merge_schemas(
+            schemas: Dict[str, PostgresColumn],
+            primary_key: List[str],
+            unique: List[str],
+            foreign_key: Dict[str, str]
+    ) -> Dict[str, PostgresColumn]:
+        """Merge table constraints, `primary_key`, `unique` and `foreign_key`, to column objects"""
+        for col_name in primary_key:
+            if col_name in schemas:
+                schemas[col_name].ps_col_primary_key = True
+        for col_name in unique:
+            if col_name in schemas:
+                schemas[col_name].ps_col_unique = True
+        for col_name, reference in (foreign_key or {}).items():
+            if col_name in schemas:
+                schemas[col_name].ps_col_foreign_key = reference
+        return schemas
+
+    @classmethod
+    def split_catalog_name(cls, catalog_name: str) -> Tuple[str, str]:
+        """Split catalog name to schema name and table name"""
+        _cat_name: list = catalog_name.split(cls.CONF_DELIMITER)
+        _tbl_name: str = _cat_name.pop(-1)
+        return (_cat_name.pop(-1) if _cat_name else cls.SCHEMA_NAME), _tbl_name
 
     @staticmethod
     def get_str_or_list(props, key):
         return _return_key if isinstance((_return_key := props.pop(key, [])), list) else [_return_key]
+
+
+DATATYPE_ALIASES: Dict[str, str] = {
+    'int': 'integer', 'int4': 'integer', 'serial': 'integer', 'serial4': 'integer',
+    'int2': 'smallint', 'smallserial': 'smallint', 'serial2': 'smallint',
+    'int8': 'bigint', 'bigserial': 'bigint', 'serial8': 'bigint',
+    'decimal': 'numeric', 'float4': 'real', 'float8': 'double precision', 'float': 'double precision',
+    'bool': 'boolean', 'character varying': 'varchar', 'character': 'char',
+    'timestamp without time zone': 'timestamp', 'timestamptz': 'timestamp with time zone',
+    'time without time zone': 'time', 'timetz': 'time with time zone',
+}
+
+DATATYPE_REGEX = re.compile(r'^(?P<base>[a-z0-9_ ]+?)\s*(?P<args>\([\d\s,]*\))?\s*(?P<zone>with(?:out)? time zone)?$')
+
+
+def normalize_datatype(datatype: str) -> str:
+    """
+    Normalize datatype statement for comparison between configuration and database
+    example
+    -------
+        (i)     "varchar( 128 )"                    -> "varchar(128)"
+        (ii)    "serial"                            -> "integer"
+        (iii)   "timestamp(6) without time zone"    -> "timestamp"
+        (iv)    "integer ARRAY[4]"                  -> "array"
+    """
+    _datatype: str = ' '.join(datatype.lower().split())
+    if '[' in _datatype or 'array' in _datatype:
+        return 'array'
+    if not (match := DATATYPE_REGEX.match(_datatype)):
+        return _datatype
+    _base: str = DATATYPE_ALIASES.get((_base := match.group('base').strip()), _base)
+    _args: str = re.sub(r'\s', '', match.group('args') or '')
+    if _base.startswith('time') and _args == '(6)':
+        _args = ''
+    _base, _zone_alias, _ = _base.partition(' with time zone')
+    _zone: str = ' with time zone' if (_zone_alias or match.group('zone') == 'with time zone') else ''
+    return f"{_base}{_args}{_zone}"
+
+
+def get_reference(reference: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """Split foreign key reference, `<table-name>(<column-name>)`, to table name and column name"""
+    if reference and (match := re.match(r'^\s*([\w.]+)\s*\(\s*(\w+)\s*\)', reference)):
+        return match.group(1).split('.')[-1], match.group(2)
+    return None, None
+
+
+def column_statement(col_name: str, column: PostgresColumn) -> str:
+    """Generate column definition statement from configuration column object"""
+    return (
+        f"{col_name} {column.datatype}"
+        f"{('' if column.nullable and not column.primary_key else ' not null')}"
+        f"{(f' default {column.default}' if column.default else '')}"
+        f"{(f' check ({column.check})' if column.check else '')}"
+    )
+
+
+def index_statement(tbl_name_full: str, idx_name: str, index: Union[str, list, Dict[str, Any]]) -> str:
+    """Generate create index concurrently statement from configuration of index"""
+    _index: Dict[str, Any] = index if isinstance(index, dict) else {'columns': index}
+    _columns: list = _index['columns'] if isinstance(_index['columns'], list) else [_index['columns']]
+    _include: list = _index.get('include') or []
+    _include: list = _include if isinstance(_include, list) else [_include]
+    return (
+        f"create {('unique ' if str_to_bool(_index.get('unique', False)) else '')}index concurrently "
+        f"if not exists {idx_name} on {tbl_name_full} using {_index.get('method', 'btree')} ({', '.join(_columns)})"
+        f"{(f' include ({_include_columns})' if (_include_columns := ', '.join(_include)) else '')}"
+        f"{(f' where {_where}' if (_where := _index.get('where')) else '')}"
+    )
+
+
+def compare_schemas(
+        tbl_name_full: str,
+        schemas: Dict[str, PostgresColumn],
+        columns: Dict[str, ColumnObject]
+) -> Dict[str, Any]:
+    """
+    Compare configuration schemas with existing columns in database and generate minimal
+    statements, one `create table` or one `alter table` with many actions, that make database
+    match with configuration. Extra columns in database will report only because drop column
+    is not reversible.
+    :return:
+    {   catalog: <table-name>,
+        exists: bool : [True, False],
+        missing: [<column-name>, ...],
+        extra: [<column-name>, ...],
+        changed: { <column-name>: { <property>: {config: <value>, database: <value>} } },
+        statements: [<statement>, ...]
+    }
+    """
+    _primary_key: List[str] = [k for k, v in schemas.items() if v.primary_key]
+    results: Dict[str, Any] = {
+        'catalog': tbl_name_full,
+        'exists': bool(columns),
+        'missing': [k for k in schemas if k not in columns],
+        'extra': [k for k in columns if k not in schemas],
+        'changed': {},
+        'statements': []
+    }
+    if not columns:
+        _definitions: List[str] = [column_statement(k, v) for k, v in schemas.items()]
+        _definitions.extend(f"unique ({k})" for k, v in schemas.items() if v.unique and not v.primary_key)
+        if _primary_key:
+            _definitions.append(f"primary key ({', '.join(_primary_key)})")
+        for k, v in schemas.items():
+            if (ref := get_reference(v.foreign_key))[0]:
+                _definitions.append(f"foreign key ({k}) references {ref[0]}({ref[1]})")
+        results['statements'].append(f"create table {tbl_name_full} ( {', '.join(_definitions)} );")
+        return results
+
+    actions: List[str] = [f"add column {column_statement(k, schemas[k])}" for k in results['missing']]
+    for col_name, column in schemas.items():
+        if not (existing := columns.get(col_name)):
+            continue
+        changed: Dict[str, Dict[str, Any]] = {}
+        if normalize_datatype(column.datatype) != normalize_datatype(existing.col_datatype):
+            changed['datatype'] = {'config': column.datatype, 'database': existing.col_datatype}
+            actions.append(f"alter column {col_name} type {column.datatype} using {col_name}::{column.datatype}")
+        if (nullable := (column.nullable and not column.primary_key)) != existing.nullable:
+            changed['nullable'] = {'config': nullable, 'database': existing.nullable}
+            actions.append(f"alter column {col_name} {('drop' if nullable else 'set')} not null")
+        if column.default and existing.col_default is None and 'serial' not in column.datatype:
+            changed['default'] = {'config': column.default, 'database': None}
+            actions.append(f"alter column {col_name} set default {column.default}")
+        if column.unique and not column.primary_key and not existing.unique:
+            changed['unique'] = {'config': True, 'database': False}
+            actions.append(f"add unique ({col_name})")
+        if column.check and not existing.constraint_names('check'):
+            changed['check'] = {'config': column.check, 'database': None}
+            actions.append(f"add check ({column.check})")
+        _ref_tbl, _ref_col = get_reference(column.foreign_key)
+        if _ref_tbl and (_ref_tbl, _ref_col) != (existing.col_foreign_table_name, existing.col_foreign_column_name):
+            changed['foreign_key'] = {
+                'config': f'{_ref_tbl}({_ref_col})',
+                'database': (
+                    f'{existing.col_foreign_table_name}({existing.col_foreign_column_name})'
+                    if existing.col_foreign_table_name else None
+                )
+            }
+            actions.append(f"add foreign key ({col_name}) references {_ref_tbl}({_ref_col})")
+        if changed:
+            results['changed'][col_name] = changed
+
+    _existing_primary_key: List[str] = [k for k, v in columns.items() if v.col_primary_key]
+    if _primary_key and set(_primary_key) != set(_existing_primary_key):
+        for col_name in set(_primary_key) | set(_existing_primary_key):
+            results['changed'].setdefault(col_name, {})['primary_key'] = {
+                'config': col_name in _primary_key, 'database': col_name in _existing_primary_key
+            }
+        if _existing_primary_key and (
+                const_name := columns[_existing_primary_key[0]].constraint_names('primary key')
+        ):
+            actions.append(f"drop constraint {const_name[0]}")
+        actions.append(f"add primary key ({', '.join(_primary_key)})")
+    if actions:
+        results['statements'].append(f"alter table {tbl_name_full} {', '.join(actions)};")
+    return results
+
+
+def validate_catalogs(
+        catalogs: Dict[str, Dict[str, Any]],
+        db_conn: Optional[Dict[str, Any]] = None,
+        chunk_size: int = 50
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Validate configuration of many catalogs with existing tables in database without
+    create `PostgresTable`, that introspects two statements per table. The catalogs group
+    by schema and introspect `chunk_size` tables per statement with `SchemaObject`, and all
+    groups run concurrently with `ThreadWithControl`. The catalogs of group that fails to
+    introspect, like connection or permission error, report `error` without statements, so the
+    table that can not introspect does not report as missing table.
+    :param catalogs: mapping of catalog alias name and data like `conf/defaults/catalog_table.pg.yaml`
+    :return:
+    { <catalog-alias-name>: <result of `compare_schemas`, or with `error` when introspection fails> }
+    """
+    _db_conn: Dict[str, Any] = db_conn or CONF_DB['connection']
+    _schemas: Dict[str, Dict[str, Tuple[str, Dict[str, PostgresColumn]]]] = {}
+    for cat_name, cat_data in catalogs.items():
+        if not cat_data.get('type', '').endswith(PostgresTable.__name__):
+            continue
+        properties: Dict[str, Any] = dict(cat_data.get('properties', {}))
+        schema_name, tbl_name = PostgresTable.split_catalog_name(properties.pop('catalog_name', cat_name))
+        _schemas.setdefault(schema_name, {})[cat_name] = (tbl_name, PostgresTable.merge_schemas(
+            {k: PostgresColumn(v) for k, v in (properties.get('schemas') or {}).items()},
+            PostgresTable.get_str_or_list(properties, 'primary_key'),
+            PostgresTable.get_str_or_list(properties, 'unique'),
+            properties.get('foreign_key', {})
+        ))
+
+    threads: List[Tuple[str, Dict[str, Tuple[str, Dict[str, PostgresColumn]]], ThreadWithControl]] = []
+    for schema_name, schema_catalogs in _schemas.items():
+        for _catalogs in split_iterable(list(schema_catalogs.items()), chunk_size=chunk_size):
+            _thread = ThreadWithControl(
+                target=capture_error(SchemaObject(_db_conn, schema_name).generate_columns),
+                args=([tbl_name for tbl_name, _ in dict(_catalogs).values()],)
+            )
+            _thread.daemon = True
+            _thread.start()
+            threads.append((schema_name, dict(_catalogs), _thread))
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for schema_name, _catalogs, _thread in threads:
+        _columns: Union[Dict[str, Dict[str, ColumnObject]], Exception, None] = _thread.join()
+        for cat_name, (tbl_name, schemas) in _catalogs.items():
+            _tbl_name_full: str = f"{_db_conn['dbname']}.{schema_name}.{tbl_name}"
+            if isinstance(_columns, dict):
+                results[cat_name] = compare_schemas(_tbl_name_full, schemas, _columns.get(tbl_name, {}))
+                continue
+            results[cat_name] = {
+                'catalog': _tbl_name_full, 'exists': None, 'missing': [], 'extra': [], 'changed': {}, 'statements': [],
+                'error': (
+                    f"{type(_columns).__module__.removesuffix('.errors')}:{type(_columns).__name__}: "
+                    f"{str(_columns).rstrip()}" if isinstance(_columns, Exception)
+                    else f"Introspection of schema {schema_name} does not return columns"
+                )
+            }
+    return results
@@ -0,0 +1,182 @@
+import os
+import re
+import copy
+from typing import Any, Dict, Iterator, List, Optional
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+from src.core.utils.threader import maxThreads
+from .compression import detect_compression, read_frames, seek_table
+from .offsets import RowIndex
+
+ARROW_TYPES: Dict[str, pa.DataType] = {
+    'string': pa.string(), 'str': pa.string(), 'text': pa.string(), 'varchar': pa.string(), 'char': pa.string(),
+    'integer': pa.int64(), 'int': pa.int64(), 'bigint': pa.int64(), 'long': pa.int64(),
+    'smallint': pa.int32(), 'short': pa.int16(), 'byte': pa.int8(),
+    'float': pa.float64(), 'double': pa.float64(), 'double precision': pa.float64(), 'real': pa.float32(),
+    'number': pa.float64(), 'boolean': pa.bool_(), 'bool': pa.bool_(),
+    'date': pa.date32(), 'timestamp': pa.timestamp('us'), 'datetime': pa.timestamp('us'),
+    'time': pa.time64('us'),
+}
+PANDAS_TYPES: Dict[pa.DataType, Any] = {
+    pa.int64(): pd.Int64Dtype(), pa.int32(): pd.Int32Dtype(), pa.int16(): pd.Int16Dtype(),
+    pa.int8(): pd.Int8Dtype(), pa.bool_(): pd.BooleanDtype(),
+}
+DECIMAL_REGEX = re.compile(r'^(?:decimal|numeric)\s*\(\s*(\d+)\s*(?:,\s*(\d+)\s*)?\)$')
+
+# The file that larger than this size reads in blocks of `BLOCK_SIZE` bytes in constant memory
+STREAM_SIZE: int = 256 * 1024 * 1024
+BLOCK_SIZE: int = 64 * 1024 * 1024
+
+
+def arrow_type(datatype: Optional[str]) -> Optional[pa.DataType]:
+    """Convert datatype of catalog schema to Arrow type, return None when it does not support"""
+    if not datatype:
+        return None
+    _datatype: str = re.sub(r'\s+', ' ', datatype.strip().lower())
+    if match := DECIMAL_REGEX.match(_datatype):
+        return pa.decimal128(int(match.group(1)), int(match.group(2) or 0))
+    if _datatype in {'decimal', 'numeric'}:
+        return pa.float64()
+    return ARROW_TYPES.get(re.sub(r'\s*\(.*\)$', '', _datatype))
+
+
+def fill_defaults(batch: pa.RecordBatch, defaults: Dict[str, Any]) -> pa.RecordBatch:
+    """Fill null values of columns with default values that cast to type of column"""
+    if not defaults:
+        return batch
+    arrays: List[pa.Array] = []
+    for name, array in zip(batch.schema.names, batch.columns):
+        if name in defaults and array.null_count:
+            array = pc.fill_null(array, pa.scalar(str(defaults[name])).cast(array.type))
+        arrays.append(array)
+    return pa.RecordBatch.from_arrays(arrays, schema=batch.schema)
+
+
+def to_pandas(batches: List[pa.RecordBatch]) -> pd.DataFrame:
+    return pa.Table.from_batches(batches).to_pandas(
+        types_mapper=PANDAS_TYPES.get, split_blocks=True, self_destruct=True
+    )
+
+
+def read_blocks_arrow(
+        blocks: Iterator[bytes],
+        column_names: Optional[List[str]],
+        encoding: str,
+        parse_options: pa_csv.ParseOptions,
+        convert_options: pa_csv.ConvertOptions,
+        chunk_size: int = 100000
+) -> Iterator[pa.RecordBatch]:
+    """
+    Parse blocks of csv file with multithreaded reader, like frames of zstd file or byte ranges
+    of row index, the names and types of columns from the first block use with next blocks, so
+    the column that does not have type in `convert_options` infers once like Arrow reader of whole
+    file and all batches have the same schema, and the part of line at the end of block carries to
+    next block
+    """
+    names: Optional[List[str]] = column_names
+    options: pa_csv.ConvertOptions = convert_options
+    carry: bytes = b''
+
+    def _parse(data: bytes) -> Iterator[pa.RecordBatch]:
+        nonlocal names, options
+        table: pa.Table = pa_csv.read_csv(
+            pa.BufferReader(data),
+            read_options=pa_csv.ReadOptions(
+                column_names=names, encoding=encoding, use_threads=True, block_size=8 * 1024 * 1024
+            ),
+            parse_options=parse_options,
+            convert_options=options
+        )
+        if options is convert_options:
+            names = table.schema.names
+            options = copy.copy(convert_options)
+            options.column_types = {field.name: field.type for field in table.schema}
+        yield from table.to_batches(max_chunksize=chunk_size)
+
+    for block in blocks:
+        if (end := (data := carry + block).rfind(b'\n') + 1) == 0:
+            carry = data
+            continue
+        carry = data[end:]
+        yield from _parse(data[:end])
+    if carry.strip():
+        yield from _parse(carry)
+
+
+def read_bytes_arrow(
+        data: bytes,
+        column_names: List[str],
+        column_types: Optional[Dict[str, pa.DataType]] = None,
+        defaults: Optional[Dict[str, Any]] = None,
+        encoding: str = 'utf-8',
+        delimiter: str = ',',
+) -> pd.DataFrame:
+    """Parse records of csv file, that do not have header, with explicit types of columns"""
+    batches: List[pa.RecordBatch] = [
+        fill_defaults(batch, defaults or {}) for batch in read_blocks_arrow(
+            iter([data]), column_names, encoding, pa_csv.ParseOptions(delimiter=delimiter), pa_csv.ConvertOptions(
+                column_types=column_types or {}, strings_can_be_null=True, quoted_strings_can_be_null=False
+            )
+        )
+    ]
+    if not batches:
+        return pd.DataFrame(columns=column_names)
+    return to_pandas(batches)
+
+
+def read_csv_arrow(
+        path: str,
+        column_types: Optional[Dict[str, pa.DataType]] = None,
+        defaults: Optional[Dict[str, Any]] = None,
+        column_names: Optional[List[str]] = None,
+        encoding: str = 'utf-8',
+        delimiter: str = ',',
+        chunk_size: int = 100000,
+        stream_size: int = STREAM_SIZE
+) -> Iterator[pd.DataFrame]:
+    """
+    Read csv file to batches of `chunk_size` rows with Arrow csv engine and explicit types of columns,
+    so it does not infer types. The file reads with multithreaded reader, but the file that larger
+    than `stream_size` bytes splits to blocks of `BLOCK_SIZE` bytes with row index, so it reads in
+    constant memory and each block still parses with multithreaded reader. The integer and boolean
+    columns convert to nullable types of pandas, so null does not change type. The gzip or zstd file
+    decompresses while parsing, and the frames of zstd file with seek table decompress in parallel.
+    :param column_names: names of columns when file does not have header
+    """
+    read_options = pa_csv.ReadOptions(
+        column_names=column_names, encoding=encoding, use_threads=True, block_size=8 * 1024 * 1024
+    )
+    parse_options = pa_csv.ParseOptions(delimiter=delimiter)
+    convert_options = pa_csv.ConvertOptions(
+        column_types=column_types or {}, strings_can_be_null=True, quoted_strings_can_be_null=False
+    )
+    if (compression := detect_compression(path)) == 'zstd' and seek_table(path):
+        batches: Iterator[pa.RecordBatch] = read_blocks_arrow(
+            read_frames(path), column_names, encoding, parse_options, convert_options, chunk_size=chunk_size
+        )
+    elif compression is None and os.path.getsize(path) > stream_size:
+        batches: Iterator[pa.RecordBatch] = read_blocks_arrow(
+            RowIndex.get(path).blocks(BLOCK_SIZE), column_names, encoding, parse_options, convert_options,
+            chunk_size=chunk_size
+        )
+    elif compression:
+        batches: Iterator[pa.RecordBatch] = pa_csv.open_csv(
+            pa.input_stream(path, compression=compression),
+            read_options=read_options, parse_options=parse_options, convert_options=convert_options
+        )
+    else:
+        batches: Iterator[pa.RecordBatch] = iter(pa_csv.read_csv(
+            path, read_options=read_options, parse_options=parse_options, convert_options=convert_options
+        ).to_batches(max_chunksize=chunk_size))
+
+    buffer: List[pa.RecordBatch] = []
+    rows: int = 0
+    for batch in batches:
+        buffer.append(fill_defaults(batch, defaults or {}))
+        if (rows := rows + batch.num_rows) >= chunk_size:
+            yield to_pandas(buffer)
+            buffer, rows = [], 0
+    if buffer:
+        yield to_pandas(buffer)
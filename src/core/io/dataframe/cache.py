@@ -0,0 +1,132 @@
+import os
+import uuid
+import hashlib
+import threading
+from typing import Callable, Iterator, List, Optional
+import pandas as pd
+import pyarrow as pa
+from .arrow import PANDAS_TYPES
+
+
+class ColumnarCache:
+    """
+    Columnar cache of parsed files in Arrow IPC (Feather v2) format, the entry keys by path,
+    size and modified time of source file and hash of schema, so the source file or schema
+    that changes will miss cache. The hit entry reads with memory map instead of parse source
+    file again, and the least recently used entries evict when size of cache is over `budget`.
+    usage:
+        >> cache = ColumnarCache('data/sandbox/cache', budget=1024 ** 3)
+        >> for df in cache.read('customer_2022.csv', schema_hash, read_batches):
+        >>     print(len(df))
+    """
+    SUFFIX: str = '.arrow'
+
+    def __init__(self, cache_path: str, budget: int = 1024 ** 3):
+        self.cache_path: str = cache_path
+        self.budget: int = budget
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _hash(value: str) -> str:
+        return hashlib.sha1(value.encode('utf-8')).hexdigest()[:20]
+
+    def entry(self, path: str, schema_hash: str) -> str:
+        """Path of cache entry, the prefix of name is hash of source path for find stale entries"""
+        _stat: os.stat_result = os.stat(path := os.path.abspath(path))
+        return os.path.join(self.cache_path, (
+            f"{self._hash(path)}-{self._hash(f'{_stat.st_size}|{_stat.st_mtime_ns}|{schema_hash}')}{self.SUFFIX}"
+        ))
+
+    @property
+    def entries(self) -> List[os.DirEntry]:
+        if not os.path.isdir(self.cache_path):
+            return []
+        return [_ for _ in os.scandir(self.cache_path) if _.is_file() and _.name.endswith(self.SUFFIX)]
+
+    @property
+    def size(self) -> int:
+        return sum(_.stat().st_size for _ in self.entries)
+
+    def get(self, path: str, schema_hash: str) -> Optional[pa.Table]:
+        """Memory map cache entry of source file, return None when it does not exist"""
+        if not os.path.exists(entry := self.entry(path, schema_hash)):
+            return None
+        try:
+            os.utime(entry)
+            return pa.ipc.open_file(pa.memory_map(entry)).read_all()
+        except (OSError, pa.ArrowInvalid):
+            return None
+
+    def read(
+            self,
+            path: str,
+            schema_hash: str,
+            read_batches: Callable[[str], Iterator[pd.DataFrame]],
+            chunk_size: int = 100000
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Read batches from cache entry, or from `read_batches` of source file that writes each batch
+        to new cache entry, the entry will move to cache when all batches were read only
+        """
+        if (table := self.get(path, schema_hash)) is not None:
+            for batch in table.to_batches(max_chunksize=chunk_size):
+                yield batch.to_pandas(types_mapper=PANDAS_TYPES.get)
+            return
+        entry: str = self.entry(path, schema_hash)
+        os.makedirs(self.cache_path, exist_ok=True)
+        tmp: str = f"{entry}.{uuid.uuid4().hex}.tmp"
+        writer: Optional[pa.ipc.RecordBatchFileWriter] = None
+        schema: Optional[pa.Schema] = None
+        caching: bool = True
+        try:
+            for df in read_batches(path):
+                if caching:
+                    try:
+                        # The string columns of batch can be chunked arrays, so it converts to table
+                        table: pa.Table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+                        if writer is None:
+                            schema = table.schema
+                            writer = pa.ipc.new_file(tmp, schema)
+                        writer.write_table(table)
+                    except (pa.ArrowException, ValueError, TypeError):
+                        # The batch that does not convert to schema of first batch will stop caching
+                        caching = False
+                yield df
+            if caching and writer:
+                writer.close()
+                writer = None
+                os.replace(tmp, entry)
+                self.evict(keep=entry)
+        finally:
+            if writer:
+                writer.close()
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """
+        Remove stale entries of source file of `keep` entry, and remove least recently used
+        entries until size of cache is not over `budget`
+        """
+        removed: List[str] = []
+        with self.lock:
+            entries: List[os.DirEntry] = self.entries
+            if keep:
+                _prefix: str = os.path.basename(keep).split('-')[0]
+                for _ in [_ for _ in entries if _.name.startswith(f'{_prefix}-') and _.path != keep]:
+                    removed.append(_.path)
+                    entries.remove(_)
+            _stats: list = sorted(
+                ((_.stat(), _.path) for _ in entries), key=lambda _: _[0].st_mtime_ns, reverse=True
+            )
+            total: int = 0
+            for _stat, _path in _stats:
+                total += _stat.st_size
+                if total > self.budget and _path != keep:
+                    removed.append(_path)
+            for _path in removed:
+                try:
+                    os.remove(_path)
+                except FileNotFoundError:
+                    continue
+        return removed
@@ -0,0 +1,204 @@
+import io
+import os
+import gzip
+import struct
+import uuid
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+import pandas as pd
+import zstandard as zstd
+from src.core.utils.threader import maxThreads, prefetch
+
+COMPRESSIONS: Dict[str, str] = {'.gz': 'gzip', '.gzip': 'gzip', '.zst': 'zstd', '.zstd': 'zstd'}
+EXTENSIONS: Dict[str, str] = {'gzip': '.gz', 'zstd': '.zst'}
+MAGIC_NUMBERS: Dict[bytes, str] = {b'\x1f\x8b': 'gzip', b'\x28\xb5\x2f\xfd': 'zstd'}
+
+# Seek table of zstd seekable format that keeps in skippable frame at the end of file
+SKIPPABLE_MAGIC: int = 0x184D2A5E
+SEEKABLE_MAGIC: int = 0x8F92EAB1
+SEEK_FOOTER_SIZE: int = 9
+
+
+def detect_compression(path: str) -> Optional[str]:
+    """Compression of file from extension, or from magic bytes when extension is unknown"""
+    if compression := COMPRESSIONS.get(os.path.splitext(path)[1].lower()):
+        return compression
+    with open(path, mode='rb') as f:
+        head: bytes = f.read(4)
+    return next((compression for magic, compression in MAGIC_NUMBERS.items() if head.startswith(magic)), None)
+
+
+def strip_compression(path: str) -> str:
+    """Remove compression extension from path, `cutomer_2022.csv.zst` to `cutomer_2022.csv`"""
+    _path, ext = os.path.splitext(path)
+    return _path if ext.lower() in COMPRESSIONS else path
+
+
+def open_compressed(path: str, compression: Optional[str] = None) -> BinaryIO:
+    """Open file as binary stream that decompresses while reading, the compression detects from file"""
+    if (compression := compression or detect_compression(path)) == 'gzip':
+        return gzip.open(path, mode='rb')
+    if compression == 'zstd':
+        return zstd.ZstdDecompressor().stream_reader(open(path, mode='rb'), read_across_frames=True, closefd=True)
+    return open(path, mode='rb')
+
+
+def seek_table(path: str) -> Optional[List[Tuple[int, int]]]:
+    """
+    Compressed and decompressed size of each frame from seek table of zstd seekable format,
+    return None when file does not have seek table
+    """
+    if (size := os.path.getsize(path)) < SEEK_FOOTER_SIZE + 8:
+        return None
+    with open(path, mode='rb') as f:
+        f.seek(size - SEEK_FOOTER_SIZE)
+        frames, descriptor, magic = struct.unpack('<IBI', f.read(SEEK_FOOTER_SIZE))
+        entry_size: int = 12 if descriptor & 0x80 else 8
+        if magic != SEEKABLE_MAGIC or (table_size := 8 + frames * entry_size + SEEK_FOOTER_SIZE) > size:
+            return None
+        f.seek(size - table_size)
+        skippable, frame_size = struct.unpack('<II', f.read(8))
+        if skippable != SKIPPABLE_MAGIC or frame_size != table_size - 8:
+            return None
+        entries: bytes = f.read(frames * entry_size)
+    return [struct.unpack_from('<II', entries, i * entry_size) for i in range(frames)]
+
+
+def read_frames(path: str, workers: int = maxThreads) -> Iterator[bytes]:
+    """
+    Decompress frames of zstd file with seek table in parallel threads, the frames yield in order
+    of file, or decompress file as one block when it does not have seek table
+    """
+    if not (table := seek_table(path)):
+        with open_compressed(path) as f:
+            yield f.read()
+        return
+    offsets: List[Tuple[int, int]] = []
+    offset: int = 0
+    for compressed_size, _ in table:
+        offsets.append((offset, compressed_size))
+        offset += compressed_size
+
+    def _decompress(frame: Tuple[int, int]) -> bytes:
+        with open(path, mode='rb') as f:
+            f.seek(frame[0])
+            return zstd.ZstdDecompressor().decompress(f.read(frame[1]))
+
+    yield from prefetch(_decompress, offsets, workers=workers)
+
+
+def seek_table_frame(frames: List[Tuple[int, int]]) -> bytes:
+    """Skippable frame of seek table with compressed and decompressed size of frames"""
+    entries: bytes = b''.join(struct.pack('<II', *frame) for frame in frames)
+    footer: bytes = struct.pack('<IBI', len(frames), 0, SEEKABLE_MAGIC)
+    return struct.pack('<II', SKIPPABLE_MAGIC, len(entries) + len(footer)) + entries + footer
+
+
+class CompressedWriter:
+    """
+    Binary writer of file with atomic replace, the data writes to temporary file with buffer of
+    `buffer_size` bytes and moves to path on `commit`. The zstd compression writes each `write`
+    as independent frame with multithreaded compressor and appends seek table on `finish`, so
+    the frames of file can decompress in parallel with `read_frames`.
+    usage:
+        >> with CompressedWriter('data/sandbox/local/customer/cutomer_2023.csv.zst') as writer:
+        >>     writer.write(b'customer_id,customer_name\n')
+    """
+
+    def __init__(
+            self,
+            path: str,
+            compression: Optional[str] = 'zstd',
+            level: int = 3,
+            workers: int = maxThreads,
+            buffer_size: int = io.DEFAULT_BUFFER_SIZE
+    ):
+        self.path: str = path
+        self.compression: Optional[str] = compression
+        self.tmp: str = f"{path}.{uuid.uuid4().hex}.tmp"
+        self.frames: List[Tuple[int, int]] = []
+        self.compressor = (
+            zstd.ZstdCompressor(level=level, threads=workers, write_content_size=True)
+            if compression == 'zstd' else None
+        )
+        self.raw: BinaryIO = open(self.tmp, mode='wb', buffering=max(buffer_size, io.DEFAULT_BUFFER_SIZE))
+        self.f: BinaryIO = (
+            gzip.GzipFile(os.path.basename(path), mode='wb', compresslevel=min(level, 9), fileobj=self.raw)
+            if compression == 'gzip' else self.raw
+        )
+
+    @property
+    def size(self) -> int:
+        """
+        Bytes that wrote to file, or uncompressed bytes of gzip file because the compressed data
+        keeps in compressor until it closes
+        """
+        return self.f.tell()
+
+    def write(self, data: bytes) -> None:
+        if self.compressor is not None:
+            data_compressed: bytes = self.compressor.compress(data)
+            self.frames.append((len(data_compressed), len(data)))
+            data = data_compressed
+        self.f.write(data)
+
+    def finish(self) -> None:
+        """Write seek table of zstd file and close file, the file keeps temporary until `replace`"""
+        if self.raw.closed:
+            return
+        if self.compressor is not None:
+            self.f.write(seek_table_frame(self.frames))
+        self.f.close()
+        self.raw.close()
+
+    def replace(self) -> str:
+        os.replace(self.tmp, self.path)
+        return self.path
+
+    def commit(self) -> str:
+        self.finish()
+        return self.replace()
+
+    def abort(self) -> None:
+        """Close and remove temporary file without write to path"""
+        try:
+            self.f.close()
+            self.raw.close()
+        finally:
+            if os.path.exists(self.tmp):
+                os.remove(self.tmp)
+
+    def __enter__(self) -> 'CompressedWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            try:
+                self.commit()
+                return
+            except BaseException:
+                self.abort()
+                raise
+        self.abort()
+
+
+def write_csv(
+        batches: Iterable[pd.DataFrame],
+        path: str,
+        compression: Optional[str] = 'zstd',
+        level: int = 3,
+        workers: int = maxThreads,
+        header: bool = True,
+        encoding: str = 'utf-8',
+        **options: Any
+) -> int:
+    """
+    Write batches to csv file with atomic replace, the zstd compression writes each batch as
+    independent frame with `CompressedWriter`, so the frames of file can decompress in parallel
+    with `read_frames`. Return number of rows.
+    """
+    rows: int = 0
+    with CompressedWriter(path, compression=compression, level=level, workers=workers) as writer:
+        for i, df in enumerate(batches):
+            writer.write(df.to_csv(index=False, header=(header and i == 0), **options).encode(encoding))
+            rows += len(df)
+    return rows
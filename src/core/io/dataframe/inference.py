@@ -0,0 +1,211 @@
+import io
+import os
+import mmap
+import argparse
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import yaml
+import pandas as pd
+from .compression import detect_compression, open_compressed, strip_compression
+from .offsets import RowIndex
+
+# The sample reads `SAMPLE_RANGES` byte ranges of `RANGE_SIZE` bytes that spread over file
+SAMPLE_RANGES: int = 32
+RANGE_SIZE: int = 256 * 1024
+
+INTEGER_REGEX: str = r'[+-]?(?:0|[1-9]\d*)'
+FLOAT_REGEX: str = r'[+-]?(?:\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?|nan|inf|infinity)'
+DATE_REGEX: str = r'\d{4}-\d{2}-\d{2}'
+TIMESTAMP_REGEX: str = r'\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?'
+INT32_MAX: int = 2 ** 31 - 1
+
+
+def _is_iso(value: str) -> bool:
+    try:
+        datetime.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _matches(values: pd.Series, regex: str) -> pd.Series:
+    return values.str.fullmatch(regex, case=False).fillna(False).astype(bool)
+
+
+def _matches_iso(values: pd.Series, regex: str) -> pd.Series:
+    """Values that match regex and parse to date or timestamp, only values that match regex parse"""
+    if (matches := _matches(values, regex)).any():
+        matches[matches] = values[matches].map(_is_iso).astype(bool)
+    return matches
+
+
+# The datatypes of catalog schema that check in order, each check returns values that match
+# type, and the integer with leading zero, like phone number `0812`, does not match number
+DATATYPES: List[Tuple[str, Callable[[pd.Series], pd.Series]]] = [
+    ('boolean', lambda values: values.str.lower().isin(['true', 'false'])),
+    ('integer', lambda values: _matches(values, INTEGER_REGEX) & (
+        pd.to_numeric(values, errors='coerce').abs() <= INT32_MAX
+    )),
+    ('bigint', lambda values: _matches(values, INTEGER_REGEX)),
+    ('double', lambda values: _matches(values, FLOAT_REGEX) & ~_matches(values, r'[+-]?0\d+(?:\.\d*)?')),
+    ('date', lambda values: _matches_iso(values, DATE_REGEX)),
+    ('timestamp', lambda values: _matches_iso(values, TIMESTAMP_REGEX)),
+]
+
+
+def _records(data: bytes, first: bool, last: bool) -> bytes:
+    """Complete records of byte range, the part of record at start and end of range drops"""
+    start: int = 0 if first else data.find(b'\n') + 1
+    end: int = len(data) if last else data.rfind(b'\n') + 1
+    return data[start:end] if end > start else b''
+
+
+def sample_ranges(path: str, ranges: int = SAMPLE_RANGES, range_size: int = RANGE_SIZE) -> List[bytes]:
+    """
+    Sample byte ranges that spread over file with memory map, each range keeps only complete
+    records and the first range starts at the first line of file. The ranges split on records
+    of row index when file has index, and the compressed file samples only from its start.
+    """
+    if detect_compression(path):
+        with open_compressed(path) as f:
+            return [_records(data := f.read(ranges * range_size), True, len(data) < ranges * range_size)]
+    if (size := os.path.getsize(path)) <= ranges * range_size:
+        with open(path, mode='rb') as f:
+            return [f.read()]
+    if (index := RowIndex.load(path)) is not None and index.rows > ranges * index.stride:
+        step: int = index.rows // ranges
+        return [index.read(0, index.stride), *(index.read(i * step, index.stride) for i in range(1, ranges))]
+    starts: List[int] = [i * (size - range_size) // (ranges - 1) for i in range(ranges)]
+    with open(path, mode='rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return [_records(mm[start:start + range_size], start == 0, start + range_size >= size) for start in starts]
+
+
+def parse_sample(
+        blocks: List[bytes],
+        header: Optional[bool] = None,
+        encoding: str = 'utf-8',
+        delimiter: str = ','
+) -> Tuple[pd.DataFrame, bool]:
+    """
+    Parse sampled ranges to dataframe of string values, the range that can not parse, like
+    range that starts in quoted value, skips. The `header` detects from the first line when
+    it is None. Return dataframe and header of file.
+    """
+    options: Dict[str, Any] = {
+        'dtype': str, 'keep_default_na': False, 'na_values': [''], 'sep': delimiter, 'encoding': encoding,
+        'index_col': False, 'skipinitialspace': True,
+    }
+    first: pd.DataFrame = pd.read_csv(io.BytesIO(blocks[0]), header=None, on_bad_lines='skip', **options)
+    if header is None:
+        header = detect_header(first)
+    names: List[str] = (
+        [str(name).strip() for name in first.iloc[0]] if header
+        else [f'column_{i + 1}' for i in range(first.shape[1])]
+    )
+    frames: List[pd.DataFrame] = [first.iloc[int(header):].set_axis(names, axis=1)]
+    for block in blocks[1:]:
+        try:
+            frames.append(pd.read_csv(
+                io.BytesIO(block), header=None, names=names, on_bad_lines='skip', **options
+            ))
+        except (pd.errors.ParserError, ValueError):
+            continue
+    return pd.concat(frames, ignore_index=True), header
+
+
+def detect_header(df: pd.DataFrame) -> bool:
+    """
+    The first row is header when all its values are not null and are string, like names of
+    columns, so the file that first row has number, even with leading zero, boolean or date
+    does not have header
+    """
+    if df.empty or (first := df.iloc[0]).isna().any() or _matches(first.astype(str).str.strip(), FLOAT_REGEX).any():
+        return False
+    return all(infer_datatype(pd.Series([value], dtype=object)) == 'string' for value in first)
+
+
+def infer_datatype(values: pd.Series, tolerance: int = 0) -> str:
+    """
+    Datatype of catalog schema of string values, the value that is null does not check, and
+    `tolerance` values that do not match type can skip, like record that range of sample
+    starts in its quoted value
+    """
+    if (values := values.dropna().str.strip()).empty:
+        return 'string'
+    for datatype, check in DATATYPES:
+        if len(values) - int(check(values).sum()) <= min(tolerance, len(values) // 100):
+            return datatype
+    return 'string'
+
+
+def infer_schemas(df: pd.DataFrame, tolerance: int = 0) -> Dict[str, Dict[str, str]]:
+    """
+    Schemas of catalog from sampled values, the column that has null in sample is nullable, and
+    the description keeps cardinality of column in sample. The integer value with leading zero,
+    like phone number `0812`, infers as string so it keeps the zero.
+    """
+    schemas: Dict[str, Dict[str, str]] = {}
+    for col in df.columns:
+        values: pd.Series = df[col].dropna()
+        distinct: int = int(values.nunique())
+        cardinality: str = (
+            'unique' if distinct == len(values) and distinct > 1
+            else 'low' if distinct <= max(len(values) // 100, 10) else 'high'
+        )
+        schemas[col] = {
+            'datatype': infer_datatype(values, tolerance=tolerance),
+            'nullable': 'true' if len(values) < len(df) else 'false',
+            'description': f"Inferred from {len(df)} sampled rows, {distinct} distinct values ({cardinality})",
+        }
+    return schemas
+
+
+def infer_catalog(
+        path: str,
+        catalog_name: Optional[str] = None,
+        header: Optional[bool] = None,
+        encoding: str = 'utf-8',
+        delimiter: str = ',',
+        ranges: int = SAMPLE_RANGES,
+        range_size: int = RANGE_SIZE,
+        type_name: str = 'src.core.io.storage.LocalCSVFile'
+) -> Dict[str, Any]:
+    """
+    Configuration of `LocalCSVFile` catalog from sampled byte ranges of csv file, so it infers
+    schemas of large file without read whole file.
+    usage:
+        >> infer_catalog('data/sandbox/local/customer/cutomer_2022.csv', 'sandbox/local/customer/cutomer_{year}')
+        {'type': 'src.core.io.storage.LocalCSVFile', 'properties': {'catalog_name': ..., 'schemas': {...}}}
+    """
+    blocks: List[bytes] = sample_ranges(path, ranges, range_size)
+    df, _header = parse_sample(blocks, header, encoding, delimiter)
+    return {
+        'type': type_name,
+        'properties': {
+            'catalog_name': catalog_name or os.path.splitext(strip_compression(path))[0],
+            'catalog_type': 'csv',
+            'schemas': infer_schemas(df, tolerance=len(blocks) - 1),
+            'header': str(_header).lower(),
+            'encoding': encoding,
+            'delimiter': delimiter,
+        },
+        'retentions': {'retention_schemas': [], 'retention_value': 0},
+    }
+
+
+def dump_catalog(name: str, catalog: Dict[str, Any]) -> str:
+    """Dump catalog configuration to yaml with indent of `conf/defaults` files"""
+    return yaml.safe_dump({name: catalog}, indent=5, sort_keys=False, default_flow_style=False, allow_unicode=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Infer LocalCSVFile catalog yaml from sample of csv file')
+    parser.add_argument('path')
+    parser.add_argument('--name', default='catalog_file')
+    parser.add_argument('--catalog-name', default=None)
+    parser.add_argument('--delimiter', default=',')
+    parser.add_argument('--encoding', default='utf-8')
+    args = parser.parse_args()
+    print(dump_catalog(args.name, infer_catalog(
+        args.path, catalog_name=args.catalog_name, encoding=args.encoding, delimiter=args.delimiter
+    )), end='')
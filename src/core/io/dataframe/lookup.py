@@ -0,0 +1,149 @@
+import threading
+from typing import Any, Callable, Optional, Union
+import numpy as np
+import pandas as pd
+
+ArrayLike = Union[np.ndarray, pd.Series, pd.Index, list]
+
+
+class KeyCache:
+    """
+    Cache of key values from reference column for check or resolve foreign key values of
+    batch without lookup per row. The keys keep in NumPy array, sorted when it is numeric,
+    with hash index of pandas for vectorized lookup.
+
+    The `loader` receives the watermark, the maximum key in cache or None for first load,
+    and returns only new keys, array of keys or two columns array of (key, value) when the
+    cache resolves key to another value like surrogate key. So the incremental refresh
+    does not see deleted or updated keys in reference table, use `reload` for that case.
+    Only integer keys, like serial key, refresh incrementally, the other keys, like uuid or
+    string, that new key may not be greater than maximum key, or that order of database
+    collation is not order of Python, reload all keys with None watermark.
+    usage:
+        >> cache = KeyCache(lambda watermark: table.select_keys('customer_id', watermark))
+        >> cache.contains(df['cust_id'])
+        array([ True,  True, False])
+        >> cache.refresh()
+        12
+    """
+
+    def __init__(self, loader: Callable[[Optional[Any]], ArrayLike]):
+        self.loader: Callable[[Optional[Any]], ArrayLike] = loader
+        self.keys: Optional[np.ndarray] = None
+        self.values: Optional[np.ndarray] = None
+        self.index: Optional[pd.Index] = None
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return 0 if self.keys is None else len(self.keys)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(keys={len(self)}, nbytes={self.nbytes})'
+
+    @property
+    def loaded(self) -> bool:
+        return self.keys is not None
+
+    @property
+    def numeric(self) -> bool:
+        return self.keys is not None and self.keys.dtype.kind in 'iuf'
+
+    @property
+    def nbytes(self) -> int:
+        return sum(_.nbytes for _ in (self.keys, self.values) if _ is not None)
+
+    @property
+    def incremental(self) -> bool:
+        return self.keys is not None and self.keys.dtype.kind in 'iu'
+
+    @property
+    def watermark(self) -> Optional[Any]:
+        if not len(self) or not self.incremental:
+            return None
+        return self.keys[-1]
+
+    def reload(self) -> int:
+        """Load all keys from reference column again"""
+        with self.lock:
+            self.keys, self.values, self.index = None, None, None
+        return self.refresh()
+
+    def refresh(self) -> int:
+        """
+        Load new keys that greater than watermark and merge to cache, or all keys when keys are not
+        integer, return number of new keys
+        """
+        with self.lock:
+            loaded: np.ndarray = np.asarray(self.loader(self.watermark), dtype=object)
+            if loaded.ndim == 2:
+                keys, values = loaded[:, 0], (loaded[:, 1] if loaded.shape[1] > 1 else None)
+            else:
+                keys, values = loaded.reshape(-1), None
+            keys: np.ndarray = pd.Series(keys, dtype=object).infer_objects().to_numpy()
+            before: int = len(self)
+            if not before or not self.incremental:
+                self._build(keys, values)
+            elif keys.size:
+                self._merge(keys, values)
+            return len(self) - before
+
+    def _build(self, keys: np.ndarray, values: Optional[np.ndarray]) -> None:
+        if keys.dtype.kind in 'iuf':
+            order: np.ndarray = np.argsort(keys, kind='stable')
+            keys = keys[order]
+            values = values[order] if values is not None else None
+            unique: np.ndarray = np.ones(len(keys), dtype=bool)
+            unique[1:] = keys[1:] != keys[:-1]
+            self.keys, self.values = keys[unique], (values[unique] if values is not None else None)
+            self.index = pd.Index(self.keys)
+        else:
+            index: pd.Index = pd.Index(keys, dtype=object)
+            unique: np.ndarray = ~index.duplicated(keep='last')
+            self.index = index[unique]
+            self.keys = self.index.to_numpy()
+            self.values = values[unique] if values is not None else None
+
+    def _merge(self, keys: np.ndarray, values: Optional[np.ndarray]) -> None:
+        """Merge new keys, the numeric keys that all greater than watermark append without sorting again"""
+        if self.numeric and keys.dtype.kind in 'iuf':
+            order: np.ndarray = np.argsort(keys, kind='stable')
+            if keys[order[0]] > self.keys[-1] and (keys.size == 1 or (np.diff(keys[order]) != 0).all()):
+                self.keys = np.concatenate([self.keys, keys[order]])
+                self.index = pd.Index(self.keys)
+                if self.values is not None and values is not None:
+                    self.values = np.concatenate([self.values, values[order]])
+                return
+        self._build(
+            np.concatenate([self.keys.astype(object), keys.astype(object)]) if not (
+                self.numeric and keys.dtype.kind in 'iuf'
+            ) else np.concatenate([self.keys, keys]),
+            np.concatenate([self.values, values]) if self.values is not None and values is not None else None
+        )
+
+    def positions(self, values: ArrayLike) -> np.ndarray:
+        """Positions of values in cache, -1 when it does not exist"""
+        if not self.loaded:
+            self.refresh()
+        values: np.ndarray = np.asarray(values)
+        if not len(self):
+            return np.full(len(values), -1, dtype=np.int64)
+        if self.numeric:
+            values: np.ndarray = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy()
+        return self.index.get_indexer(values)
+
+    def contains(self, values: ArrayLike) -> np.ndarray:
+        """Mask of values that exist in cache"""
+        return self.positions(values) >= 0
+
+    def resolve(self, values: ArrayLike, default: Any = None) -> np.ndarray:
+        """Map values to cached values, like natural key to surrogate key, with `default` when it does not exist"""
+        positions: np.ndarray = self.positions(values)
+        if self.values is None:
+            raise ValueError(f"{self.__class__.__name__} does not load values for resolve")
+        result: np.ndarray = self.values[positions.clip(0)].astype(object)
+        result[positions < 0] = default
+        return result
+
+    def orphans(self, series: pd.Series) -> np.ndarray:
+        """Mask of values that are not null and do not exist in cache"""
+        return ~self.contains(series.to_numpy()) & series.notna().to_numpy()
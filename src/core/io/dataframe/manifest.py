@@ -0,0 +1,105 @@
+import os
+import json
+import uuid
+import hashlib
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+class FileManifest:
+    """
+    Manifest of files that were processed, the record of file keeps size, modified time and
+    checksum of content, so the file that size and modified time do not change skips without
+    read content, and the file that touched but content does not change skips after checksum.
+    The manifest saves to json file with atomic replace after each file was processed.
+    usage:
+        >> manifest = FileManifest('data/sandbox/manifest/customer.json')
+        >> for path, state in manifest.pending(['cutomer_2021.csv', 'cutomer_2022.csv']).items():
+        >>     rows = load(path)
+        >>     manifest.commit(path, state, rows=rows)
+    """
+    VERSION: int = 1
+
+    def __init__(self, manifest_path: str):
+        self.manifest_path: str = manifest_path
+        self.lock = threading.Lock()
+        self.files: Dict[str, Dict[str, Any]] = self.load()
+        self.dirty: bool = False
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path, mode='r', encoding='utf-8') as f:
+            return json.load(f).get('files', {})
+
+    def save(self) -> None:
+        with self.lock:
+            os.makedirs(os.path.dirname(self.manifest_path) or os.curdir, exist_ok=True)
+            tmp: str = f"{self.manifest_path}.{uuid.uuid4().hex}.tmp"
+            try:
+                with open(tmp, mode='w', encoding='utf-8') as f:
+                    json.dump({'version': self.VERSION, 'files': self.files}, f, indent=2, sort_keys=True)
+                os.replace(tmp, self.manifest_path)
+                self.dirty = False
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+
+    @staticmethod
+    def checksum(path: str, block_size: int = 1024 * 1024) -> str:
+        _hash = hashlib.sha1()
+        with open(path, mode='rb') as f:
+            while block := f.read(block_size):
+                _hash.update(block)
+        return _hash.hexdigest()
+
+    @staticmethod
+    def fingerprint(path: str) -> Dict[str, int]:
+        _stat: os.stat_result = os.stat(path)
+        return {'size': _stat.st_size, 'mtime_ns': _stat.st_mtime_ns}
+
+    def state(self, path: str) -> Optional[Dict[str, Any]]:
+        """
+        State of file that does not process, with status `new` or `changed`, or None when
+        the file was processed and content does not change
+        """
+        record: Optional[Dict[str, Any]] = self.files.get(os.path.abspath(path))
+        _fingerprint: Dict[str, int] = self.fingerprint(path)
+        if record and all(record.get(k) == v for k, v in _fingerprint.items()):
+            return None
+        checksum: str = self.checksum(path)
+        if record and record.get('checksum') == checksum:
+            # The file was touched only, so it keeps new modified time to skip checksum next time
+            record.update(_fingerprint)
+            self.dirty = True
+            return None
+        return {**_fingerprint, 'checksum': checksum, 'status': 'changed' if record else 'new'}
+
+    def pending(self, paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """States of files in `paths` that are new or changed, the order of paths does not change"""
+        states: Dict[str, Dict[str, Any]] = {}
+        for path in paths:
+            if (_state := self.state(path)) is not None:
+                states[path] = _state
+        if self.dirty:
+            self.save()
+        return states
+
+    def commit(self, path: str, state: Dict[str, Any], rows: int = 0) -> None:
+        """Record file with state from `pending` that was taken before read, then save manifest"""
+        self.files[os.path.abspath(path)] = {
+            **{k: v for k, v in state.items() if k != 'status'},
+            'rows': rows,
+            'processed_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        self.save()
+
+    def reset(self, paths: Optional[List[str]] = None) -> None:
+        """Remove records of `paths`, or all records, so the files process again"""
+        if paths is None:
+            self.files = {}
+        else:
+            for path in paths:
+                self.files.pop(os.path.abspath(path), None)
+        self.save()
@@ -0,0 +1,184 @@
+import os
+import mmap
+import uuid
+import random
+from typing import Iterator, List, Optional, Tuple
+import numpy as np
+
+# The file that scans in blocks of this size, so the scan does not allocate size of file
+SCAN_SIZE: int = 64 * 1024 * 1024
+
+
+def record_ends(block: np.ndarray, quotes: int = 0) -> Tuple[np.ndarray, int]:
+    """
+    Positions of newline that end csv record in block, the newline in quoted value does not end
+    record, so it counts quotes before each newline with number of `quotes` before the block.
+    Return positions and number of quotes until the end of block.
+    """
+    _quotes: np.ndarray = np.flatnonzero(block == ord('"'))
+    newlines: np.ndarray = np.flatnonzero(block == ord('\n'))
+    if len(_quotes):
+        newlines = newlines[(quotes + np.searchsorted(_quotes, newlines)) % 2 == 0]
+    return newlines, quotes + len(_quotes)
+
+
+class RowIndex:
+    """
+    Row-offset index of csv file that keeps byte offset of every `stride` records, it builds once
+    with memory-mapped scan and stores next to the file with `SUFFIX`, so the record N reads from
+    nearest offset without parse whole file, and the file splits to byte ranges on records.
+    usage:
+        >> index = RowIndex.get('data/sandbox/local/customer/cutomer_2022.csv')
+        >> index.read(1000000, 10)
+        b'C1000000,Ann,0812\n...'
+        >> index.ranges(64 * 1024 * 1024)
+        [(0, 67108901), (67108901, 134217790), ...]
+    detail:
+        The index stores size and modified time of file, so it rebuilds when the file changes.
+        The records count from the first line of file, so the header is record 0.
+    """
+    SUFFIX: str = '.idx'
+
+    def __init__(self, path: str, offsets: np.ndarray, rows: int, stride: int, size: int, mtime_ns: int):
+        self.path: str = path
+        self.offsets: np.ndarray = offsets
+        self.rows: int = rows
+        self.stride: int = stride
+        self.size: int = size
+        self.mtime_ns: int = mtime_ns
+
+    @property
+    def index_path(self) -> str:
+        return f'{self.path}{self.SUFFIX}'
+
+    @classmethod
+    def build(cls, path: str, stride: int = 1024, scan_size: int = SCAN_SIZE) -> 'RowIndex':
+        """Scan file with memory map for offset of every `stride` records"""
+        _stat: os.stat_result = os.stat(path)
+        if not _stat.st_size:
+            return cls(path, np.zeros(0, dtype=np.int64), 0, stride, 0, _stat.st_mtime_ns)
+        offsets: List[np.ndarray] = [np.zeros(1, dtype=np.int64)]
+        # The record 0 starts at the first byte of file
+        rows: int = 1
+        quotes: int = 0
+        with open(path, mode='rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for start in range(0, _stat.st_size, scan_size):
+                block = np.frombuffer(mm, dtype=np.uint8, count=min(scan_size, _stat.st_size - start), offset=start)
+                ends, quotes = record_ends(block, quotes)
+                del block
+                starts: np.ndarray = ends.astype(np.int64) + start + 1
+                starts = starts[starts < _stat.st_size]
+                offsets.append(starts[np.arange(rows, rows + len(starts)) % stride == 0])
+                rows += len(starts)
+        return cls(path, np.concatenate(offsets), rows, stride, _stat.st_size, _stat.st_mtime_ns)
+
+    def save(self) -> None:
+        tmp: str = f"{self.index_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp, mode='wb') as f:
+                np.savez(f, offsets=self.offsets, meta=np.array(
+                    [self.rows, self.stride, self.size, self.mtime_ns], dtype=np.int64
+                ))
+            os.replace(tmp, self.index_path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['RowIndex']:
+        """Load index of file, return None when it does not exist or file changes after it built"""
+        if not os.path.exists(index_path := f'{path}{cls.SUFFIX}'):
+            return None
+        try:
+            with np.load(index_path) as data:
+                rows, stride, size, mtime_ns = (int(_) for _ in data['meta'])
+                offsets: np.ndarray = data['offsets']
+        except (OSError, ValueError, KeyError):
+            return None
+        _stat: os.stat_result = os.stat(path)
+        if (_stat.st_size, _stat.st_mtime_ns) != (size, mtime_ns):
+            return None
+        return cls(path, offsets, rows, stride, size, mtime_ns)
+
+    @classmethod
+    def get(cls, path: str, stride: int = 1024) -> 'RowIndex':
+        """Load index of file, or build and save it when it does not exist or file changes"""
+        if (index := cls.load(path)) is None:
+            (index := cls.build(path, stride=stride)).save()
+        return index
+
+    def _block(self, block: int) -> Tuple[int, int]:
+        """Byte range of records in block of `stride` records"""
+        return (
+            int(self.offsets[block]),
+            int(self.offsets[block + 1]) if block + 1 < len(self.offsets) else self.size
+        )
+
+    def _records(self, block: int) -> Tuple[bytes, np.ndarray]:
+        """Bytes of block of `stride` records and start of each record with end of block"""
+        start, end = self._block(block)
+        with open(self.path, mode='rb') as f:
+            f.seek(start)
+            data: bytes = f.read(end - start)
+        bounds: np.ndarray = np.concatenate(([0], record_ends(np.frombuffer(data, dtype=np.uint8))[0] + 1))
+        return data, (bounds if bounds[-1] >= len(data) else np.append(bounds, len(data)))
+
+    def _slice(self, block: int, start: int, end: Optional[int] = None) -> bytes:
+        """Bytes of records from `start` to `end` in block"""
+        data, bounds = self._records(block)
+        return data[int(bounds[start]):int(bounds[len(bounds) - 1 if end is None else end])]
+
+    def read(self, start: int, count: int = 1) -> bytes:
+        """Bytes of `count` records from record `start`, it reads only blocks that have records"""
+        if start < 0 or start >= self.rows or count <= 0:
+            return b''
+        end: int = min(start + count, self.rows)
+        first, last = start // self.stride, (end - 1) // self.stride
+        if first == last:
+            return self._slice(first, start - first * self.stride, end - first * self.stride)
+        with open(self.path, mode='rb') as f:
+            f.seek(_start := self._block(first + 1)[0])
+            middle: bytes = f.read(self._block(last)[0] - _start)
+        return b''.join((
+            self._slice(first, start - first * self.stride), middle, self._slice(last, 0, end - last * self.stride)
+        ))
+
+    def sample(self, n: int, start: int = 0, seed: Optional[int] = None) -> bytes:
+        """Bytes of `n` random records from record `start`, the records keep order of file"""
+        if (population := self.rows - start) <= 0:
+            return b''
+        rows: List[int] = sorted(random.Random(seed).sample(range(start, self.rows), min(n, population)))
+        records: List[bytes] = []
+        _block: int = -1
+        data, bounds = b'', np.zeros(0, dtype=np.int64)
+        for row in rows:
+            if row // self.stride != _block:
+                data, bounds = self._records(_block := row // self.stride)
+            _row: int = row - _block * self.stride
+            records.append(data[int(bounds[_row]):int(bounds[_row + 1])])
+        if records and not records[-1].endswith(b'\n'):
+            records[-1] += b'\n'
+        return b''.join(records)
+
+    def ranges(self, range_size: int, start: int = 0) -> List[Tuple[int, int]]:
+        """Byte ranges of about `range_size` bytes that split on records, from record `start`"""
+        if start >= self.rows:
+            return []
+        _start: int = self._block(start // self.stride)[0]
+        if start % self.stride:
+            _start += len(self._slice(start // self.stride, 0, start % self.stride))
+        ranges: List[Tuple[int, int]] = []
+        for offset in self.offsets:
+            if int(offset) - _start >= range_size:
+                ranges.append((_start, int(offset)))
+                _start = int(offset)
+        if _start < self.size:
+            ranges.append((_start, self.size))
+        return ranges
+
+    def blocks(self, range_size: int, start: int = 0) -> Iterator[bytes]:
+        """Bytes of each byte range from `ranges`, so each block has only complete records"""
+        with open(self.path, mode='rb') as f:
+            for _start, _end in self.ranges(range_size, start=start):
+                f.seek(_start)
+                yield f.read(_end - _start)
@@ -0,0 +1,100 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from src.core.utils.threader import maxThreads, prefetch
+from .arrow import to_pandas
+from .partition import Predicate, Predicates, normalize_predicates
+from .zonemap import statistics_match
+
+EXPRESSIONS: Dict[str, Callable[[pc.Expression, Any], pc.Expression]] = {
+    '=': lambda field, value: field == value,
+    '==': lambda field, value: field == value,
+    '!=': lambda field, value: field != value,
+    '<': lambda field, value: field < value,
+    '<=': lambda field, value: field <= value,
+    '>': lambda field, value: field > value,
+    '>=': lambda field, value: field >= value,
+    'in': lambda field, values: field.isin(list(values)),
+    'not in': lambda field, values: ~field.isin(list(values)),
+}
+
+
+def row_group_statistics(metadata: pq.FileMetaData, row_group: int) -> Dict[str, Tuple[Any, Any]]:
+    """Min and max values of columns in row group, the column that does not have statistics skips"""
+    statistics: Dict[str, Tuple[Any, Any]] = {}
+    _row_group: pq.RowGroupMetaData = metadata.row_group(row_group)
+    for i in range(_row_group.num_columns):
+        column: pq.ColumnChunkMetaData = _row_group.column(i)
+        if column.statistics is not None and column.statistics.has_min_max:
+            statistics[column.path_in_schema] = (column.statistics.min, column.statistics.max)
+    return statistics
+
+
+def prune_row_groups(metadata: pq.FileMetaData, predicates: List[Predicate]) -> List[int]:
+    """
+    Row groups of file that statistics of columns match all predicates, the predicate of column
+    that does not have statistics, or that value does not compare with type of column, can not
+    prune row group
+    """
+    return [
+        row_group for row_group in range(metadata.num_row_groups)
+        if statistics_match(row_group_statistics(metadata, row_group), predicates)
+    ]
+
+
+def filter_expression(predicates: List[Predicate], names: List[str]) -> Optional[pc.Expression]:
+    """Expression of predicates that keys are columns in `names`, the other predicates skip"""
+    expression: Optional[pc.Expression] = None
+    for key, op, value in predicates:
+        if key not in names:
+            continue
+        _expression: pc.Expression = EXPRESSIONS[op](pc.field(key), value)
+        expression = _expression if expression is None else expression & _expression
+    return expression
+
+
+def read_parquet(
+        path: str,
+        columns: Optional[List[str]] = None,
+        predicates: Optional[Predicates] = None,
+        column_types: Optional[Dict[str, pa.DataType]] = None,
+        chunk_size: int = 100000,
+        workers: int = maxThreads
+) -> Iterator[pd.DataFrame]:
+    """
+    Read parquet file to batches of `chunk_size` rows, the row groups read in parallel threads
+    but batches yield in order of file. Only `columns` read from file, and the row groups that
+    min and max statistics do not match `predicates` skip without read, then the rows of read
+    row groups filter with `predicates`, so it returns only matched rows.
+    usage:
+        >> for df in read_parquet('data/sandbox/local/sales/sales_2022.parquet', columns=['id', 'amount'],
+        >>                        predicates=[('amount', '>=', 1000)]):
+        >>     print(len(df))
+    """
+    metadata: pq.FileMetaData = pq.ParquetFile(path).metadata
+    names: List[str] = metadata.schema.to_arrow_schema().names
+    _predicates: List[Predicate] = normalize_predicates(predicates, convert=False)
+    expression: Optional[pc.Expression] = filter_expression(_predicates, names)
+    _columns: Optional[List[str]] = None if columns is None else [col for col in columns if col in names]
+    if _columns is not None and expression is not None:
+        # The columns of predicates read for filter, then they drop from batches
+        _columns = list(dict.fromkeys([*_columns, *(key for key, _, _ in _predicates if key in names)]))
+
+    def _read(row_group: int) -> pa.Table:
+        table: pa.Table = pq.ParquetFile(path).read_row_group(row_group, columns=_columns, use_threads=False)
+        if expression is not None:
+            table = table.filter(expression)
+        if columns is not None:
+            table = table.select([col for col in columns if col in names])
+        if column_types:
+            table = table.cast(pa.schema([
+                pa.field(field.name, column_types.get(field.name, field.type)) for field in table.schema
+            ]))
+        return table
+
+    for table in prefetch(_read, prune_row_groups(metadata, _predicates), workers=workers):
+        for batch in table.to_batches(max_chunksize=chunk_size):
+            if batch.num_rows:
+                yield to_pandas([batch])
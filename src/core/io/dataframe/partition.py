@@ -0,0 +1,146 @@
+import os
+import re
+import operator
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from .reader import expand_paths
+from .compression import strip_compression
+
+PARTITION_REGEX = re.compile(r'{(\w+)}')
+HIVE_REGEX = re.compile(r'^(\w+)=(.+)$')
+TOKEN_REGEX = re.compile(r'({\w+}|\*\*' + re.escape(os.sep) + r'|\*\*|\*|\?)')
+
+OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    '=': operator.eq, '==': operator.eq, '!=': operator.ne,
+    '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+    'in': lambda value, values: value in values,
+    'not in': lambda value, values: value not in values,
+}
+
+Predicate = Tuple[str, str, Any]
+Predicates = Union[Dict[str, Any], List[Predicate]]
+
+
+def partition_value(value: Any) -> Any:
+    """Convert value of partition in path to integer when it is number, `2022` or `01`"""
+    return int(value) if isinstance(value, str) and re.fullmatch(r'-?\d+', value) else value
+
+
+def glob_pattern(pattern: str) -> str:
+    """Replace partition keys, `{year}`, in pattern with glob wildcard"""
+    return PARTITION_REGEX.sub('*', pattern)
+
+
+def pattern_root(pattern: str) -> str:
+    """Directory of pattern before the first wildcard or partition key"""
+    return os.path.dirname(TOKEN_REGEX.split(pattern, maxsplit=1)[0])
+
+
+def partition_regex(pattern: str) -> re.Pattern:
+    """Convert pattern with partition keys and glob wildcards to regular expression of path"""
+    _not_sep: str = f'[^{re.escape(os.sep)}]'
+    keys: set = set()
+    regex: str = ''
+    for token in TOKEN_REGEX.split(pattern):
+        if match := PARTITION_REGEX.fullmatch(token):
+            regex += f'(?P={match.group(1)})' if match.group(1) in keys else f'(?P<{match.group(1)}>{_not_sep}+?)'
+            keys.add(match.group(1))
+        elif token == f'**{os.sep}':
+            regex += f'(?:.*{re.escape(os.sep)})?'
+        elif token == '**':
+            regex += '.*'
+        elif token == '*':
+            regex += f'{_not_sep}*'
+        elif token == '?':
+            regex += _not_sep
+        else:
+            regex += re.escape(token)
+    return re.compile(regex)
+
+
+def hive_partitions(path: str, root: str = '') -> Dict[str, Any]:
+    """Values of partition from hive-style directories of path under `root`, like `year=2022/`"""
+    values: Dict[str, Any] = {}
+    for part in os.path.relpath(os.path.dirname(path), root or os.curdir).split(os.sep):
+        if match := HIVE_REGEX.match(part):
+            values[match.group(1)] = partition_value(match.group(2))
+    return values
+
+
+def normalize_predicates(predicates: Optional[Predicates], convert: bool = True) -> List[Predicate]:
+    """
+    Convert predicates to list of `(key, operator, value)`, the dictionary of predicates uses
+    `in` for list, tuple or set values and `=` for other values
+    :param convert: convert values to values of partition, `'2022'` to `2022`, set False for
+        predicates of columns in file
+    """
+    _value: Callable[[Any], Any] = partition_value if convert else (lambda _: _)
+    if not predicates:
+        return []
+    if isinstance(predicates, dict):
+        predicates = [
+            (key, 'in' if isinstance(value, (list, tuple, set)) else '=', value) for key, value in predicates.items()
+        ]
+    result: List[Predicate] = []
+    for key, op, value in predicates:
+        if (op := op.strip().lower()) not in OPERATORS:
+            raise ValueError(f"Operator {op!r} of partition predicate does not support in {list(OPERATORS)}")
+        result.append((
+            key, op, {_value(_) for _ in value} if op in {'in', 'not in'} else _value(value)
+        ))
+    return result
+
+
+class PartitionIndex:
+    """
+    Partition index of files that match pattern, the values of partition parse from keys in
+    pattern, like `cutomer_{year}.csv` or compressed `cutomer_2022.csv.zst`, and from hive-style
+    directories, like `year=2022/`, under directory of pattern. The files prune with predicates
+    of partition values without open files, and the file that does not have key of predicate
+    does not prune.
+    usage:
+        >> index = PartitionIndex('data/sandbox/local/customer/cutomer_{year}.csv')
+        >> index.prune({'year': 2022})
+        ['data/sandbox/local/customer/cutomer_2022.csv']
+        >> index.prune([('year', '>=', 2021), ('region', 'in', ['th', 'sg'])])
+    """
+
+    def __init__(self, pattern: str, paths: Optional[List[str]] = None):
+        self.pattern: str = pattern
+        self.root: str = pattern_root(pattern)
+        self.regex: re.Pattern = partition_regex(pattern)
+        self.partitions: Dict[str, Dict[str, Any]] = {
+            path: self.parse(path) for path in (expand_paths(glob_pattern(pattern)) if paths is None else paths)
+        }
+
+    def parse(self, path: str) -> Dict[str, Any]:
+        """Values of partition of path from hive-style directories and keys in pattern"""
+        values: Dict[str, Any] = hive_partitions(path, self.root)
+        if match := (self.regex.fullmatch(path) or self.regex.fullmatch(strip_compression(path))):
+            values.update({key: partition_value(value) for key, value in match.groupdict().items()})
+        return values
+
+    @property
+    def keys(self) -> List[str]:
+        return list(dict.fromkeys(key for values in self.partitions.values() for key in values))
+
+    @property
+    def paths(self) -> List[str]:
+        return list(self.partitions)
+
+    @staticmethod
+    def match(values: Dict[str, Any], predicates: List[Predicate]) -> bool:
+        for key, op, value in predicates:
+            if key not in values:
+                continue
+            try:
+                if not OPERATORS[op](values[key], value):
+                    return False
+            except TypeError:
+                # The value that does not compare with type of partition can not prune file
+                continue
+        return True
+
+    def prune(self, predicates: Optional[Predicates] = None) -> List[str]:
+        """Paths of files that partition values match all predicates"""
+        _predicates: List[Predicate] = normalize_predicates(predicates)
+        return [path for path, values in self.partitions.items() if self.match(values, _predicates)]
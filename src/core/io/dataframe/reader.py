@@ -0,0 +1,107 @@
+import re
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import pandas as pd
+from src.core.utils.threader import maxThreads
+from src.core.utils.path_parser import DirectoryCrawler, defaultCrawler
+from .compression import detect_compression
+
+_END = object()
+
+
+def natural_key(path: str) -> list:
+    """Sort key of path that compares number in name as number, `part_2` before `part_10`"""
+    return [int(_) if _.isdigit() else _ for _ in re.split(r'(\d+)', path)]
+
+
+def expand_paths(pattern: str, crawler: Optional[DirectoryCrawler] = None) -> List[str]:
+    """
+    Expand glob pattern, that supports `**` for sub-directories, to sorted non-empty files with
+    cached listings of `crawler`
+    """
+    return sorted((crawler or defaultCrawler).glob(pattern, non_empty=True), key=natural_key)
+
+
+def read_csv_batches(path: str, chunk_size: int = 100000, **options) -> Iterator[pd.DataFrame]:
+    """
+    Read csv file to batches of `chunk_size` rows with `pd.read_csv` options, the gzip or zstd
+    file decompresses while parsing
+    """
+    options.setdefault('compression', detect_compression(path))
+    with pd.read_csv(path, chunksize=chunk_size, **options) as reader:
+        yield from reader
+
+
+class StreamReader:
+    """
+    Stream batches of many files with bounded pool of threads, the files read in parallel
+    but batches yield in order of files and order of batches in each file. Each file keeps
+    only `queue_size` batches in memory, so the memory does not grow with number of files.
+    The producers run on private pool that does not take limiter of `ThreadWithControl`, so
+    the consumer that starts `ThreadWithControl`, like `TableObject.copy_frame`, does not wait
+    for producers that block on full queue.
+    usage:
+        >> reader = StreamReader(lambda path: read_csv_batches(path, chunk_size=10000), workers=4)
+        >> for df in reader.stream(expand_paths('data/sandbox/local/customer/*.csv')):
+        >>     print(len(df))
+    """
+
+    def __init__(
+            self,
+            read_batches: Callable[[str], Iterator[Any]],
+            workers: int = 4,
+            queue_size: int = 2
+    ):
+        self.read_batches: Callable[[str], Iterator[Any]] = read_batches
+        self.workers: int = max(min(workers, maxThreads), 1)
+        self.queue_size: int = queue_size
+
+    def _produce(self, path: str, batches: queue.Queue, stop: threading.Event) -> None:
+        def _put(item: Any) -> bool:
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        try:
+            for batch in self.read_batches(path):
+                if not _put(batch):
+                    return
+        except Exception as err:
+            _put(err)
+        _put(_END)
+
+    def stream(self, paths: List[str]) -> Iterator[Any]:
+        stop = threading.Event()
+        pending: List[str] = list(paths)
+        running: List[queue.Queue] = []
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='StreamReader')
+
+        def _start() -> None:
+            while pending and len(running) < self.workers:
+                batches: queue.Queue = queue.Queue(maxsize=self.queue_size)
+                executor.submit(self._produce, pending.pop(0), batches, stop)
+                running.append(batches)
+
+        try:
+            _start()
+            while running:
+                while (batch := running[0].get()) is not _END:
+                    if isinstance(batch, Exception):
+                        raise batch
+                    yield batch
+                running.pop(0)
+                _start()
+        finally:
+            stop.set()
+            executor.shutdown(wait=False)
+
+    def read(self, paths: List[str]) -> pd.DataFrame:
+        """Read all batches of files to one dataframe"""
+        batches: list = list(self.stream(paths))
+        return pd.concat(batches, ignore_index=True) if batches else pd.DataFrame()
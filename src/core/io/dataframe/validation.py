@@ -0,0 +1,450 @@
+import re
+import operator
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .lookup import KeyCache
+
+# Result of compiled expression, (values, null mask) for three-valued logic like SQL
+Result = Tuple[Any, np.ndarray]
+
+INTEGER_RANGES: Dict[str, Tuple[int, int]] = {
+    'smallint': (-32768, 32767),
+    'smallserial': (1, 32767),
+    'integer': (-2147483648, 2147483647),
+    'int': (-2147483648, 2147483647),
+    'serial': (1, 2147483647),
+    'bigint': (-9223372036854775808, 9223372036854775807),
+    'bigserial': (1, 9223372036854775807),
+}
+
+TOKEN_REGEX = re.compile(r"""
+    \s*(?:
+        (?P<number>\d+(?:\.\d*)?|\.\d+)
+        |'(?P<string>(?:[^']|'')*)'
+        |(?P<cast>::\s*[a-z_][a-z0-9_ ]*(?:\([\d\s,]*\))?)
+        |(?P<operator><>|!=|>=|<=|=|<|>|\+|-|\*|/|\(|\)|,)
+        |(?P<name>[a-z_][a-z0-9_.]*)
+    )""", re.IGNORECASE | re.VERBOSE)
+
+COMPARE_OPERATORS: Dict[str, Callable] = {
+    '=': operator.eq, '<>': operator.ne, '!=': operator.ne,
+    '>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le,
+}
+
+ARITHMETIC_OPERATORS: Dict[str, Callable] = {
+    '+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv,
+}
+
+
+def _broadcast(result: Result, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Convert result of compiled expression to boolean arrays with `size` length"""
+    values, nulls = result
+    return (
+        np.broadcast_to(np.asarray(values, dtype=bool), size),
+        np.broadcast_to(np.asarray(nulls, dtype=bool), size)
+    )
+
+
+class CheckParser:
+    """
+    Compile simple `check` statement of column to vectorized function of pandas DataFrame. The
+    function returns (values, null mask) because the check constraint passes when the result
+    is true or null like PostgreSQL
+    support
+    -------
+        - compare operators: =, <>, !=, >, >=, <, <=
+        - arithmetic operators: +, -, *, /
+        - logical operators: and, or, not
+        - predicates: [not] like, [not] in ( ... ), [not] between ... and ..., is [not] null
+        - casting with `::<datatype>` will be ignored
+    example
+    -------
+        (i)     CheckParser("salary > 0").compile()
+        (ii)    CheckParser("email like '%@%.com'").compile()
+        (iii)   CheckParser("(joined_date > birth_date) and joined_date is not null").compile()
+    """
+
+    def __init__(self, statement: str):
+        self.statement: str = statement
+        self.tokens: List[Tuple[str, str]] = self.tokenize(statement)
+        self.position: int = 0
+
+    @staticmethod
+    def tokenize(statement: str) -> List[Tuple[str, str]]:
+        tokens: List[Tuple[str, str]] = []
+        position: int = 0
+        statement: str = statement.strip()
+        while position < len(statement):
+            if not (match := TOKEN_REGEX.match(statement, position)) or match.end() == position:
+                raise ValueError(f"Does not support check statement near {statement[position:]!r}")
+            position = match.end()
+            kind: str = match.lastgroup
+            if kind == 'cast':
+                continue
+            value: str = match.group(kind)
+            tokens.append((kind, value.replace("''", "'") if kind == 'string' else value.lower()))
+        return tokens
+
+    def compile(self) -> Callable[[pd.DataFrame], Result]:
+        function = self._or()
+        if self.position != len(self.tokens):
+            raise ValueError(f"Does not support check statement {self.statement!r}")
+        return function
+
+    def _peek(self, *values: str) -> bool:
+        return self.position < len(self.tokens) and self.tokens[self.position][1] in values
+
+    def _take(self, *values: str) -> str:
+        if values and not self._peek(*values):
+            raise ValueError(f"Does not support check statement {self.statement!r}")
+        self.position += 1
+        return self.tokens[self.position - 1][1]
+
+    def _or(self):
+        functions: list = [self._and()]
+        while self._peek('or'):
+            self._take('or')
+            functions.append(self._and())
+        return functions[0] if len(functions) == 1 else self._logical(functions, np.logical_or)
+
+    def _and(self):
+        functions: list = [self._not()]
+        while self._peek('and'):
+            self._take('and')
+            functions.append(self._not())
+        return functions[0] if len(functions) == 1 else self._logical(functions, np.logical_and)
+
+    @staticmethod
+    def _logical(functions: list, logical: Callable):
+        """Three-valued `and`/`or`, the definite result, false for `and` and true for `or`, wins over null"""
+        definite: bool = logical is np.logical_or
+
+        def _function(df: pd.DataFrame) -> Result:
+            results: List[Tuple[np.ndarray, np.ndarray]] = [_broadcast(function(df), len(df)) for function in functions]
+            decided: np.ndarray = np.logical_or.reduce([(values == definite) & ~nulls for values, nulls in results])
+            nulls: np.ndarray = ~decided & np.logical_or.reduce([nulls for _, nulls in results])
+            return (decided if definite else ~decided & ~nulls), nulls
+        return _function
+
+    def _not(self):
+        if self._peek('not'):
+            self._take('not')
+            return self._negate(self._not(), True)
+        return self._predicate()
+
+    def _predicate(self):
+        left = self._operand()
+        negate: bool = False
+        if self._peek('is'):
+            self._take('is')
+            negate = self._peek('not') and bool(self._take('not'))
+            self._take('null')
+
+            def _function(df: pd.DataFrame) -> Result:
+                nulls: np.ndarray = _broadcast(left(df), len(df))[1]
+                return (~nulls if negate else nulls), np.zeros(len(df), dtype=bool)
+            return _function
+        if self._peek('not'):
+            negate = bool(self._take('not'))
+        if self._peek('like', 'ilike'):
+            case: bool = self._take() == 'like'
+            return self._negate(self._like(left, self._take_string(), case), negate)
+        if self._peek('in'):
+            self._take('in')
+            self._take('(')
+            items: list = [self._operand()]
+            while self._peek(','):
+                self._take(',')
+                items.append(self._operand())
+            self._take(')')
+            return self._negate(self._in(left, items), negate)
+        if self._peek('between'):
+            self._take('between')
+            lower = self._operand()
+            self._take('and')
+            upper = self._operand()
+            return self._negate(
+                self._logical([self._compare(left, lower, operator.ge), self._compare(left, upper, operator.le)],
+                              np.logical_and), negate
+            )
+        if self._peek(*COMPARE_OPERATORS):
+            compare: Callable = COMPARE_OPERATORS[self._take()]
+            return self._compare(left, self._operand(), compare)
+        return left
+
+    def _take_string(self) -> str:
+        if self.position >= len(self.tokens) or self.tokens[self.position][0] != 'string':
+            raise ValueError(f"Does not support check statement {self.statement!r}")
+        return self._take()
+
+    @staticmethod
+    def _negate(function, negate: bool):
+        if not negate:
+            return function
+
+        def _function(df: pd.DataFrame) -> Result:
+            values, nulls = _broadcast(function(df), len(df))
+            return ~values & ~nulls, nulls
+        return _function
+
+    @staticmethod
+    def _like(left, pattern: str, case: bool):
+        """
+        Match `like` pattern, the pattern that has only `%` wildcard with at most one part between
+        prefix and suffix uses string methods instead of regular expression
+        """
+        parts: List[str] = pattern.split('%')
+        simple: bool = case and '_' not in pattern and len(parts) <= 3
+        regex = re.compile(
+            ''.join('.*' if _ == '%' else '.' if _ == '_' else re.escape(_) for _ in pattern),
+            flags=(0 if case else re.IGNORECASE) | re.DOTALL
+        )
+
+        def _function(df: pd.DataFrame) -> Result:
+            values, nulls = left(df)
+            series = pd.Series(values, index=df.index) if not isinstance(values, pd.Series) else values
+            if series.dtype != object:
+                series = series.astype(str)
+            if not simple:
+                return series.str.fullmatch(regex).fillna(False).to_numpy(dtype=bool), nulls
+            if len(parts) == 1:
+                return (series == pattern).to_numpy(dtype=bool), nulls
+            prefix, suffix = parts[0], parts[-1]
+            matches = series.str.startswith(prefix) & series.str.endswith(suffix) & (
+                series.str.len() >= len(prefix) + len(suffix)
+            )
+            if len(parts) == 3 and parts[1]:
+                matches &= series.str.slice(len(prefix), -len(suffix) or None).str.contains(parts[1], regex=False)
+            return matches.fillna(False).to_numpy(dtype=bool), nulls
+        return _function
+
+    @staticmethod
+    def _in(left, items: list):
+        """
+        Match `in` list, the literal items match together with `isin` and the column items compare
+        element-wise, the row that does not match and has null item is null like Postgres
+        """
+        def _function(df: pd.DataFrame) -> Result:
+            values, nulls = left(df)
+            series = pd.Series(values, index=df.index) if not isinstance(values, pd.Series) else values
+            literals: list = []
+            matches = np.zeros(len(df), dtype=bool)
+            item_nulls = np.zeros(len(df), dtype=bool)
+            for item in items:
+                item_values, _item_nulls = item(df)
+                if isinstance(item_values, pd.Series):
+                    matches |= (series == item_values).fillna(False).to_numpy(dtype=bool) & ~_item_nulls
+                    item_nulls |= _item_nulls
+                else:
+                    literals.append(item_values)
+            if literals:
+                matches |= series.isin(literals).to_numpy(dtype=bool)
+            nulls = np.asarray(nulls | (item_nulls & ~matches), dtype=bool)
+            return matches & ~nulls, nulls
+        return _function
+
+    @staticmethod
+    def _compare(left, right, compare: Callable):
+        def _function(df: pd.DataFrame) -> Result:
+            left_values, left_nulls = left(df)
+            right_values, right_nulls = right(df)
+            nulls = np.asarray(left_nulls | right_nulls, dtype=bool)
+            with np.errstate(invalid='ignore'):
+                values = compare(left_values, right_values)
+            return np.asarray(values, dtype=bool) & ~nulls, nulls
+        return _function
+
+    def _operand(self):
+        left = self._term()
+        while self._peek(*ARITHMETIC_OPERATORS):
+            arithmetic: Callable = ARITHMETIC_OPERATORS[self._take()]
+            left = self._arithmetic(left, self._term(), arithmetic)
+        return left
+
+    @staticmethod
+    def _arithmetic(left, right, arithmetic: Callable):
+        def _function(df: pd.DataFrame) -> Result:
+            left_values, left_nulls = left(df)
+            right_values, right_nulls = right(df)
+            return arithmetic(left_values, right_values), left_nulls | right_nulls
+        return _function
+
+    def _term(self):
+        if self.position >= len(self.tokens):
+            raise ValueError(f"Does not support check statement {self.statement!r}")
+        kind, value = self.tokens[self.position]
+        if value == '(':
+            self._take('(')
+            function = self._or()
+            self._take(')')
+            return function
+        if value == '-' and kind == 'operator':
+            self._take('-')
+            function = self._term()
+
+            def _function(df: pd.DataFrame) -> Result:
+                values, nulls = function(df)
+                return -values, nulls
+            return _function
+        self.position += 1
+        if kind == 'number':
+            number: float = float(value) if '.' in value else int(value)
+            return lambda df: (number, np.zeros(len(df), dtype=bool))
+        if kind == 'string':
+            return lambda df: (value, np.zeros(len(df), dtype=bool))
+        if kind == 'name' and value in {'true', 'false'}:
+            return lambda df: (value == 'true', np.zeros(len(df), dtype=bool))
+        if kind == 'name' and value not in {'and', 'or', 'not', 'is', 'null', 'like', 'in', 'between'}:
+            column: str = value.split('.')[-1]
+            return lambda df: (df[column], df[column].isna().to_numpy())
+        raise ValueError(f"Does not support check statement {self.statement!r}")
+
+
+class FrameValidator:
+    """
+    Validate batch of pandas DataFrame with column constraints before load to database, the
+    constraints compile to vectorized mask functions once, when create validator.
+    The `schemas` is mapping of column name and column object that has properties `datatype`,
+    `nullable`, `unique`, `primary_key`, `check` and `default` like `PostgresColumn`.
+    rules
+    -----
+        - not null: column does not nullable or it is primary key
+        - datatype: value can not convert to numeric, integer range, numeric precision, or
+          varchar length overflow
+        - primary key: duplicate rows in batch by hashing primary key columns together
+        - unique: duplicate value that is not null in batch
+        - check: simple check statement that `CheckParser` supports, the unsupported
+          statement keeps in `unsupported` and leaves to database
+        - foreign key: value that is not null and does not exist in `KeyCache` of column
+    usage:
+        >> validator = FrameValidator(table.schemas)
+        >> good, rejected = validator.split(df)
+        >> rejected['reject_reasons']
+        0    customer_id:not_null;
+    """
+    REJECT_COLUMN: str = 'reject_reasons'
+
+    def __init__(self, schemas: Dict[str, Any], foreign_keys: Optional[Dict[str, KeyCache]] = None):
+        self.schemas: Dict[str, Any] = schemas
+        self.foreign_keys: Dict[str, KeyCache] = foreign_keys or {}
+        self.unsupported: Dict[str, str] = {}
+        self.rules: List[Tuple[str, Callable[[pd.DataFrame], np.ndarray]]] = self.compile()
+
+    def compile(self) -> List[Tuple[str, Callable[[pd.DataFrame], np.ndarray]]]:
+        rules: List[Tuple[str, Callable[[pd.DataFrame], np.ndarray]]] = []
+        primary_key: List[str] = [k for k, v in self.schemas.items() if v.primary_key]
+        for col_name, column in self.schemas.items():
+            datatype: str = (column.datatype or 'text').lower()
+            generated: bool = 'serial' in datatype or bool(column.default)
+            if not column.nullable or col_name in primary_key:
+                rules.append((f'{col_name}:not_null', self._not_null(col_name, generated)))
+            if rule := self._datatype(col_name, datatype):
+                rules.append((f'{col_name}:datatype', rule))
+            if column.unique and [col_name] != primary_key:
+                rules.append((f'{col_name}:unique', self._duplicated([col_name])))
+            if column.check:
+                try:
+                    rules.append((f'{col_name}:check', self._check(CheckParser(column.check).compile())))
+                except ValueError:
+                    self.unsupported[col_name] = column.check
+        if primary_key:
+            rules.append((f"{'_'.join(primary_key)}:primary_key", self._duplicated(primary_key)))
+        for col_name, cache in self.foreign_keys.items():
+            rules.append((f'{col_name}:foreign_key', self._foreign_key(col_name, cache)))
+        return rules
+
+    @staticmethod
+    def _not_null(col_name: str, generated: bool) -> Callable[[pd.DataFrame], np.ndarray]:
+        def _rule(df: pd.DataFrame) -> np.ndarray:
+            if col_name not in df.columns:
+                return np.full(len(df), not generated, dtype=bool)
+            return df[col_name].isna().to_numpy()
+        return _rule
+
+    @staticmethod
+    def _datatype(col_name: str, datatype: str) -> Optional[Callable[[pd.DataFrame], np.ndarray]]:
+        base, _, args = datatype.partition('(')
+        base: str = base.strip()
+        sizes: List[int] = [int(_) for _ in re.findall(r'\d+', args)]
+        if base in INTEGER_RANGES:
+            lower, upper = INTEGER_RANGES[base]
+
+            def _rule(df: pd.DataFrame) -> np.ndarray:
+                if col_name not in df.columns:
+                    return np.zeros(len(df), dtype=bool)
+                values = pd.to_numeric(series := df[col_name], errors='coerce')
+                invalid = values.isna().to_numpy() & series.notna().to_numpy()
+                with np.errstate(invalid='ignore'):
+                    return invalid | (values < lower).to_numpy() | (values > upper).to_numpy() | (
+                        (values % 1) != 0
+                    ).to_numpy() & values.notna().to_numpy()
+            return _rule
+        if base in {'numeric', 'decimal', 'real', 'double precision', 'float', 'float4', 'float8'}:
+            limit: Optional[float] = 10.0 ** (sizes[0] - (sizes[1] if len(sizes) > 1 else 0)) if sizes else None
+
+            def _rule(df: pd.DataFrame) -> np.ndarray:
+                if col_name not in df.columns:
+                    return np.zeros(len(df), dtype=bool)
+                values = pd.to_numeric(series := df[col_name], errors='coerce')
+                invalid = values.isna().to_numpy() & series.notna().to_numpy()
+                if limit is not None:
+                    with np.errstate(invalid='ignore'):
+                        invalid |= (values.abs() >= limit).to_numpy()
+                return invalid
+            return _rule
+        if base in {'varchar', 'character varying', 'char', 'character'} and sizes:
+            length: int = sizes[0]
+
+            def _rule(df: pd.DataFrame) -> np.ndarray:
+                if col_name not in df.columns:
+                    return np.zeros(len(df), dtype=bool)
+                series = df[col_name] if df[col_name].dtype == object else df[col_name].astype(str)
+                return (series.str.len() > length).to_numpy() & series.notna().to_numpy()
+            return _rule
+        return None
+
+    @staticmethod
+    def _duplicated(col_names: List[str]) -> Callable[[pd.DataFrame], np.ndarray]:
+        """Duplicate rows, except the first row, by 64-bit hash of columns without null value"""
+        def _rule(df: pd.DataFrame) -> np.ndarray:
+            if not set(col_names).issubset(df.columns):
+                return np.zeros(len(df), dtype=bool)
+            hashes: np.ndarray = pd.util.hash_pandas_object(df[col_names], index=False, categorize=False).to_numpy()
+            nulls: np.ndarray = df[col_names].isna().to_numpy().any(axis=1)
+            return pd.Series(hashes).duplicated(keep='first').to_numpy() & ~nulls
+        return _rule
+
+    @staticmethod
+    def _foreign_key(col_name: str, cache: KeyCache) -> Callable[[pd.DataFrame], np.ndarray]:
+        def _rule(df: pd.DataFrame) -> np.ndarray:
+            if col_name not in df.columns:
+                return np.zeros(len(df), dtype=bool)
+            return cache.orphans(df[col_name])
+        return _rule
+
+    @staticmethod
+    def _check(function: Callable[[pd.DataFrame], Result]) -> Callable[[pd.DataFrame], np.ndarray]:
+        def _rule(df: pd.DataFrame) -> np.ndarray:
+            try:
+                values, nulls = _broadcast(function(df), len(df))
+            except (KeyError, TypeError):
+                return np.zeros(len(df), dtype=bool)
+            return ~values & ~nulls
+        return _rule
+
+    def validate(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Return mask of rows that violate each rule"""
+        return {name: rule(df) for name, rule in self.rules}
+
+    def split(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Split batch to good rows and rejected rows with column `reject_reasons`"""
+        masks: Dict[str, np.ndarray] = self.validate(df)
+        rejected: np.ndarray = np.logical_or.reduce(list(masks.values())) if masks else np.zeros(len(df), dtype=bool)
+        if not rejected.any():
+            return df, df.iloc[0:0].assign(**{self.REJECT_COLUMN: pd.Series(dtype=object)})
+        reasons: np.ndarray = np.full(int(rejected.sum()), '', dtype=object)
+        for name, mask in masks.items():
+            if (_mask := mask[rejected]).any():
+                reasons[_mask] += f'{name};'
+        return df[~rejected], df[rejected].assign(**{self.REJECT_COLUMN: reasons})
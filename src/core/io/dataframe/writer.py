@@ -0,0 +1,186 @@
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+import pandas as pd
+from src.core.utils.threader import maxThreads
+from .compression import EXTENSIONS, CompressedWriter
+from .zonemap import column_statistics
+
+WRITE_BUFFER: int = 8 * 1024 * 1024
+TARGET_SIZE: int = 128 * 1024 * 1024
+
+# The directory name of partition that value is null, like `year=null/`
+NULL_PARTITION: str = 'null'
+
+
+class PartitionedWriter:
+    """
+    Writer of batches to csv files that partition by values of `partition_by` columns in
+    hive-style directories, like `year=2022/part-00000.csv.zst`, and the partition columns do
+    not write to files because they parse from directories when read. The rows of each partition
+    buffer until `buffer_size` bytes and write as one block, and the file rolls to next part when
+    its size is over `target_size`. All files write to temporary files and move on `commit`, so
+    the reader does not see files of the writer that fails before `commit`.
+    usage:
+        >> with PartitionedWriter('data/sandbox/local/customer_out', partition_by=['year']) as writer:
+        >>     for df in batches:
+        >>         writer.write(df)
+        >> writer.paths
+        ['data/sandbox/local/customer_out/year=2021/part-00000.csv.zst', ...]
+    detail:
+        The `commit` removes parts of the written partitions from earlier run that do not write
+        again, so the written partitions are overwritten and other partitions do not change. The
+        `zones` keeps statistics of columns of each batch that writes to each file, so the zone
+        maps of files record without read them again. The `commit` is atomic per file only, each
+        file moves with `os.replace` but all files do not move together, so the failure while it
+        moves files, like full disk, can leave new parts with old parts in written partitions, and
+        the next `commit` of the same partitions removes the old parts.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            file_name: str = 'part',
+            partition_by: Optional[List[str]] = None,
+            compression: Optional[str] = 'zstd',
+            target_size: int = TARGET_SIZE,
+            buffer_size: int = WRITE_BUFFER,
+            header: bool = True,
+            encoding: str = 'utf-8',
+            file_type: str = 'csv',
+            workers: int = maxThreads,
+            statistics: bool = True,
+            **options: Any
+    ):
+        if compression not in {None, *EXTENSIONS}:
+            raise ValueError(f"Compression {compression!r} does not support in {list(EXTENSIONS)}")
+        self.path: str = path
+        self.file_name: str = file_name
+        self.partition_by: List[str] = list(partition_by or [])
+        self.compression: Optional[str] = compression
+        self.target_size: int = target_size
+        self.buffer_size: int = buffer_size
+        self.header: bool = header
+        self.encoding: str = encoding
+        self.file_type: str = file_type
+        self.workers: int = workers
+        self.statistics: bool = statistics
+        self.options: Dict[str, Any] = options
+        self.buffers: Dict[Tuple[Any, ...], List[bytes]] = {}
+        self.buffered: Dict[Tuple[Any, ...], int] = {}
+        self.writers: Dict[Tuple[Any, ...], CompressedWriter] = {}
+        self.parts: Dict[Tuple[Any, ...], int] = {}
+        self.finished: List[CompressedWriter] = []
+        self.pending: Dict[Tuple[Any, ...], List[Dict[str, Any]]] = {}
+        self.zones: Dict[str, List[Dict[str, Any]]] = {}
+        self.columns: Optional[List[str]] = None
+        self.rows: int = 0
+        self.paths: List[str] = []
+
+    def directory(self, values: Tuple[Any, ...]) -> str:
+        return os.path.join(self.path, *(
+            f"{key}={NULL_PARTITION if pd.isna(value) else value}" for key, value in zip(self.partition_by, values)
+        ))
+
+    def part_path(self, values: Tuple[Any, ...], part: int) -> str:
+        return os.path.join(
+            self.directory(values),
+            f"{self.file_name}-{part:05d}.{self.file_type}{EXTENSIONS.get(self.compression, '')}"
+        )
+
+    def write(self, df: pd.DataFrame) -> None:
+        """Encode rows of batch to buffer of each partition, the full buffer writes to its file"""
+        if missing := [col for col in self.partition_by if col not in df.columns]:
+            raise KeyError(f"Partition columns {missing} do not exist in batch")
+        if self.columns is None:
+            self.columns = [col for col in df.columns if col not in self.partition_by]
+        if self.partition_by:
+            groups = df.groupby(self.partition_by, dropna=False, sort=False)
+        else:
+            groups = [((), df)]
+        for values, _df in groups:
+            values: Tuple[Any, ...] = values if isinstance(values, tuple) else (values,)
+            data: bytes = _df.to_csv(index=False, header=False, columns=self.columns, **self.options).encode(
+                self.encoding
+            )
+            self.buffers.setdefault(values, []).append(data)
+            if self.statistics:
+                self.pending.setdefault(values, []).append(
+                    {'rows': len(_df), 'columns': column_statistics(_df[self.columns])}
+                )
+            self.buffered[values] = self.buffered.get(values, 0) + len(data)
+            self.rows += len(_df)
+            if self.buffered[values] >= self.buffer_size:
+                self.flush(values)
+
+    def flush(self, values: Tuple[Any, ...]) -> None:
+        """Write buffer of partition as one block, and roll file when it is over `target_size`"""
+        if not (buffer := self.buffers.pop(values, [])):
+            return
+        self.buffered.pop(values, None)
+        if (writer := self.writers.get(values)) is None:
+            os.makedirs(self.directory(values), exist_ok=True)
+            self.parts[values] = (part := self.parts.get(values, -1) + 1)
+            writer = self.writers[values] = CompressedWriter(
+                self.part_path(values, part),
+                compression=self.compression,
+                workers=self.workers
+            )
+            if self.header:
+                buffer.insert(0, pd.DataFrame(columns=self.columns).to_csv(index=False, **self.options).encode(
+                    self.encoding
+                ))
+        writer.write(b''.join(buffer))
+        zones: List[Dict[str, Any]] = self.zones.setdefault(writer.path, [])
+        for chunk in self.pending.pop(values, []):
+            zones.append({'start': zones[-1]['start'] + zones[-1]['rows'] if zones else 0, **chunk})
+        if writer.size >= self.target_size:
+            writer.finish()
+            self.finished.append(self.writers.pop(values))
+
+    def commit(self) -> List[str]:
+        """
+        Flush all buffers and move all files to their paths, then remove stale parts of written
+        partitions, return paths of written files. Each file moves atomically, not all files.
+        """
+        for values in list(self.buffers):
+            self.flush(values)
+        for values in list(self.writers):
+            self.writers[values].finish()
+            self.finished.append(self.writers.pop(values))
+        self.paths = [writer.replace() for writer in self.finished]
+        self.finished = []
+        self.remove_stale()
+        return self.paths
+
+    def remove_stale(self) -> List[str]:
+        """Remove parts of written partitions that were not written by this writer"""
+        _regex: re.Pattern = re.compile(rf'{re.escape(self.file_name)}-\d+\.{re.escape(self.file_type)}(\.\w+)?')
+        _paths: set = set(self.paths)
+        removed: List[str] = []
+        for directory in {os.path.dirname(path) for path in self.paths}:
+            for entry in os.scandir(directory):
+                if entry.is_file() and _regex.fullmatch(entry.name) and entry.path not in _paths:
+                    os.remove(entry.path)
+                    removed.append(entry.path)
+        return removed
+
+    def abort(self) -> None:
+        """Remove temporary files of all parts, the files of earlier run do not change"""
+        for writer in [*self.finished, *self.writers.values()]:
+            writer.abort()
+        self.finished, self.writers, self.buffers, self.buffered = [], {}, {}, {}
+        self.pending, self.zones = {}, {}
+
+    def __enter__(self) -> 'PartitionedWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            try:
+                self.commit()
+                return
+            except BaseException:
+                self.abort()
+                raise
+        self.abort()
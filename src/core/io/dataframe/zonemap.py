@@ -0,0 +1,213 @@
+import os
+import json
+import uuid
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import pandas as pd
+from .partition import Predicate
+
+# The chunk can not match predicate when min and max values of its column do not match
+STATISTICS: Dict[str, Callable[[Any, Any, Any], bool]] = {
+    '=': lambda _min, _max, value: _min <= value <= _max,
+    '==': lambda _min, _max, value: _min <= value <= _max,
+    '!=': lambda _min, _max, value: not (_min == _max == value),
+    '<': lambda _min, _max, value: _min < value,
+    '<=': lambda _min, _max, value: _min <= value,
+    '>': lambda _min, _max, value: _max > value,
+    '>=': lambda _min, _max, value: _max >= value,
+    'in': lambda _min, _max, values: any(_min <= value <= _max for value in values),
+    'not in': lambda _min, _max, values: not (_min == _max and _min in values),
+}
+
+
+def statistics_match(statistics: Dict[str, Tuple[Any, Any]], predicates: List[Predicate]) -> bool:
+    """
+    Min and max values of columns match all predicates, the predicate of column that does not
+    have statistics, or that value does not compare with type of column, can not prune chunk
+    """
+    for key, op, value in predicates:
+        if key not in statistics:
+            continue
+        try:
+            if not STATISTICS[op](*statistics[key], value):
+                return False
+        except TypeError:
+            continue
+    return True
+
+
+def _scalar(value: Any) -> Any:
+    """Convert numpy scalar to python value, so it can save to json"""
+    return value.item() if hasattr(value, 'item') else value
+
+
+def column_statistics(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """
+    Min, max and null count of each column of dataframe, the min and max keep only for number,
+    boolean and string columns that can save to json and compare with values of predicates
+    """
+    statistics: Dict[str, Dict[str, Any]] = {}
+    for col in df.columns:
+        series: pd.Series = df[col]
+        values: pd.Series = series.dropna()
+        statistics[col] = {'nulls': int(len(series) - len(values))}
+        if values.empty or not (
+                pd.api.types.is_numeric_dtype(values) or pd.api.types.is_string_dtype(values)
+        ):
+            continue
+        try:
+            _min, _max = _scalar(values.min()), _scalar(values.max())
+        except TypeError:
+            continue
+        if isinstance(_min, (int, float, bool, str)) and isinstance(_max, (int, float, bool, str)):
+            statistics[col].update({'min': _min, 'max': _max})
+    return statistics
+
+
+def merge_statistics(chunks: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Statistics of file from statistics of its chunks, the column keeps min and max only when
+    all chunks that have values of column have min and max
+    """
+    statistics: Dict[str, Dict[str, Any]] = {}
+    for col in dict.fromkeys(col for chunk in chunks for col in chunk['columns']):
+        _chunks: List[Tuple[int, Dict[str, Any]]] = [
+            (chunk['rows'], chunk['columns'].get(col, {})) for chunk in chunks
+        ]
+        statistics[col] = {'nulls': sum(stats.get('nulls', rows) for rows, stats in _chunks)}
+        values: List[Dict[str, Any]] = [stats for rows, stats in _chunks if rows > stats.get('nulls', 0)]
+        if not values or not all('min' in stats for stats in values):
+            continue
+        try:
+            statistics[col].update({
+                'min': min(stats['min'] for stats in values), 'max': max(stats['max'] for stats in values)
+            })
+        except TypeError:
+            continue
+    return statistics
+
+
+def filter_frame(df: pd.DataFrame, predicates: List[Predicate]) -> pd.DataFrame:
+    """
+    Rows of dataframe that match all predicates, the null value does not match any predicate,
+    and the predicate of column that does not exist, or that value does not compare with type
+    of column, does not filter rows
+    """
+    mask: Optional[pd.Series] = None
+    for key, op, value in predicates:
+        if key not in df.columns:
+            continue
+        series: pd.Series = df[key]
+        try:
+            if op in {'in', 'not in'}:
+                _mask: pd.Series = series.isin(list(value))
+                _mask = ~_mask if op == 'not in' else _mask
+            else:
+                _mask: pd.Series = {
+                    '=': series.eq, '==': series.eq, '!=': series.ne,
+                    '<': series.lt, '<=': series.le, '>': series.gt, '>=': series.ge,
+                }[op](value)
+        except TypeError:
+            continue
+        _mask = _mask.fillna(False).astype(bool) & series.notna()
+        mask = _mask if mask is None else mask & _mask
+    return df if mask is None else df[mask]
+
+
+class ZoneMap:
+    """
+    Zone maps of files of catalog, the record of file keeps min, max and null count of each
+    column of file and of each chunk of rows, so the file or chunk that values of columns can
+    not match predicates skips without open it. The record keys by path, size, modified time
+    of file and hash of schema, so the file or schema that changes does not use old record.
+    The zone maps save to json file with atomic replace, next to files of catalog.
+    usage:
+        >> zone_map = ZoneMap('data/sandbox/local/customer/_zonemap.json')
+        >> zone_map.commit('cutomer_2022.csv', chunks, schema_hash)
+        >> zone_map.prune('cutomer_2022.csv', [('customer_phone', '>=', 900)], schema_hash)
+        []
+    """
+    VERSION: int = 1
+    FILE_NAME: str = '_zonemap.json'
+
+    def __init__(self, zone_map_path: str):
+        self.zone_map_path: str = zone_map_path
+        self.lock = threading.Lock()
+        self.files: Dict[str, Dict[str, Any]] = self.load()
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.zone_map_path):
+            return {}
+        try:
+            with open(self.zone_map_path, mode='r', encoding='utf-8') as f:
+                return json.load(f).get('files', {})
+        except (OSError, ValueError):
+            return {}
+
+    def save(self) -> None:
+        with self.lock:
+            os.makedirs(os.path.dirname(self.zone_map_path) or os.curdir, exist_ok=True)
+            tmp: str = f"{self.zone_map_path}.{uuid.uuid4().hex}.tmp"
+            try:
+                with open(tmp, mode='w', encoding='utf-8') as f:
+                    json.dump({'version': self.VERSION, 'files': self.files}, f, sort_keys=True)
+                os.replace(tmp, self.zone_map_path)
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+
+    @staticmethod
+    def chunks(batches: Iterable[pd.DataFrame]) -> List[Dict[str, Any]]:
+        """Statistics of chunks from batches of file in order of rows"""
+        chunks: List[Dict[str, Any]] = []
+        start: int = 0
+        for df in batches:
+            chunks.append({'start': start, 'rows': len(df), 'columns': column_statistics(df)})
+            start += len(df)
+        return chunks
+
+    def get(self, path: str, schema_hash: str = '') -> Optional[Dict[str, Any]]:
+        """Record of file, or None when it does not exist or file or schema changes after it recorded"""
+        if (record := self.files.get(os.path.abspath(path))) is None or not os.path.exists(path):
+            return None
+        _stat: os.stat_result = os.stat(path)
+        if (record['size'], record['mtime_ns'], record['schema_hash']) != (
+                _stat.st_size, _stat.st_mtime_ns, schema_hash
+        ):
+            return None
+        return record
+
+    def record(self, path: str, chunks: List[Dict[str, Any]], schema_hash: str = '') -> None:
+        """Record statistics of file from statistics of its chunks, the record does not save"""
+        _stat: os.stat_result = os.stat(path)
+        with self.lock:
+            self.files[os.path.abspath(path)] = {
+                'size': _stat.st_size,
+                'mtime_ns': _stat.st_mtime_ns,
+                'schema_hash': schema_hash,
+                'rows': sum(chunk['rows'] for chunk in chunks),
+                'columns': merge_statistics(chunks),
+                'chunks': chunks,
+            }
+
+    def commit(self, path: str, chunks: List[Dict[str, Any]], schema_hash: str = '') -> None:
+        self.record(path, chunks, schema_hash=schema_hash)
+        self.save()
+
+    @staticmethod
+    def match(columns: Dict[str, Dict[str, Any]], predicates: List[Predicate]) -> bool:
+        return statistics_match(
+            {col: (stats['min'], stats['max']) for col, stats in columns.items() if 'min' in stats}, predicates
+        )
+
+    def prune(self, path: str, predicates: List[Predicate], schema_hash: str = '') -> Optional[List[Dict[str, Any]]]:
+        """
+        Chunks of file that statistics match all predicates, empty list when the file can skip,
+        or None when file does not have record or all chunks match, so the file reads all rows
+        """
+        if not predicates or (record := self.get(path, schema_hash)) is None:
+            return None
+        if not self.match(record['columns'], predicates):
+            return []
+        chunks: List[Dict[str, Any]] = [chunk for chunk in record['chunks'] if self.match(chunk['columns'], predicates)]
+        return None if len(chunks) == len(record['chunks']) else chunks
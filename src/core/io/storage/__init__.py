@@ -1 +1 @@
-from .local import LocalCSVFile
+from .local import LocalCSVFile, LocalParquetFile
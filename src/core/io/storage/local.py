@@ -1,19 +1,57 @@
+import io
 import os
 import re
+import json
+import random
+import hashlib
 import itertools
 from pathlib import Path
-from typing import Any, Dict, Union, Optional
+from typing import Any, Callable, Dict, Union, Optional, List, Iterable, Iterator, Tuple
+import numpy as np
+import pandas as pd
 from src.core.utils import path_join, str_to_bool
+from src.core.utils.path_parser import DirectoryCrawler, defaultCrawler
 from src.core.io import parse_config, load_dotenv
+from src.core.io.dataframe.reader import StreamReader, expand_paths, natural_key, read_csv_batches
+from src.core.io.dataframe.arrow import arrow_type, read_bytes_arrow, read_csv_arrow
+from src.core.io.dataframe.cache import ColumnarCache
+from src.core.io.dataframe.partition import (
+    PartitionIndex, Predicate, Predicates, glob_pattern, hive_partitions, normalize_predicates, pattern_root
+)
+from src.core.io.dataframe.manifest import FileManifest
+from src.core.io.dataframe.compression import (
+    COMPRESSIONS, EXTENSIONS, detect_compression, strip_compression, write_csv
+)
+from src.core.io.dataframe.offsets import RowIndex
+from src.core.io.dataframe.writer import TARGET_SIZE, PartitionedWriter
+from src.core.io.dataframe.parquet import read_parquet
+from src.core.io.dataframe.zonemap import ZoneMap, column_statistics, filter_frame
+from src.core.io.dataframe.inference import dump_catalog, infer_catalog
 
 PROJ_PATH = path_join(Path(__file__).parent, '../../../..')
 load_dotenv(path_join(PROJ_PATH, 'conf'))
+DATA_PATH = os.path.abspath(os.path.join(PROJ_PATH, os.environ.get('DATA_PATH', 'data')))
 
 
 class CSVColumn:
     """
     CSV column object
+    config
+    ------
+        (i)   <column-name>:
+                    datatype: <datatype>
+                    nullable (optional): <nullable>
+                    default (optional): <default>
+                    description (optional): <description>
+
+        (ii)  <column-name>: <datatype> [not null] [default <default>]
     """
+    COL_REGEX = re.compile(
+        r'^\s*(?P<datatype>.+?)(?P<not_null>\s+not\s+null)?(?:\s+default\s+(?P<default>.+?))?\s*$', re.IGNORECASE
+    )
+
+    __slots__ = 'ps_col_datatype', 'ps_col_nullable', 'ps_col_default', 'ps_col_desc'
+
     def __init__(
             self,
             ps_col: Union[str, Dict[str, Any]]
@@ -24,7 +62,8 @@ class CSVColumn:
         self.ps_col_desc: Optional[str] = None
         if isinstance(ps_col, str):
             self.convert_from_string(ps_col)
-        self.convert_from_mapping(ps_col)
+        else:
+            self.convert_from_mapping(dict(ps_col))
 
     def convert_from_string(self, _ps_col: str):
         """
@@ -32,8 +71,14 @@ class CSVColumn:
         example
         -------
             (i)    order_sales_value: "string"
+            (ii)   customer_phone: "integer not null default 000000000"
         """
-        pass
+        match = self.COL_REGEX.match(_ps_col)
+        self.convert_from_mapping({
+            'datatype': match.group('datatype'),
+            'nullable': not match.group('not_null'),
+            'default': match.group('default')
+        })
 
     def convert_from_mapping(self, _ps_col: Dict[str, Any]):
         """
@@ -45,7 +90,10 @@ class CSVColumn:
                     nullable: "false"
                     default: ""
         """
-        pass
+        self.ps_col_datatype: str = _ps_col.pop('datatype', 'string')
+        self.ps_col_nullable: bool = str_to_bool(_ps_col.pop('nullable', True))
+        self.ps_col_default: Optional[str] = _ps_col.pop('default', None)
+        self.ps_col_desc: Optional[str] = _ps_col.pop('description', None)
 
     def __str__(self):
         return f'{self.ps_col_datatype} {("null" if self.ps_col_nullable else "not null")}'
@@ -83,6 +131,8 @@ class CSVFile:
     """
     CSV file object
     """
+    CRAWLER: DirectoryCrawler = defaultCrawler
+
     def __init__(
             self,
             server_conn: str,
@@ -100,8 +150,122 @@ class CSVFile:
     def columns(self):
         pass
 
-    def read(self):
-        pass
+    @property
+    def full_path(self) -> str:
+        """Path or glob pattern of files, the file type appends when file name does not have extension"""
+        return os.path.join(
+            self.sub_path,
+            self.file_name if os.path.splitext(self.file_name)[1] else f"{self.file_name}.{self.file_type}"
+        )
+
+    @property
+    def files(self) -> List[str]:
+        """Files that match `full_path`, and compressed files of it, like `cutomer_2022.csv.zst`"""
+        _pattern: str = glob_pattern(self.full_path)
+        return sorted(
+            {path for ext in ('', *COMPRESSIONS) for path in expand_paths(f'{_pattern}{ext}', crawler=self.CRAWLER)},
+            key=natural_key
+        )
+
+    @property
+    def partitions(self) -> PartitionIndex:
+        """Partition index of files from keys in file name, `{year}`, and hive-style directories"""
+        return PartitionIndex(self.full_path, self.files)
+
+    def read_options(self, path: Optional[str] = None) -> Dict[str, Any]:
+        """Options of `pd.read_csv` for each file, or for `path`"""
+        return {}
+
+    @property
+    def cache(self) -> Optional[ColumnarCache]:
+        return None
+
+    @property
+    def zone_map(self) -> Optional[ZoneMap]:
+        return None
+
+    @property
+    def schema_hash(self) -> str:
+        """Hash of options that change parsed data of file, it is a part of cache key"""
+        return hashlib.sha1(
+            json.dumps(self.read_options(), sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+
+    def read_batches(self, path: str, chunk_size: int = 100000) -> Iterator[pd.DataFrame]:
+        return read_csv_batches(path, chunk_size=chunk_size, **self.read_options(path))
+
+    def stream(
+            self,
+            chunk_size: int = 100000,
+            workers: int = 4,
+            predicates: Optional[Predicates] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream batches of all files that match `full_path`, the files read in parallel on bounded
+        pool but batches keep order of files, so the memory does not depend on size of files. The
+        file that was read before reads from columnar `cache` when it is enabled.
+        :param predicates: predicates of partition values that prune files before read, like
+            `{'year': 2022}` or `[('year', '>=', 2021)]`, and the partition values add to batches
+            as columns. The predicates of other columns filter rows, and the files or chunks of
+            rows that `zone_map` statistics do not match skip without read
+        """
+        _partitions: PartitionIndex = self.partitions
+        yield from StreamReader(
+            self._batch_reader(_partitions, chunk_size=chunk_size, predicates=predicates), workers=workers
+        ).stream(_partitions.prune(predicates))
+
+    def _batch_reader(
+            self,
+            partitions: PartitionIndex,
+            chunk_size: int = 100000,
+            predicates: Optional[Predicates] = None,
+            **options: Any
+    ) -> Callable[[str], Iterator[pd.DataFrame]]:
+        """
+        Reader of batches of each file from `cache` or file, that adds partition values as columns,
+        the `options` pass to `read_batches`. The rows filter with `predicates` of columns that are
+        not partition keys, and only chunks of file that match statistics of `zone_map` read.
+        """
+        _cache: Optional[ColumnarCache] = self.cache
+        _zone_map: Optional[ZoneMap] = self.zone_map
+        _schema_hash: str = self.schema_hash
+        _keys: List[str] = partitions.keys
+        _predicates: List[Predicate] = [
+            predicate for predicate in normalize_predicates(predicates, convert=False) if predicate[0] not in _keys
+        ]
+
+        def _read(path: str) -> Iterator[pd.DataFrame]:
+            chunks: Optional[List[Dict[str, Any]]] = (
+                _zone_map.prune(path, _predicates, _schema_hash) if _zone_map is not None else None
+            )
+            if chunks is not None and not chunks:
+                return
+            if chunks is not None and not detect_compression(path):
+                batches: Iterator[pd.DataFrame] = self.read_chunks(path, chunks, chunk_size=chunk_size)
+            elif _cache is None:
+                batches: Iterator[pd.DataFrame] = self.read_batches(path, chunk_size=chunk_size, **options)
+            else:
+                batches: Iterator[pd.DataFrame] = _cache.read(
+                    path, _schema_hash, lambda _path: self.read_batches(_path, chunk_size=chunk_size, **options),
+                    chunk_size
+                )
+            _values: Dict[str, Any] = partitions.partitions[path]
+            for df in batches:
+                df = df.assign(**{k: v for k, v in _values.items() if k not in df.columns}) if _values else df
+                if _predicates and (df := filter_frame(df, _predicates)).empty:
+                    continue
+                yield df
+
+        return _read
+
+    def read(
+            self,
+            chunk_size: int = 100000,
+            workers: int = 4,
+            predicates: Optional[Predicates] = None
+    ) -> pd.DataFrame:
+        batches: list = list(self.stream(chunk_size=chunk_size, workers=workers, predicates=predicates))
+        return pd.concat(batches, ignore_index=True) if batches else pd.DataFrame()
 
 
 class LocalCSVFile(CSVFile):
@@ -123,6 +287,10 @@ class LocalCSVFile(CSVFile):
 
                 header:
                 encoding:
+                cache (optional): <bool>
+                compression (optional): <zstd|gzip|none>
+                partition_by (optional): <column-name> [<column-name>, ...]
+                target_size (optional): <bytes>
                 ...
             retentions:
                 ...
@@ -131,10 +299,34 @@ class LocalCSVFile(CSVFile):
         (i)   catalog_file_customer:
                     type: io.datasets.LocalCSVFile
                     properties:
-
+                        catalog_name: 'sandbox/local/customer/cutomer_{year}'
+                        catalog_type: 'csv'
+    detail
+    ------
+        The `catalog_name` is path of file in `DATA_PATH` or glob pattern, that supports `**`
+        for sub-directories, and the catalog without directory uses `SUB_PATH`. The matched
+        files stream with `stream` as batches that keep order of files. The partition keys in
+        `catalog_name`, like `cutomer_{year}`, and hive-style directories, like `year=2022/`,
+        build `partitions` index, so `read(predicates={'year': 2022})` reads only files of
+        that year. The parsed file keeps in Arrow IPC cache at `CACHE_PATH` until the file or
+        schemas change, set `cache: false` for the file that reads only once. The `ingest` reads
+        only files that are new or changed since last run, the ingested files keep in manifest
+        at `MANIFEST_PATH`. The gzip or zstd files, like `cutomer_2022.csv.zst`, match catalog
+        and decompress while parsing, and `write` compresses with `compression` of catalog. The
+        row index of file, that stores next to the file, reads any rows with `take` and `sample`
+        without parse whole file. The `write_batches` writes stream of batches to `partition_by`
+        directories, like `year=2022/part-00000.csv.zst`, so the catalog of output can be
+        `catalog_name: 'sandbox/local/customer_out/**/part-*'`. The statistics of columns of each
+        file and chunk of rows record to `zone_map` at `ingest` and write, so the read with
+        `predicates=[('customer_phone', '>=', 900)]` skips files and chunks that can not match
+        and filters rows of other chunks.
     """
     CONF_DELIMITER = os.path.sep
     SUB_PATH = f'{os.environ["PROJ_ENV"]}/local'
+    CACHE_PATH = os.path.join(DATA_PATH, os.environ["PROJ_ENV"], 'cache')
+    CACHE_SIZE = int(os.getenv('CACHE_SIZE', 1024 ** 3))
+    MANIFEST_PATH = os.path.join(DATA_PATH, os.environ["PROJ_ENV"], 'manifest')
+    CRAWLER = DirectoryCrawler(cache_path=os.path.join(CACHE_PATH, 'listing.json'))
 
     def __init__(
             self,
@@ -145,12 +337,22 @@ class LocalCSVFile(CSVFile):
         self.ps_server_conn = 'local'
         self.ps_cat_name: list = properties.pop('catalog_name', catalog_name).split(self.CONF_DELIMITER)
         self.ps_file_name: str = self.ps_cat_name.pop(-1)
-        self.ps_sub_path: str = self.ps_cat_name.pop(-1) if self.ps_cat_name else self.SUB_PATH
-        self.ps_file_type: str = properties.pop('catalog_name', catalog_name)
+        self.ps_sub_path: str = os.path.join(
+            DATA_PATH, (self.CONF_DELIMITER.join(self.ps_cat_name) if self.ps_cat_name else self.SUB_PATH)
+        )
+        self.ps_file_type: str = properties.pop('catalog_type', 'csv')
+        self.ps_cols: Optional[Dict[str, Any]] = properties.pop('schemas', None)
 
         # Properties for Postgres table
         self.ps_file_header: bool = str_to_bool(properties.pop('header', False))
         self.ps_file_encoding: str = properties.pop('encoding', 'utf-8')
+        self.ps_file_delimiter: str = properties.pop('delimiter', ',')
+        self.ps_file_cache: bool = str_to_bool(properties.pop('cache', True))
+        self.ps_file_compression: Optional[str] = (
+            None if (_compression := properties.pop('compression', 'zstd')) in {None, 'none'} else _compression
+        )
+        self.ps_file_partition_by: List[str] = self.get_str_or_list(properties, 'partition_by')
+        self.ps_file_target_size: int = int(properties.pop('target_size', TARGET_SIZE))
 
         # Optional arguments for Postgres table
         self.ps_file_retentions: Optional[Dict[str, Any]] = kwargs.pop('retentions', {})
@@ -162,13 +364,424 @@ class LocalCSVFile(CSVFile):
             self.ps_file_type
         )
 
-    def _schemas(self):
-        pass
+    @property
+    def cache(self) -> Optional[ColumnarCache]:
+        """Columnar cache of parsed files in `CACHE_PATH` that limits size with `CACHE_SIZE` bytes"""
+        return ColumnarCache(self.CACHE_PATH, budget=self.CACHE_SIZE) if self.ps_file_cache else None
 
     @property
-    def schemas(self):
-        pass
+    def schema_hash(self) -> str:
+        return hashlib.sha1(
+            json.dumps([self.ps_cols, self.read_options()], sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+
+    @property
+    def manifest(self) -> FileManifest:
+        """Manifest of files that were ingested in `MANIFEST_PATH`, the name is hash of `full_path`"""
+        return FileManifest(
+            os.path.join(self.MANIFEST_PATH, f"{hashlib.sha1(self.full_path.encode('utf-8')).hexdigest()[:20]}.json")
+        )
+
+    @property
+    def zone_map(self) -> ZoneMap:
+        """Zone maps of files that record at ingestion or write, in root directory of catalog"""
+        return ZoneMap(os.path.join(pattern_root(self.full_path) or self.sub_path, ZoneMap.FILE_NAME))
+
+    def ingest(
+            self,
+            load: Callable[[pd.DataFrame, str], Any],
+            chunk_size: int = 100000,
+            workers: int = 4,
+            predicates: Optional[Predicates] = None
+    ) -> Dict[str, Any]:
+        """
+        Ingest only files that are new or changed since last ingestion, each batch passes to
+        `load` with status of file, `new` for append or `changed` for merge with rows that
+        were loaded from file before. The file records to `manifest` after all batches of file
+        were loaded, so the file that fails to load will ingest again in next run, and the
+        statistics of batches record to `zone_map`.
+        usage:
+            >> file.ingest(lambda df, status: table.copy_frame(df, pool))
+            {'files': ['.../cutomer_2022.csv'], 'skipped': 1, 'rows': 2}
+        """
+        _manifest: FileManifest = self.manifest
+        _zone_map: ZoneMap = self.zone_map
+        _schema_hash: str = self.schema_hash
+        _partitions: PartitionIndex = self.partitions
+        paths: List[str] = _partitions.prune(predicates)
+        pending: Dict[str, Dict[str, Any]] = _manifest.pending(paths)
+        _read: Callable[[str], Iterator[pd.DataFrame]] = self._batch_reader(_partitions, chunk_size=chunk_size)
+
+        def _read_file(path: str) -> Iterator[Tuple[str, Optional[pd.DataFrame]]]:
+            for df in _read(path):
+                yield path, df
+            # The end of batches of file
+            yield path, None
+
+        result: Dict[str, Any] = {'files': [], 'skipped': len(paths) - len(pending), 'rows': 0}
+        rows: int = 0
+        chunks: List[Dict[str, Any]] = []
+        for path, df in StreamReader(_read_file, workers=workers).stream(list(pending)):
+            if df is None:
+                _manifest.commit(path, pending[path], rows=rows)
+                _zone_map.commit(path, chunks, schema_hash=_schema_hash)
+                result['files'].append(path)
+                result['rows'] += rows
+                rows, chunks = 0, []
+                continue
+            load(df, pending[path]['status'])
+            chunks.append({'start': rows, 'rows': len(df), 'columns': column_statistics(df)})
+            rows += len(df)
+        return result
+
+    def read_options(self, path: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            'header': 0 if self.ps_file_header else None,
+            'names': self.file_columns(path),
+            'encoding': self.ps_file_encoding,
+            'sep': self.ps_file_delimiter
+        }
+
+    def file_columns(self, path: Optional[str] = None) -> Optional[List[str]]:
+        """
+        Names of columns in file that does not have header from `schemas`, the keys of hive-style
+        directories of `path`, like `year=2022/`, do not write to file, like files of `write_batches`,
+        so they do not use as names and their values add to batches from path
+        """
+        if self.ps_file_header or not self.ps_cols:
+            return None
+        _keys: Dict[str, Any] = hive_partitions(path, pattern_root(self.full_path)) if path else {}
+        return [col for col in self.ps_cols if col not in _keys]
+
+    @property
+    def column_types(self) -> Dict[str, Any]:
+        """Arrow types of columns from `schemas`, the column that type does not support infers type"""
+        return {
+            col_name: _type for col_name, column in self.schemas.items()
+            if (_type := arrow_type(column.datatype)) is not None
+        }
+
+    @property
+    def defaults(self) -> Dict[str, Any]:
+        return {col_name: column.default for col_name, column in self.schemas.items() if column.default is not None}
+
+    def read_batches(self, path: str, chunk_size: int = 100000) -> Iterator[pd.DataFrame]:
+        """
+        Read file with Arrow csv engine and types of columns from `schemas`, the null values fill
+        with `default` of column, or with `pd.read_csv` when catalog does not have schemas
+        """
+        if not self.ps_cols:
+            return super(LocalCSVFile, self).read_batches(path, chunk_size=chunk_size)
+        return read_csv_arrow(
+            path,
+            column_types=self.column_types,
+            defaults=self.defaults,
+            column_names=self.file_columns(path),
+            encoding=self.ps_file_encoding,
+            delimiter=self.ps_file_delimiter,
+            chunk_size=chunk_size
+        )
+
+    def row_index(self, path: str) -> RowIndex:
+        """Row-offset index of file that builds once and stores next to the file"""
+        if detect_compression(path):
+            raise ValueError(f"Row index does not support compressed file: {path}")
+        return RowIndex.get(path)
+
+    def parse_records(self, data: bytes, index: RowIndex) -> pd.DataFrame:
+        """Parse records from row index, the names of columns from header or from `schemas`"""
+        names: Optional[List[str]] = self.file_columns(index.path)
+        if self.ps_file_header:
+            names = list(pd.read_csv(
+                io.BytesIO(index.read(0)), nrows=0, encoding=self.ps_file_encoding, sep=self.ps_file_delimiter
+            ).columns)
+        if self.ps_cols:
+            return read_bytes_arrow(
+                data, names, column_types=self.column_types, defaults=self.defaults,
+                encoding=self.ps_file_encoding, delimiter=self.ps_file_delimiter
+            )
+        return pd.read_csv(
+            io.BytesIO(data), header=None, names=names, encoding=self.ps_file_encoding, sep=self.ps_file_delimiter
+        ) if data else pd.DataFrame(columns=names)
+
+    def take(self, start: int, count: int = 1, path: Optional[str] = None) -> pd.DataFrame:
+        """
+        Read `count` rows from row `start` of file, or the first file of catalog, with row index,
+        so it does not parse rows before `start`
+        usage:
+            >> file.take(1000000, 10, path='.../sandbox/local/customer/cutomer_2022.csv')
+        """
+        index: RowIndex = self.row_index(path or self.files[0])
+        return self.parse_records(index.read(start + int(self.ps_file_header), count), index).assign(
+            **self.partitions.partitions.get(index.path, {})
+        )
+
+    def read_chunks(
+            self,
+            path: str,
+            chunks: List[Dict[str, Any]],
+            chunk_size: int = 100000
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Read only rows of chunks from zone map with row index, the adjacent chunks read as one
+        range of rows, and each range splits to batches of `chunk_size` rows
+        """
+        index: RowIndex = self.row_index(path)
+        ranges: List[List[int]] = []
+        for chunk in sorted(chunks, key=lambda _: _['start']):
+            if ranges and ranges[-1][1] == chunk['start']:
+                ranges[-1][1] += chunk['rows']
+            else:
+                ranges.append([chunk['start'], chunk['start'] + chunk['rows']])
+        _skip: int = int(self.ps_file_header)
+        for start, end in ranges:
+            for _start in range(start, end, chunk_size):
+                yield self.parse_records(index.read(_start + _skip, min(chunk_size, end - _start)), index)
+
+    def sample(self, n: int, seed: Optional[int] = None, predicates: Optional[Predicates] = None) -> pd.DataFrame:
+        """
+        Read `n` random rows of files of catalog with row index, the rows sample uniformly over
+        all rows of files, and the rows keep order of files
+        """
+        _partitions: PartitionIndex = self.partitions
+        indexes: List[RowIndex] = [self.row_index(path) for path in _partitions.prune(predicates)]
+        _skip: int = int(self.ps_file_header)
+        bounds: np.ndarray = np.cumsum([max(index.rows - _skip, 0) for index in indexes])
+        if not len(bounds) or not bounds[-1]:
+            return pd.DataFrame(columns=list(self.ps_cols or []))
+        rows: List[int] = random.Random(seed).sample(range(int(bounds[-1])), min(n, int(bounds[-1])))
+        counts: np.ndarray = np.bincount(np.searchsorted(bounds, rows, side='right'), minlength=len(indexes))
+        frames: List[pd.DataFrame] = [
+            self.parse_records(index.sample(int(count), start=_skip, seed=seed), index).assign(
+                **_partitions.partitions.get(index.path, {})
+            )
+            for index, count in zip(indexes, counts) if count
+        ]
+        return pd.concat(frames, ignore_index=True)
+
+    def write(self, df: pd.DataFrame, file_name: str, chunk_size: int = 100000) -> str:
+        """
+        Write dataframe to file in `sub_path` with `compression` of catalog, the zstd file writes
+        each chunk as frame with seek table, so the frames decompress in parallel when it reads.
+        The float columns that have only integral values, like integer column with null, write
+        as integer.
+        usage:
+            >> file.write(df, 'cutomer_2023')
+            '.../sandbox/local/customer/cutomer_2023.csv.zst'
+        """
+        if self.ps_file_compression not in {None, *EXTENSIONS}:
+            raise ValueError(f"Compression {self.ps_file_compression!r} does not support in {list(EXTENSIONS)}")
+        path: str = os.path.join(
+            self.sub_path, f"{file_name}.{self.file_type}{EXTENSIONS.get(self.ps_file_compression, '')}"
+        )
+        df = self.prepare_output(df)
+        os.makedirs(self.sub_path, exist_ok=True)
+        batches: List[pd.DataFrame] = [df.iloc[i:i + chunk_size] for i in range(0, max(len(df), 1), chunk_size)]
+        write_csv(
+            batches,
+            path,
+            compression=self.ps_file_compression,
+            header=self.ps_file_header,
+            encoding=self.ps_file_encoding,
+            sep=self.ps_file_delimiter
+        )
+        self.zone_map.commit(path, ZoneMap.chunks(batches), schema_hash=self.schema_hash)
+        return path
+
+    def write_batches(
+            self,
+            batches: Iterable[pd.DataFrame],
+            file_name: str = 'part',
+            partition_by: Optional[List[str]] = None,
+            target_size: Optional[int] = None
+    ) -> List[str]:
+        """
+        Write stream of batches to files in directory of catalog that partition by `partition_by`
+        columns of catalog in hive-style directories, the files roll at `target_size` bytes and
+        move to their paths only when all batches were written, so the reader of catalog does not
+        see output of the pipeline that fails.
+        usage:
+            >> file.write_batches(file.stream(), partition_by=['year'])
+            ['.../sandbox/local/customer_out/year=2021/part-00000.csv.zst', ...]
+        """
+        with PartitionedWriter(
+                pattern_root(self.full_path) or self.sub_path,
+                file_name=file_name,
+                partition_by=partition_by or self.ps_file_partition_by,
+                compression=self.ps_file_compression,
+                target_size=target_size or self.ps_file_target_size,
+                header=self.ps_file_header,
+                encoding=self.ps_file_encoding,
+                file_type=self.file_type,
+                sep=self.ps_file_delimiter
+        ) as writer:
+            for df in batches:
+                writer.write(self.prepare_output(df, keep=writer.partition_by))
+        _zone_map: ZoneMap = self.zone_map
+        for path in writer.paths:
+            _zone_map.record(path, writer.zones.get(path, []), schema_hash=self.schema_hash)
+        _zone_map.save()
+        return writer.paths
+
+    def prepare_output(self, df: pd.DataFrame, keep: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Order columns of dataframe with `schemas` and `keep` columns, and convert float columns
+        that have only integral values, like integer column with null, to integer
+        """
+        if self.ps_cols:
+            df = df.reindex(columns=list(dict.fromkeys([*self.ps_cols, *(keep or [])])))
+        return df.assign(**{
+            col: df[col].astype('Int64') for col in df.select_dtypes('float').columns
+            if (values := df[col].dropna()).eq(values.round()).all()
+        })
+
+    @classmethod
+    def infer(cls, path: str, name: str = 'catalog_file', **kwargs: Any) -> str:
+        """
+        Catalog yaml of csv file with schemas that infer from sampled byte ranges of file, so the
+        schemas of file that has many GB infers in seconds, the `catalog_name` is path of file in
+        `DATA_PATH` when it does not pass
+        usage:
+            >> print(LocalCSVFile.infer('.../sandbox/local/customer/cutomer_2022.csv', 'catalog_file_customer'))
+            catalog_file_customer:
+                 type: src.core.io.storage.LocalCSVFile
+                 ...
+        """
+        kwargs.setdefault('catalog_name', os.path.relpath(
+            os.path.splitext(strip_compression(os.path.abspath(path)))[0], DATA_PATH
+        ))
+        return dump_catalog(name, infer_catalog(path, **kwargs))
+
+    def _schemas(self) -> Dict[str, CSVColumn]:
+        """Generate raw configuration from schemas"""
+        return {k: CSVColumn(v) for k, v in (self.ps_cols or {}).items()}
+
+    @property
+    def schemas(self) -> Dict[str, CSVColumn]:
+        return self._schemas()
 
     @staticmethod
     def get_str_or_list(props, key) -> list:
-        return _return_key if isinstance((_return_key := props.pop(key, [])), list) else [_return_key]
\ No newline at end of file
+        return _return_key if isinstance((_return_key := props.pop(key, [])), list) else [_return_key]
+
+
+class LocalParquetFile(CSVFile):
+    """
+    Local parquet file object
+    config
+    ------
+        <file-alias-name>:
+            type: io.datasets.LocalParquetFile
+            properties:
+                catalog_name: <file-name>
+                catalog_type: 'parquet'
+                schemas (optional):
+                    (i)   <column-name>:
+                                datatype: <datatype>
+                                ...
+
+                    (ii)  <column-name>: <datatype> []
+                          ...
+                ...
+    example
+    -------
+        (i)   catalog_file_sales:
+                    type: io.datasets.LocalParquetFile
+                    properties:
+                        catalog_name: 'sandbox/local/sales/sales_{year}'
+                        catalog_type: 'parquet'
+    detail
+    ------
+        The `catalog_name` matches files like `LocalCSVFile`, with partition keys and hive-style
+        directories. The row groups of each file read in parallel threads, only columns of
+        `schemas`, or `columns` of `read`, read from file, and the row groups that min and max
+        statistics do not match `predicates` skip without read, like
+        `read(columns=['sales_id', 'amount'], predicates=[('amount', '>=', 1000)])`.
+    """
+    CONF_DELIMITER = os.path.sep
+    SUB_PATH = f'{os.environ["PROJ_ENV"]}/local'
+    CRAWLER = LocalCSVFile.CRAWLER
+
+    def __init__(
+            self,
+            catalog_name: str,
+            properties: Dict[str, Any],
+            **kwargs
+    ):
+        self.ps_server_conn = 'local'
+        self.ps_cat_name: list = properties.pop('catalog_name', catalog_name).split(self.CONF_DELIMITER)
+        self.ps_file_name: str = self.ps_cat_name.pop(-1)
+        self.ps_sub_path: str = os.path.join(
+            DATA_PATH, (self.CONF_DELIMITER.join(self.ps_cat_name) if self.ps_cat_name else self.SUB_PATH)
+        )
+        self.ps_file_type: str = properties.pop('catalog_type', 'parquet')
+        self.ps_cols: Optional[Dict[str, Any]] = properties.pop('schemas', None)
+
+        # Optional arguments for parquet file
+        self.ps_file_retentions: Optional[Dict[str, Any]] = kwargs.pop('retentions', {})
+
+        super(LocalParquetFile, self).__init__(
+            self.ps_server_conn,
+            self.ps_sub_path,
+            self.ps_file_name,
+            self.ps_file_type
+        )
+
+    @property
+    def schemas(self) -> Dict[str, CSVColumn]:
+        return {k: CSVColumn(v) for k, v in (self.ps_cols or {}).items()}
+
+    @property
+    def column_types(self) -> Dict[str, Any]:
+        """Arrow types of columns from `schemas` that cast from types of file"""
+        return {
+            col_name: _type for col_name, column in self.schemas.items()
+            if (_type := arrow_type(column.datatype)) is not None
+        }
+
+    def read_batches(
+            self,
+            path: str,
+            chunk_size: int = 100000,
+            columns: Optional[List[str]] = None,
+            filters: Optional[Predicates] = None
+    ) -> Iterator[pd.DataFrame]:
+        """Read row groups of file that match `filters`, the rows filter while read"""
+        return read_parquet(
+            path,
+            columns=columns or (list(self.ps_cols) if self.ps_cols else None),
+            predicates=filters,
+            column_types=self.column_types,
+            chunk_size=chunk_size
+        )
+
+    def stream(
+            self,
+            chunk_size: int = 100000,
+            workers: int = 4,
+            predicates: Optional[Predicates] = None,
+            columns: Optional[List[str]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream batches of all files that match `full_path`, the files prune with partition values
+        and row groups of each file prune with statistics of columns, then the rows filter with
+        `predicates`
+        :param columns: columns that read from files, or columns of `schemas` when it is None
+        """
+        _partitions: PartitionIndex = self.partitions
+        yield from StreamReader(
+            self._batch_reader(_partitions, chunk_size=chunk_size, columns=columns, filters=predicates),
+            workers=workers
+        ).stream(_partitions.prune(predicates))
+
+    def read(
+            self,
+            chunk_size: int = 100000,
+            workers: int = 4,
+            predicates: Optional[Predicates] = None,
+            columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        batches: list = list(self.stream(
+            chunk_size=chunk_size, workers=workers, predicates=predicates, columns=columns
+        ))
+        return pd.concat(batches, ignore_index=True) if batches else pd.DataFrame(columns=columns)
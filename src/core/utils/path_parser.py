@@ -1,6 +1,15 @@
 import os
+import re
+import time
+import json
+import uuid
+import fnmatch
+import threading
 from pathlib import Path
-from typing import AnyStr, Union
+from typing import Any, AnyStr, Dict, Iterator, List, Optional, Tuple, Union
+from .threader import ThreadWithControl, maxThreads
+
+MAGIC_CHARS: str = '*?['
 
 
 def path_join(full_path: Union[AnyStr, Path], full_join_path: str) -> AnyStr:
@@ -34,12 +43,251 @@ def path_join2(path: AnyStr, path_join: str) -> AnyStr:
     return _path
 
 
-def walk(path):
-    for _p in Path(path).iterdir():
-        if _p.is_dir():
-            yield from walk(_p)
-            continue
-        yield _p.resolve()
+def translate_segment(segment: str) -> str:
+    """Translate segment of glob pattern to regular expression that does not match path separator"""
+    _name: str = f'[^{re.escape(os.sep)}]'
+    regex: str = '' if segment.startswith('.') else r'(?!\.)'
+    i: int = 0
+    while i < len(segment):
+        char: str = segment[i]
+        i += 1
+        if char == '*':
+            regex += f'{_name}*'
+        elif char == '?':
+            regex += _name
+        elif char == '[' and (end := segment.find(']', i + 1 + (segment[i:i + 1] == '!'))) != -1:
+            _chars: str = segment[i:end].replace('\\', r'\\')
+            regex += f"[{'^' + _chars[1:] if _chars.startswith('!') else _chars}]"
+            i = end + 1
+        else:
+            regex += re.escape(char)
+    return regex
+
+
+def glob_regex(segments: List[str]) -> re.Pattern:
+    """
+    Compile segments of glob pattern to regular expression of relative path, the `**` segment
+    matches zero or more directories, and the wildcard does not match hidden name like `glob.glob`
+    """
+    _sep: str = re.escape(os.sep)
+    _name: str = rf'(?!\.)[^{_sep}]+'
+    regex: str = ''
+    for i, segment in enumerate(segments):
+        if segment == '**':
+            regex += f'(?:{_name}{_sep})*' + (_name if i == len(segments) - 1 else '')
+        else:
+            regex += translate_segment(segment) + ('' if i == len(segments) - 1 else _sep)
+    return re.compile(regex)
+
+
+def match_prefix(parts: List[str], segments: List[str]) -> bool:
+    """Match parts of relative directory that can be prefix of path that matches segments of glob pattern"""
+    for i, part in enumerate(parts):
+        if i < len(segments) and segments[i] == '**':
+            return True
+        if i >= len(segments) - 1:
+            return False
+        if (part.startswith('.') and not segments[i].startswith('.')) or not fnmatch.fnmatchcase(part, segments[i]):
+            return False
+    return True
+
+
+class DirectoryCrawler:
+    """
+    Directory crawler that lists directories with `os.scandir` in parallel threads level by
+    level, and caches listing of each directory with modified time of directory, so the
+    directory that does not change does not list again. The result of glob pattern caches
+    with modified times of directories that were crawled, and the cache saves to `cache_path`
+    for next runs when it is set.
+    usage:
+        >> crawler = DirectoryCrawler(cache_path='data/sandbox/cache/listing.json')
+        >> crawler.glob('data/sandbox/local/**/*.csv', non_empty=True)
+        ['data/sandbox/local/customer/cutomer_2021.csv', ...]
+    detail:
+        The directory that modified in last `RACY_NS` nanoseconds does not cache, because the
+        directory can change again in same tick of modified time. The file that changes size
+        does not change modified time of directory, so the empty files check size again.
+    """
+    RACY_NS: int = 2 * 10 ** 9
+
+    def __init__(self, cache_path: Optional[str] = None, workers: int = maxThreads):
+        self.cache_path: Optional[str] = cache_path
+        self.workers: int = max(workers, 1)
+        self.lock = threading.RLock()
+        self.dirty: bool = False
+        self._listings: Optional[Dict[str, Dict[str, Any]]] = None
+        self._globs: Optional[Dict[str, Tuple[Dict[str, int], List[str], List[str]]]] = None
+
+    def load(self) -> None:
+        """
+        Load listings and globs from json of `cache_path`, the invalid cache file does not raise,
+        the cache is json, not pickle, because the file in data directory should not run code
+        """
+        self._listings, self._globs = {}, {}
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, mode='r', encoding='utf-8') as f:
+                cache: Dict[str, Any] = json.load(f)
+            self._listings = dict(cache['listings'])
+            self._globs = {pattern: tuple(globbed) for pattern, globbed in cache['globs'].items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            self._listings, self._globs = {}, {}
+
+    def save(self) -> None:
+        if not self.cache_path or not self.dirty:
+            return
+        with self.lock:
+            os.makedirs(os.path.dirname(self.cache_path) or os.curdir, exist_ok=True)
+            tmp: str = f"{self.cache_path}.{uuid.uuid4().hex}.tmp"
+            try:
+                with open(tmp, mode='w', encoding='utf-8') as f:
+                    json.dump({'listings': self.listings, 'globs': self.globs}, f, separators=(',', ':'))
+                os.replace(tmp, self.cache_path)
+                self.dirty = False
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+
+    @property
+    def listings(self) -> Dict[str, Dict[str, Any]]:
+        if self._listings is None:
+            self.load()
+        return self._listings
+
+    @property
+    def globs(self) -> Dict[str, Tuple[Dict[str, int], List[str], List[str]]]:
+        if self._globs is None:
+            self.load()
+        return self._globs
+
+    def clear(self) -> None:
+        with self.lock:
+            self._listings, self._globs = {}, {}
+            self.dirty = True
+        self.save()
+
+    @staticmethod
+    def mtime(path: str) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def scan(self, path: str) -> Optional[Dict[str, Any]]:
+        """
+        Listing of directory with `mtime_ns`, size of `files` and names of sub-directories in
+        `dirs`, from cache when modified time of directory does not change
+        """
+        if (_mtime := self.mtime(path)) is None:
+            return None
+        if (listing := self.listings.get(path)) and listing['mtime_ns'] == _mtime:
+            return listing
+        files: Dict[str, int] = {}
+        dirs: List[str] = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            dirs.append(entry.name)
+                        elif entry.is_file():
+                            files[entry.name] = entry.stat().st_size
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        listing = {'mtime_ns': _mtime, 'files': files, 'dirs': sorted(dirs)}
+        if time.time_ns() - _mtime > self.RACY_NS:
+            with self.lock:
+                self.listings[path] = listing
+                self.dirty = True
+        return listing
+
+    def _scan_paths(self, paths: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Scan directories in parallel threads, the listings keep order of paths"""
+        if len(paths) < 2 or self.workers < 2:
+            return [self.scan(path) for path in paths]
+        _size: int = -(-len(paths) // self.workers)
+        threads: List[ThreadWithControl] = []
+        for i in range(0, len(paths), _size):
+            _thread = ThreadWithControl(
+                target=lambda _paths: [self.scan(_path) for _path in _paths], args=(paths[i:i + _size], )
+            )
+            _thread.daemon = True
+            _thread.start()
+            threads.append(_thread)
+        return [listing for _thread in threads for listing in _thread.join()]
+
+    def crawl(self, root: str, segments: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Listings of all directories under `root`, or only directories that can match `segments`
+        of glob pattern when it is set
+        """
+        result: Dict[str, Dict[str, Any]] = {}
+        frontier: List[Tuple[str, List[str]]] = [(os.path.abspath(root), [])]
+        while frontier:
+            _frontier: List[Tuple[str, List[str]]] = []
+            for (path, parts), listing in zip(frontier, self._scan_paths([_path for _path, _ in frontier])):
+                if listing is None:
+                    continue
+                result[path] = listing
+                for name in listing['dirs']:
+                    if segments is None or match_prefix([*parts, name], segments):
+                        _frontier.append((os.path.join(path, name), [*parts, name]))
+            frontier = _frontier
+        self.save()
+        return result
+
+    def match(self, pattern: str) -> Tuple[List[str], List[str]]:
+        """
+        Sorted paths of files that match glob pattern and paths of files that were empty, the
+        result caches with modified times of crawled directories
+        """
+        pattern = os.path.abspath(pattern)
+        parts: List[str] = pattern.split(os.sep)
+        if (idx := next((i for i, _ in enumerate(parts) if any(c in _ for c in MAGIC_CHARS)), None)) is None:
+            if not os.path.isfile(pattern):
+                return [], []
+            return [pattern], ([] if os.path.getsize(pattern) else [pattern])
+        if (cached := self.globs.get(pattern)) and all(self.mtime(k) == v for k, v in cached[0].items()):
+            return cached[1], [path for path in cached[2] if os.path.isfile(path) and not os.path.getsize(path)]
+        root: str = os.sep.join(parts[:idx]) or os.sep
+        segments: List[str] = parts[idx:]
+        listings: Dict[str, Dict[str, Any]] = self.crawl(root, segments)
+        regex: re.Pattern = glob_regex(segments)
+        files: Dict[str, int] = {}
+        for path, listing in listings.items():
+            _prefix: str = '' if path == root else f'{os.path.relpath(path, root)}{os.sep}'
+            for name, size in listing['files'].items():
+                if regex.fullmatch(f'{_prefix}{name}'):
+                    files[os.path.join(path, name)] = size
+        paths: List[str] = sorted(files)
+        empty: List[str] = [path for path in paths if not files[path]]
+        if all(path in self.listings for path in listings):
+            with self.lock:
+                self.globs[pattern] = ({path: listing['mtime_ns'] for path, listing in listings.items()}, paths, empty)
+                self.dirty = True
+            self.save()
+        return paths, empty
+
+    def glob(self, pattern: str, non_empty: bool = False) -> List[str]:
+        """Sorted paths of files that match glob pattern, that supports `**` for sub-directories"""
+        paths, empty = self.match(pattern)
+        if non_empty and empty:
+            _empty: set = set(empty)
+            return [path for path in paths if path not in _empty]
+        return list(paths)
+
+
+defaultCrawler = DirectoryCrawler()
+
+
+def walk(path: Union[AnyStr, Path]) -> Iterator[Path]:
+    """Walk all files under path with `os.scandir` listings of `defaultCrawler`"""
+    for _path, listing in defaultCrawler.crawl(os.path.abspath(path)).items():
+        for name in listing['files']:
+            yield Path(os.path.join(_path, name))
 
 
 if __name__ == '__main__':
@@ -1,11 +1,13 @@
 import inspect
 import threading
 import os
-from typing import Any
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator
 import ctypes
 
 threadList: dict = {}
-maxThreads = os.getenv('THREAD_LIMIT', 4)
+maxThreads = int(os.getenv('THREAD_LIMIT', 4))
 
 
 def _async_raise(tid, exc_type):
@@ -126,5 +128,25 @@ class ThreadWithControl(threading.Thread):
         self.raise_exc(SystemExit)
 
 
+def prefetch(function: Callable[[Any], Any], items: Iterable[Any], workers: int = maxThreads) -> Iterator[Any]:
+    """
+    Apply function to items in thread pool and yield results in order of items, only `workers`
+    results run ahead of the consumer, so the memory of results bounds with `workers`. The
+    executor does not share limiter of `ThreadWithControl`, so it does not wait for threads of
+    `StreamReader` that consume it.
+    usage:
+        >> list(prefetch(lambda a: a * 2, [1, 2, 3], workers=2))
+        [2, 4, 6]
+    """
+    futures: deque = deque()
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        for item in items:
+            futures.append(executor.submit(function, item))
+            if len(futures) > workers:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
+
+
 if __name__ == '__main__':
     pass
@@ -51,6 +51,9 @@ class AIColumnObject:
     """
     COLUMN_CONSTRAINTS: set = {'unique', 'not null', 'null', 'primary key', 'constraint', 'check'}
 
+    __slots__ = 'ps_column_datatype', 'ps_column_unique', 'ps_column_nullable', 'ps_column_primary_key', \
+                'ps_column_foreign_key', 'ps_column_check', 'ps_column_comment'
+
     def __init__(self, ps_column_detail: Union[str, Dict[str, Any]]):
         self.ps_column_datatype: Optional[str] = None
         self.ps_column_unique: Optional[str] = None
@@ -0,0 +1,44 @@
+import os
+import sys
+import types
+import importlib
+import importlib.util
+from contextlib import contextmanager
+from typing import Iterator
+from unittest import mock
+
+DB_CONN: dict = {'host': 'localhost', 'port': 5432, 'dbname': 'sandbox', 'user': 'test', 'password': 'test'}
+
+
+def _database_package() -> None:
+    """
+    Register `src.core.io.database` without its `__init__` when it does not import, like it
+    imports module that does not exist, so its submodules still import from its directory
+    """
+    try:
+        importlib.import_module('src.core.io.database')
+    except ImportError:
+        spec = importlib.util.find_spec('src.core.io.database')
+        package = types.ModuleType(spec.name)
+        package.__path__ = list(spec.submodule_search_locations)
+        package.__file__ = spec.origin
+        sys.modules[spec.name] = package
+        setattr(sys.modules['src.core.io'], 'database', package)
+
+
+@contextmanager
+def sandbox_imports() -> Iterator[None]:
+    """
+    Import modules of database and storage packages with `sandbox` environment that does not
+    read `conf/.env` and `conf/config.yaml`, the connection of config is `DB_CONN`
+    usage:
+        >> with sandbox_imports():
+        >>     from src.core.io.database.postgresql_obj import PostgresTable
+    """
+    _database_package()
+    with mock.patch.dict(os.environ, {'PROJ_ENV': 'sandbox'}), \
+            mock.patch('src.core.io.load_dotenv'), \
+            mock.patch('src.core.io.parse_config', return_value={
+                'datasets': {'postgresql.sandbox': {'connection': dict(DB_CONN)}}
+            }):
+        yield
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import pyarrow as pa
+from src.core.io.dataframe import arrow
+from src.core.io.dataframe.arrow import arrow_type, read_csv_arrow
+
+
+class ArrowTypeTest(unittest.TestCase):
+
+    def test_arrow_type(self):
+        self.assertEqual(arrow_type('integer'), pa.int64())
+        self.assertEqual(arrow_type('varchar( 64 )'), pa.string())
+        self.assertEqual(arrow_type('numeric( 20, 6 )'), pa.decimal128(20, 6))
+        self.assertEqual(arrow_type('Double  Precision'), pa.float64())
+        self.assertIsNone(arrow_type('geometry'))
+
+
+class ReadCSVArrowTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'customer_2022.csv')
+        with open(self.path, 'w') as f:
+            f.write('C1,Ann,0812\nC2,,\nC3,Cid,0899\n')
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _read(self, **kwargs):
+        return list(read_csv_arrow(
+            self.path,
+            column_types={'customer_id': pa.string(), 'customer_name': pa.string(), 'customer_phone': pa.int64()},
+            column_names=['customer_id', 'customer_name', 'customer_phone'],
+            **kwargs
+        ))
+
+    def test_typed_and_defaults(self):
+        df = self._read(defaults={'customer_phone': '000000000'})[0]
+        self.assertEqual(str(df['customer_phone'].dtype), 'Int64')
+        self.assertEqual(df['customer_phone'].tolist(), [812, 0, 899])
+        self.assertEqual(df['customer_id'].tolist(), ['C1', 'C2', 'C3'])
+        self.assertTrue(df['customer_name'].isna().tolist()[1])
+
+    def test_batches_and_stream(self):
+        self.assertEqual([len(_) for _ in self._read(chunk_size=2)], [2, 1])
+        self.assertEqual(sum(len(_) for _ in self._read(chunk_size=2, stream_size=0)), 3)
+
+
+class ReadBlocksArrowTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'order_2022.csv')
+        mock.patch.object(arrow, 'BLOCK_SIZE', 64 * 1024).start()
+
+    def tearDown(self) -> None:
+        mock.patch.stopall()
+        self.tmp.cleanup()
+
+    def _write(self, code) -> None:
+        with open(self.path, 'w') as f:
+            f.write('order_id,code\n')
+            f.writelines(f'{i},{code(i)}\n' for i in range(40000))
+
+    def test_types_of_first_block(self):
+        self._write(lambda i: i if i < 20000 else '')
+        dfs = list(read_csv_arrow(self.path, chunk_size=1000, stream_size=1000))
+        self.assertEqual(sum(len(_) for _ in dfs), 40000)
+        self.assertEqual({str(_['code'].dtype) for _ in dfs}, {'Int64'})
+        self.assertEqual(int(dfs[-1]['code'].isna().sum()), len(dfs[-1]))
+
+    def test_types_of_first_block_conversion_error(self):
+        self._write(lambda i: i if i < 20000 else 'A123')
+        with self.assertRaisesRegex(pa.ArrowInvalid, "conversion error to int64: invalid value 'A123'"):
+            list(read_csv_arrow(self.path, chunk_size=1000, stream_size=1000))
+        dfs = list(read_csv_arrow(self.path, column_types={'code': pa.string()}, chunk_size=1000, stream_size=1000))
+        self.assertEqual(dfs[-1]['code'].tolist()[-1], 'A123')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import time
+import tempfile
+import unittest
+import pandas as pd
+from src.core.io.dataframe.cache import ColumnarCache
+
+
+class ColumnarCacheTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'customer_2022.csv')
+        self._write('C1,Ann,812\nC2,,\nC3,Cid,899\n')
+        self.cache = ColumnarCache(os.path.join(self.tmp.name, 'cache'))
+        self.calls = 0
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _write(self, text: str) -> None:
+        with open(self.path, 'w') as f:
+            f.write(text)
+
+    def _read_batches(self, path: str):
+        self.calls += 1
+        df = pd.read_csv(path, header=None, names=['id', 'name', 'phone'], dtype={'phone': 'Int64'})
+        for i in range(0, len(df), 2):
+            yield df.iloc[i:i + 2].reset_index(drop=True)
+
+    def _read(self, schema_hash: str = 'v1') -> pd.DataFrame:
+        return pd.concat(list(self.cache.read(self.path, schema_hash, self._read_batches, 2)), ignore_index=True)
+
+    def test_miss_and_hit(self):
+        df = self._read()
+        self.assertEqual(len(self.cache.entries), 1)
+        cached = self._read()
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(df.equals(cached))
+        self.assertEqual(str(cached['phone'].dtype), 'Int64')
+
+    def test_stale_entry(self):
+        self._read()
+        self._write('C1,Ann,812\n')
+        os.utime(self.path, ns=(time.time_ns() + 10 ** 9, time.time_ns() + 10 ** 9))
+        self.assertEqual(len(self._read()), 1)
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(len(self.cache.entries), 1)
+        self._read(schema_hash='v2')
+        self.assertEqual(self.calls, 3)
+
+    def test_incomplete_read_does_not_cache(self):
+        next(self.cache.read(self.path, 'v1', self._read_batches, 2))
+        self.assertEqual(self.cache.entries, [])
+
+    def test_evict_over_budget(self):
+        self._read()
+        self.cache.budget = 0
+        self.assertEqual(len(self.cache.evict()), 1)
+        self.assertEqual(self.cache.entries, [])
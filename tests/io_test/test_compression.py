@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+import pyarrow as pa
+import zstandard as zstd
+from src.core.io.dataframe.arrow import read_csv_arrow
+from src.core.io.dataframe.reader import read_csv_batches
+from src.core.io.dataframe.compression import (
+    detect_compression, read_frames, seek_table, seek_table_frame, strip_compression, write_csv
+)
+
+
+class CompressionTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.df = pd.DataFrame({
+            'customer_id': [f'C{i}' for i in range(10)],
+            'customer_phone': list(range(800, 810)),
+        })
+        self.batches = [self.df.iloc[i:i + 4] for i in range(0, 10, 4)]
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.tmp.name, name)
+
+    def _read_arrow(self, path: str, **kwargs) -> pd.DataFrame:
+        return pd.concat(list(read_csv_arrow(
+            path, column_types={'customer_id': pa.string(), 'customer_phone': pa.int64()}, **kwargs
+        )), ignore_index=True)
+
+    def test_detect_compression(self):
+        write_csv(self.batches, self._path('customer.csv.gz'), compression='gzip')
+        write_csv(self.batches, self._path('customer.csv'), compression='zstd')
+        write_csv(self.batches, self._path('plain.csv'), compression=None)
+        self.assertEqual(detect_compression(self._path('customer.csv.gz')), 'gzip')
+        self.assertEqual(detect_compression(self._path('customer.csv')), 'zstd')
+        self.assertIsNone(detect_compression(self._path('plain.csv')))
+        self.assertEqual(strip_compression('cutomer_2022.csv.zst'), 'cutomer_2022.csv')
+
+    def test_zstd_seek_table(self):
+        self.assertEqual(write_csv(self.batches, path := self._path('customer.csv.zst')), 10)
+        self.assertEqual([size for _, size in seek_table(path)], [len(df.to_csv(index=False)) - (
+            0 if i == 0 else len('customer_id,customer_phone\n')
+        ) for i, df in enumerate(self.batches)])
+        self.assertEqual(b''.join(read_frames(path, workers=2)).decode(), self.df.to_csv(index=False))
+        df = self._read_arrow(path)
+        self.assertEqual(df['customer_phone'].tolist(), self.df['customer_phone'].tolist())
+        self.assertEqual(len(pd.concat(list(read_csv_batches(path)))), 10)
+
+    def test_frames_split_in_line(self):
+        data: bytes = self.df.to_csv(index=False).encode()
+        frames = [data[:13], data[13:50], data[50:]]
+        compressed = [zstd.ZstdCompressor().compress(frame) for frame in frames]
+        with open(path := self._path('customer.csv.zst'), 'wb') as f:
+            f.write(b''.join(compressed))
+            f.write(seek_table_frame([(len(c), len(frame)) for c, frame in zip(compressed, frames)]))
+        df = self._read_arrow(path)
+        self.assertEqual(df['customer_id'].tolist(), self.df['customer_id'].tolist())
+
+    def test_gzip(self):
+        write_csv(self.batches, path := self._path('customer.csv.gz'), compression='gzip', header=False)
+        df = self._read_arrow(path, column_names=['customer_id', 'customer_phone'])
+        self.assertEqual(df['customer_id'].tolist(), self.df['customer_id'].tolist())
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+import yaml
+import pandas as pd
+from src.core.io.dataframe.compression import write_csv
+from src.core.io.dataframe.inference import (
+    detect_header, dump_catalog, infer_catalog, infer_datatype, parse_sample, sample_ranges
+)
+
+
+class InferenceTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'orders.csv')
+        self.df = pd.DataFrame({
+            'order_id': range(5000),
+            'phone': [f'0812{i % 100}' for i in range(5000)],
+            'amount': [i / 4 for i in range(5000)],
+            'paid': ['true' if i % 2 else 'false' for i in range(5000)],
+            'day': [f'2022-01-{i % 28 + 1:02d}' for i in range(5000)],
+            'created_at': [f'2022-01-01 10:{i % 60:02d}:00' for i in range(5000)],
+            'note': [
+                None if i % 3 == 0 else f'note "{i % 5}",\nnext' if i % 50 == 1 else f'n{i % 5}' for i in range(5000)
+            ],
+        })
+        self.df.to_csv(self.path, index=False)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_infer_datatype(self):
+        for values, datatype in (
+                (['1', '-20', None], 'integer'), (['1', '3000000000'], 'bigint'), (['1.5', '2', '1e3'], 'double'),
+                (['0812', '0899'], 'string'), (['True', 'false'], 'boolean'), (['2022-01-31'], 'date'),
+                (['2022-02-30'], 'string'), (['2022-01-31T10:00:00Z', '2022-01-31 10:00'], 'timestamp'),
+                ([None], 'string'),
+        ):
+            self.assertEqual(infer_datatype(pd.Series(values, dtype=object)), datatype, values)
+        self.assertEqual(infer_datatype(pd.Series([*map(str, range(200)), 'x']), tolerance=2), 'integer')
+
+    def test_sample_ranges(self):
+        blocks = sample_ranges(self.path, ranges=8, range_size=4096)
+        self.assertEqual(len(blocks), 8)
+        self.assertTrue(blocks[0].startswith(b'order_id,'))
+        self.assertTrue(all(block.endswith(b'\n') for block in blocks))
+        df, header = parse_sample(blocks)
+        self.assertTrue(header)
+        self.assertEqual(list(df.columns), list(self.df.columns))
+        self.assertLess(len(df), len(self.df))
+
+    def test_detect_header(self):
+        self.df.to_csv(self.path, index=False, header=False)
+        _, header = parse_sample(sample_ranges(self.path))
+        self.assertFalse(header)
+        self.assertFalse(detect_header(pd.DataFrame([['C1', 'Ann', '0812']])))
+        self.assertTrue(detect_header(pd.DataFrame([['customer_id', 'phone'], ['C1', '0812']])))
+
+    def test_infer_catalog(self):
+        catalog = infer_catalog(self.path, 'sandbox/local/orders/orders', ranges=8, range_size=4096)
+        schemas = catalog['properties']['schemas']
+        self.assertEqual({col: schema['datatype'] for col, schema in schemas.items()}, {
+            'order_id': 'integer', 'phone': 'string', 'amount': 'double', 'paid': 'boolean',
+            'day': 'date', 'created_at': 'timestamp', 'note': 'string',
+        })
+        self.assertEqual(schemas['note']['nullable'], 'true')
+        self.assertEqual(schemas['order_id']['nullable'], 'false')
+        self.assertIn('(unique)', schemas['order_id']['description'])
+        self.assertIn('(low)', schemas['paid']['description'])
+        config = yaml.safe_load(dump_catalog('catalog_file_orders', catalog))['catalog_file_orders']
+        self.assertEqual(config['properties']['catalog_name'], 'sandbox/local/orders/orders')
+        self.assertEqual(config['properties']['header'], 'true')
+
+    def test_compressed(self):
+        write_csv([self.df], path := os.path.join(self.tmp.name, 'orders.csv.gz'), compression='gzip')
+        catalog = infer_catalog(path)
+        self.assertEqual(catalog['properties']['catalog_name'], os.path.join(self.tmp.name, 'orders'))
+        self.assertEqual(catalog['properties']['schemas']['amount']['datatype'], 'double')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import pandas as pd
+from src.core.utils.path_parser import DirectoryCrawler
+from tests.io_test.sandbox import sandbox_imports
+
+with sandbox_imports():
+    from src.core.io.storage.local import LocalCSVFile
+
+
+class LocalCSVFileTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.crawler = mock.patch.object(LocalCSVFile, 'CRAWLER', DirectoryCrawler())
+        self.crawler.start()
+        self.df = pd.DataFrame({'a': range(6), 'b': list('uvwxyz'), 'year': [2021, 2022] * 3})
+
+    def tearDown(self) -> None:
+        self.crawler.stop()
+        self.tmp.cleanup()
+
+    def catalog(self, **properties) -> LocalCSVFile:
+        return LocalCSVFile('catalog_file', {
+            'catalog_name': os.path.join(self.tmp.name, 'customer', '**', 'part-*'),
+            'schemas': {'a': 'integer', 'b': 'string', 'year': 'integer'},
+            'cache': 'false',
+            **properties,
+        })
+
+    def test_write_batches_round_trip(self):
+        for header, compression in (('false', 'zstd'), ('false', 'none'), ('true', 'zstd')):
+            with self.subTest(header=header, compression=compression):
+                file = self.catalog(header=header, compression=compression, partition_by='year')
+                paths = file.write_batches([self.df.iloc[:3], self.df.iloc[3:]])
+                self.assertEqual(len(paths), 2)
+                df = file.read().sort_values('a', ignore_index=True)
+                self.assertEqual(list(df.columns), ['a', 'b', 'year'])
+                self.assertEqual(df['b'].tolist(), self.df['b'].tolist())
+                self.assertEqual(df['year'].tolist(), self.df['year'].tolist())
+                self.assertEqual(file.read(predicates={'year': 2022})['a'].tolist(), [1, 3, 5])
+
+    def test_take_partitioned_file(self):
+        file = self.catalog(compression='none', partition_by='year')
+        paths = file.write_batches([self.df])
+        df = file.take(1, 2, path=paths[0])
+        self.assertEqual(df.to_dict('list'), {'a': [2, 4], 'b': ['w', 'y'], 'year': [2021, 2021]})
+
+
+if __name__ == '__main__':
+    unittest.main()
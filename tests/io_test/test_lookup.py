@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.core.io.dataframe.lookup import KeyCache
+from src.core.io.dataframe.validation import FrameValidator
+
+
+class KeyCacheTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.source: list = [3, 1, 2]
+        self.watermarks: list = []
+
+        def loader(watermark):
+            self.watermarks.append(watermark)
+            return [key for key in self.source if watermark is None or key > watermark]
+        self.cache = KeyCache(loader)
+
+    def test_contains_load_once(self):
+        self.assertEqual(self.cache.contains([1, 4, 3]).tolist(), [True, False, True])
+        self.assertEqual(self.cache.contains(['2', None]).tolist(), [True, False])
+        self.assertEqual(self.watermarks, [None])
+
+    def test_refresh_incremental(self):
+        self.cache.refresh()
+        self.source.extend([5, 4])
+        self.assertEqual(self.cache.refresh(), 2)
+        self.assertEqual(self.watermarks, [None, 3])
+        self.assertEqual(self.cache.keys.tolist(), [1, 2, 3, 4, 5])
+
+    def test_refresh_string_keys(self):
+        # The new uuid or string key is not greater than maximum key, so the refresh reloads all keys
+        source: list = ['b', 'c']
+        watermarks: list = []
+
+        def loader(watermark):
+            watermarks.append(watermark)
+            return [key for key in source if watermark is None or key > watermark]
+        cache = KeyCache(loader)
+        self.assertEqual(cache.contains(['a', 'b']).tolist(), [False, True])
+        source.append('a')
+        self.assertEqual(cache.refresh(), 1)
+        self.assertEqual(watermarks, [None, None])
+        self.assertEqual(cache.contains(['a', 'b', 'c']).tolist(), [True, True, True])
+
+    def test_resolve_and_orphans(self):
+        cache = KeyCache(lambda watermark: [['a', 10], ['b', 20]])
+        self.assertEqual(cache.resolve(['b', 'c'], default=-1).tolist(), [20, -1])
+        self.assertEqual(cache.orphans(pd.Series(['a', 'x', None])).tolist(), [False, True, False])
+
+    def test_validator_foreign_key(self):
+        validator = FrameValidator({}, foreign_keys={'cust_id': self.cache})
+        good, rejected = validator.split(pd.DataFrame({'cust_id': [1, 9, np.nan]}))
+        self.assertEqual(len(good), 2)
+        self.assertEqual(rejected['reject_reasons'].tolist(), ['cust_id:foreign_key;'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import time
+import tempfile
+import unittest
+from src.core.io.dataframe.manifest import FileManifest
+
+
+class FileManifestTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manifest_path = os.path.join(self.tmp.name, 'manifest', 'customer.json')
+        self.paths = [os.path.join(self.tmp.name, f'cutomer_{year}.csv') for year in (2021, 2022)]
+        for path in self.paths:
+            self._write(path, 'C1,Ann,812\n')
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    @staticmethod
+    def _write(path: str, text: str, offset: int = 0) -> None:
+        with open(path, 'w') as f:
+            f.write(text)
+        if offset:
+            os.utime(path, ns=(time.time_ns() + offset, time.time_ns() + offset))
+
+    def _ingest(self) -> dict:
+        manifest = FileManifest(self.manifest_path)
+        pending = manifest.pending(self.paths)
+        for path, state in pending.items():
+            manifest.commit(path, state, rows=1)
+        return {os.path.basename(path): state['status'] for path, state in pending.items()}
+
+    def test_new_and_processed(self):
+        self.assertEqual(self._ingest(), {'cutomer_2021.csv': 'new', 'cutomer_2022.csv': 'new'})
+        self.assertEqual(self._ingest(), {})
+
+    def test_changed_file(self):
+        self._ingest()
+        self._write(self.paths[1], 'C1,Ann,812\nC2,Bob,899\n', offset=10 ** 9)
+        self.assertEqual(self._ingest(), {'cutomer_2022.csv': 'changed'})
+
+    def test_touched_file(self):
+        self._ingest()
+        self._write(self.paths[0], 'C1,Ann,812\n', offset=10 ** 9)
+        self.assertEqual(self._ingest(), {})
+        manifest = FileManifest(self.manifest_path)
+        self.assertEqual(
+            manifest.files[os.path.abspath(self.paths[0])]['mtime_ns'], os.stat(self.paths[0]).st_mtime_ns
+        )
+
+    def test_reset(self):
+        self._ingest()
+        FileManifest(self.manifest_path).reset([self.paths[0]])
+        self.assertEqual(self._ingest(), {'cutomer_2021.csv': 'new'})
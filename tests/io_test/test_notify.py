@@ -0,0 +1,32 @@
+import os
+import asyncio
+import unittest
+
+
+@unittest.skipUnless(os.getenv('POSTGRES_TEST_DSN'), 'set POSTGRES_TEST_DSN to test with local Postgres instance')
+class PostgresNotifyTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        from psycopg.conninfo import conninfo_to_dict
+        from src.core.io.database.plugins.postgresql_plugin import PostgresConn
+        self.conn = PostgresConn(conninfo_to_dict(os.environ['POSTGRES_TEST_DSN']))
+
+    def test_listen_notify(self):
+        async def run():
+            async def receive():
+                return [_ async for _ in self.conn.listen('public.customer', timeout=5.0, stop_after=1)]
+            listener = asyncio.create_task(receive())
+            await asyncio.sleep(0.5)
+            await asyncio.to_thread(
+                self.conn.notify, 'public.customer', {'catalog': 'public.customer', 'action': 'test', 'rows': 3}
+            )
+            return await listener
+
+        notifies = asyncio.run(run())
+        self.assertEqual(len(notifies), 1)
+        self.assertEqual(notifies[0]['channel'], 'public.customer')
+        self.assertEqual(notifies[0]['payload']['rows'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
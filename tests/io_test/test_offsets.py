@@ -0,0 +1,68 @@
+import os
+import io
+import time
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from src.core.io.dataframe.offsets import RowIndex, record_ends
+
+
+class RowIndexTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'customer.csv')
+        self.df = pd.DataFrame({
+            'customer_id': [f'C{i}' for i in range(100)],
+            'customer_note': [f'line {i}\nnext "{i}"' if i % 7 == 0 else f'note {i}' for i in range(100)],
+        })
+        self.df.to_csv(self.path, index=False)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _frame(self, data: bytes) -> pd.DataFrame:
+        return pd.read_csv(io.BytesIO(data), header=None, names=list(self.df.columns))
+
+    def test_record_ends(self):
+        ends, quotes = record_ends(np.frombuffer(b'a,"b\nc"\nd\n', dtype=np.uint8))
+        self.assertEqual(ends.tolist(), [7, 9])
+        self.assertEqual(quotes, 2)
+
+    def test_read(self):
+        for stride in (1, 4, 1024):
+            index = RowIndex.build(self.path, stride=stride, scan_size=64)
+            self.assertEqual(index.rows, 101)
+            pd.testing.assert_frame_equal(self._frame(index.read(1, 100)), self.df)
+            pd.testing.assert_frame_equal(self._frame(index.read(15, 3)), self.df.iloc[14:17].reset_index(drop=True))
+            self.assertEqual(index.read(101), b'')
+
+    def test_ranges(self):
+        index = RowIndex.build(self.path, stride=4)
+        blocks = list(index.blocks(256, start=1))
+        self.assertGreater(len(blocks), 1)
+        pd.testing.assert_frame_equal(
+            pd.concat([self._frame(block) for block in blocks], ignore_index=True), self.df
+        )
+
+    def test_sample(self):
+        index = RowIndex.build(self.path, stride=8)
+        df = self._frame(index.sample(10, start=1, seed=1))
+        self.assertEqual(len(df), 10)
+        self.assertTrue(df['customer_id'].isin(self.df['customer_id']).all())
+        self.assertTrue(df['customer_id'].str[1:].astype(int).is_monotonic_increasing)
+        self.assertEqual(index.sample(10, start=1, seed=1), index.sample(10, start=1, seed=1))
+
+    def test_get_stale(self):
+        index = RowIndex.get(self.path)
+        self.assertTrue(os.path.exists(index.index_path))
+        self.assertEqual(RowIndex.load(self.path).rows, index.rows)
+        time.sleep(0.01)
+        self.df.iloc[:10].to_csv(self.path, index=False)
+        self.assertIsNone(RowIndex.load(self.path))
+        self.assertEqual(RowIndex.get(self.path).rows, 11)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.core.io.dataframe.parquet import prune_row_groups, read_parquet
+
+
+class ParquetTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'sales.parquet')
+        self.df = pd.DataFrame({
+            'sales_id': [f'S{i}' for i in range(100)],
+            'amount': list(range(100)),
+            'region': ['th' if i < 50 else 'sg' for i in range(100)],
+        })
+        pq.write_table(pa.Table.from_pandas(self.df, preserve_index=False), self.path, row_group_size=10)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _read(self, **kwargs) -> pd.DataFrame:
+        return pd.concat(list(read_parquet(self.path, **kwargs)), ignore_index=True)
+
+    def test_prune_row_groups(self):
+        metadata = pq.ParquetFile(self.path).metadata
+        self.assertEqual(prune_row_groups(metadata, []), list(range(10)))
+        self.assertEqual(prune_row_groups(metadata, [('amount', '>=', 85)]), [8, 9])
+        self.assertEqual(prune_row_groups(metadata, [('amount', 'in', {5, 42})]), [0, 4])
+        self.assertEqual(prune_row_groups(metadata, [('region', '=', 'sg'), ('amount', '<', 60)]), [5])
+        self.assertEqual(prune_row_groups(metadata, [('amount', '=', 'x'), ('unknown', '=', 1)]), list(range(10)))
+
+    def test_read_order(self):
+        df = self._read(chunk_size=7, workers=3)
+        self.assertEqual(df['sales_id'].tolist(), self.df['sales_id'].tolist())
+        self.assertEqual(str(df['amount'].dtype), 'Int64')
+
+    def test_projection_filter(self):
+        df = self._read(columns=['sales_id'], predicates=[('amount', '>=', 95), ('region', '!=', 'th')])
+        self.assertEqual(list(df.columns), ['sales_id'])
+        self.assertEqual(df['sales_id'].tolist(), [f'S{i}' for i in range(95, 100)])
+        self.assertEqual(list(read_parquet(self.path, predicates={'amount': 1000})), [])
+
+    def test_column_types(self):
+        df = self._read(columns=['amount'], column_types={'amount': pa.float64()})
+        self.assertEqual(str(df['amount'].dtype), 'float64')
+
+
+if __name__ == '__main__':
+    unittest.main()
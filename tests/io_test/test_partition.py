@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+from src.core.io.dataframe.partition import PartitionIndex, normalize_predicates
+
+
+class PartitionIndexTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        for sub_path in (
+                'customer/cutomer_2021.csv', 'customer/cutomer_2022.csv',
+                'sales/region=th/sales_2022_01.csv', 'sales/region=sg/sales_2022_02.csv',
+                'sales/region=sg/sales_2023_01.csv'
+        ):
+            os.makedirs(os.path.dirname(path := os.path.join(self.tmp.name, sub_path)), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write('C1,Ann\n')
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _names(self, paths):
+        return [os.path.basename(path) for path in paths]
+
+    def test_file_name_partitions(self):
+        index = PartitionIndex(os.path.join(self.tmp.name, 'customer/cutomer_{year}.csv'))
+        self.assertEqual(index.keys, ['year'])
+        self.assertEqual(self._names(index.prune({'year': 2022})), ['cutomer_2022.csv'])
+        self.assertEqual(self._names(index.prune({'year': '2021'})), ['cutomer_2021.csv'])
+        self.assertEqual(len(index.prune()), 2)
+
+    def test_hive_partitions(self):
+        index = PartitionIndex(os.path.join(self.tmp.name, 'sales/**/sales_{year}_{month}.csv'))
+        self.assertEqual(set(index.keys), {'region', 'year', 'month'})
+        self.assertEqual(
+            self._names(index.prune([('region', '=', 'sg'), ('year', '>=', 2023)])), ['sales_2023_01.csv']
+        )
+        self.assertEqual(
+            self._names(index.prune({'region': ['th', 'sg'], 'month': 1})), ['sales_2023_01.csv', 'sales_2022_01.csv']
+        )
+
+    def test_missing_key_does_not_prune(self):
+        index = PartitionIndex(os.path.join(self.tmp.name, 'customer/cutomer_*.csv'))
+        self.assertEqual(len(index.prune({'year': 2022})), 2)
+
+    def test_invalid_operator(self):
+        with self.assertRaises(ValueError):
+            normalize_predicates([('year', 'like', 2022)])
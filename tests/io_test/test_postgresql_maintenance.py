@@ -0,0 +1,114 @@
+import unittest
+from unittest import mock
+import psycopg
+
+from tests.io_test.sandbox import DB_CONN, sandbox_imports
+
+with sandbox_imports():
+    from src.core.io.database.plugins.postgresql_maintenance import MaterializedViewRefresher, TableMaintainer
+
+
+def plan(table_name: str, action: str = 'analyze') -> dict:
+    return {'table_name': table_name, 'action': action, 'score': 0.5, 'dead_rows': 0, 'modified_rows': 2000}
+
+
+class TableMaintainerTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.maintainer = TableMaintainer(DB_CONN, tables=['customer', 'ai.order_transaction'])
+        pool = mock.patch('src.core.io.database.plugins.postgresql_maintenance.PostgresPool').start()
+        self.conn = pool.return_value.__enter__.return_value.connection.return_value.__enter__.return_value
+        mock.patch.object(TableMaintainer, 'plan', return_value=[
+            plan('public.customer', 'vacuum analyze'), plan('ai.order_transaction')
+        ]).start()
+
+    def tearDown(self) -> None:
+        mock.patch.stopall()
+
+    def test_run(self):
+        results = self.maintainer.run()
+        self.assertEqual({k: (v['action'], v['status']) for k, v in results.items()}, {
+            'public.customer': ('vacuum analyze', 'success'), 'ai.order_transaction': ('analyze', 'success')
+        })
+        self.assertEqual(
+            sorted(str(_[0][0].as_string(None)) for _ in self.conn.execute.call_args_list),
+            ['analyze ai.order_transaction', 'vacuum analyze public.customer']
+        )
+
+    def test_run_records_failed_table(self):
+        self.conn.execute.side_effect = [psycopg.OperationalError('canceled'), None]
+        results = self.maintainer.run()
+        self.assertEqual(sorted(_['status'] for _ in results.values()), ['failed', 'success'])
+        self.assertIn(
+            'psycopg:OperationalError: canceled', [_.get('error') for _ in results.values()]
+        )
+
+    def test_run_records_worker_error(self):
+        def _maintain(pool, _plan: dict) -> dict:
+            if _plan['table_name'] == 'public.customer':
+                raise KeyError('dead_rows')
+            return {'action': _plan['action'], 'status': 'success', 'duration': 0.1}
+
+        with mock.patch.object(TableMaintainer, '_maintain', side_effect=_maintain):
+            results = self.maintainer.run()
+        self.assertEqual(list(results), ['public.customer', 'ai.order_transaction'])
+        self.assertEqual(results['public.customer']['action'], 'vacuum analyze')
+        self.assertEqual(results['public.customer']['status'], 'failed')
+        self.assertEqual(results['public.customer']['error'], "builtins:KeyError: 'dead_rows'")
+        self.assertEqual(results['ai.order_transaction']['status'], 'success')
+
+
+class MaterializedViewRefresherTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        mock.patch.object(MaterializedViewRefresher, '_properties', return_value={
+            'ai.vw_sales': {'populated': True, 'concurrently': True},
+            'ai.vw_sales_month': {'populated': True, 'concurrently': False},
+            'ai.vw_customer': {'populated': True, 'concurrently': False},
+        }).start()
+        mock.patch.object(MaterializedViewRefresher, 'dependencies', return_value={
+            'ai.vw_sales': set(), 'ai.vw_sales_month': {'ai.vw_sales'}, 'ai.vw_customer': set(),
+        }).start()
+        pool = mock.patch('src.core.io.database.plugins.postgresql_maintenance.PostgresPool').start()
+        self.pool = pool.return_value.__enter__.return_value
+        self.conn = self.pool.connection.return_value.__enter__.return_value
+        self.refresher = MaterializedViewRefresher(DB_CONN, schemas=['ai'])
+
+    def tearDown(self) -> None:
+        mock.patch.stopall()
+
+    def test_refresh(self):
+        results = self.refresher.refresh()
+        self.assertEqual({k: v['status'] for k, v in results.items()}, {
+            'ai.vw_sales': 'success', 'ai.vw_sales_month': 'success', 'ai.vw_customer': 'success'
+        })
+        statements: list = [str(_[0][0].as_string(None)) for _ in self.conn.execute.call_args_list]
+        self.assertIn('refresh materialized view concurrently ai.vw_sales', statements)
+        self.assertGreater(
+            statements.index('refresh materialized view ai.vw_sales_month'),
+            statements.index('refresh materialized view concurrently ai.vw_sales')
+        )
+
+    def test_refresh_records_any_error(self):
+        def _execute(statement):
+            if str(statement.as_string(None)).endswith('ai.vw_sales'):
+                raise TimeoutError('pool timeout')
+
+        self.conn.execute.side_effect = _execute
+        results = self.refresher.refresh()
+        self.assertEqual(results['ai.vw_sales']['status'], 'failed')
+        self.assertEqual(results['ai.vw_sales']['error'], 'builtins:TimeoutError: pool timeout')
+        self.assertEqual(results['ai.vw_sales_month'], {'status': 'skipped', 'error': "depends on 'ai.vw_sales'"})
+        self.assertEqual(results['ai.vw_customer']['status'], 'success')
+
+    def test_refresh_connection_error(self):
+        self.pool.connection.side_effect = ValueError('invalid dsn')
+        results = self.refresher.refresh()
+        self.assertEqual(
+            {k: v['status'] for k, v in results.items()},
+            {'ai.vw_sales': 'failed', 'ai.vw_sales_month': 'skipped', 'ai.vw_customer': 'failed'}
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
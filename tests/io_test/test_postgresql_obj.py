@@ -0,0 +1,381 @@
+import sys
+import unittest
+from unittest import mock
+import pandas as pd
+import psycopg
+
+from tests.io_test.sandbox import sandbox_imports
+
+with sandbox_imports():
+    from src.core.io.database.plugins.postgresql_plugin import (
+        ColumnObject, PostgresConn, SchemaObject, TableObject
+    )
+    from src.core.io.database.postgresql_obj import (
+        PostgresColumn, PostgresTable, compare_schemas, normalize_datatype, parse_column, validate_catalogs
+    )
+
+
+def table_patches() -> list:
+    """Patches of table object that do not query its columns from database"""
+    return [
+        mock.patch.object(TableObject, 'generate_columns', return_value={}),
+        mock.patch.object(TableObject, 'generate_constraints', return_value={}),
+        mock.patch.object(TableObject, 'exists', new_callable=mock.PropertyMock, return_value=True),
+    ]
+
+
+def postgres_table(properties: dict, **kwargs) -> PostgresTable:
+    patches: list = table_patches()
+    for _ in patches:
+        _.start()
+    try:
+        return PostgresTable('customer', {'catalog_name': 'public.customer', **properties}, **kwargs)
+    finally:
+        for _ in patches:
+            _.stop()
+
+
+class ShadowLoadTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.table = postgres_table({'schemas': {'cust_id': 'integer', 'name': 'varchar( 64 )'}})
+        self.df = pd.DataFrame({'cust_id': [1, 2, 3], 'name': ['a', 'b', 'c']})
+        self.patches = [
+            *table_patches(),
+            mock.patch.object(TableObject, 'definitions', return_value={
+                'constraints': {}, 'indexes': {'customer_idx': 'CREATE INDEX customer_idx ON public.customer (name)'}
+            }),
+            mock.patch('src.core.io.database.postgresql_obj.PostgresPool'),
+        ]
+        self.mocks = [_.start() for _ in self.patches]
+        self.pool = self.mocks[-1].return_value.__enter__.return_value
+        self.dependents = mock.patch.object(TableObject, 'dependents', return_value={
+            'foreign_keys': [], 'views': {}
+        }).start()
+        self.execute = mock.patch.object(PostgresConn, 'execute').start()
+        connect = mock.patch.object(PostgresConn, 'connect').start()
+        self.swap = connect.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value
+
+    def tearDown(self) -> None:
+        mock.patch.stopall()
+
+    def swap_statements(self) -> list:
+        return [str(_[0][0].as_string(None)) for _ in self.swap.execute.call_args_list]
+
+    def assertDropShadow(self):
+        self.assertIn('drop table if exists sandbox.public.customer_shadow', self.execute.call_args[0][1])
+
+    def test_partial_copy_does_not_swap(self):
+        with mock.patch.object(TableObject, 'copy_frame', return_value=2):
+            with self.assertRaises(RuntimeError):
+                self.table.shadow_load(self.df, validate=False)
+        self.assertDropShadow()
+        self.swap.execute.assert_not_called()
+
+    def test_copy_error_does_not_swap(self):
+        with mock.patch.object(TableObject, 'copy_frame', side_effect=psycopg.OperationalError('lost')):
+            with self.assertRaises(psycopg.OperationalError):
+                self.table.shadow_load(self.df, validate=False)
+        self.assertDropShadow()
+        self.swap.execute.assert_not_called()
+
+    def test_index_error_does_not_swap(self):
+        conn = self.pool.connection.return_value.__enter__.return_value
+        conn.execute.side_effect = psycopg.errors.DiskFull('no space')
+        with mock.patch.object(TableObject, 'copy_frame', return_value=3):
+            with self.assertRaises(psycopg.errors.DiskFull):
+                self.table.shadow_load(self.df, validate=False)
+        self.assertDropShadow()
+        self.swap.execute.assert_not_called()
+
+    def test_swap(self):
+        with mock.patch.object(TableObject, 'copy_frame', return_value=3):
+            result = self.table.shadow_load(self.df, validate=False)
+        self.assertEqual(result['loaded'], 3)
+        self.assertIn('customer_idx_shadow on sandbox.public.customer_shadow', str(
+            self.pool.connection.return_value.__enter__.return_value.execute.call_args[0][0]
+        ))
+        self.assertTrue(result['swapped'])
+        self.assertEqual(self.swap_statements()[:3], [
+            'drop table sandbox.public.customer;',
+            'alter table sandbox.public.customer_shadow rename to customer;',
+            'alter index sandbox.public.customer_idx_shadow rename to customer_idx;',
+        ])
+
+    def test_swap_error_raises(self):
+        self.swap.execute.side_effect = [None, psycopg.errors.LockNotAvailable('lock timeout')]
+        with mock.patch.object(TableObject, 'copy_frame', return_value=3):
+            with self.assertRaises(psycopg.errors.LockNotAvailable):
+                self.table.shadow_load(self.df, validate=False)
+        self.assertDropShadow()
+
+    def test_referenced_table(self):
+        self.dependents.return_value = {'foreign_keys': [{
+            'table_name': 'public.orders', 'constraint_name': 'orders_cust_id_fkey',
+            'definition': 'FOREIGN KEY (cust_id) REFERENCES public.customer(cust_id) NOT VALID'
+        }], 'views': {}}
+        with mock.patch.object(TableObject, 'copy_frame', return_value=3):
+            result = self.table.shadow_load(self.df, validate=False)
+        self.assertTrue(result['swapped'])
+        self.assertEqual(result['foreign_keys'], {'public.orders.orders_cust_id_fkey': 'valid'})
+        statements: list = self.swap_statements()
+        self.assertEqual(statements[:2], [
+            'alter table public.orders drop constraint orders_cust_id_fkey;', 'drop table sandbox.public.customer;'
+        ])
+        self.assertIn(
+            'alter table public.orders add constraint orders_cust_id_fkey '
+            'FOREIGN KEY (cust_id) REFERENCES public.customer(cust_id) not valid;', statements
+        )
+        self.assertGreater(
+            statements.index('alter table public.orders add constraint orders_cust_id_fkey '
+                             'FOREIGN KEY (cust_id) REFERENCES public.customer(cust_id) not valid;'),
+            statements.index('alter table sandbox.public.customer_shadow rename to customer;')
+        )
+        self.assertEqual(
+            self.execute.call_args[0][1], 'alter table public.orders validate constraint orders_cust_id_fkey'
+        )
+
+    def test_referenced_table_not_validate(self):
+        self.dependents.return_value = {'foreign_keys': [{
+            'table_name': 'public.orders', 'constraint_name': 'orders_cust_id_fkey',
+            'definition': 'FOREIGN KEY (cust_id) REFERENCES public.customer(cust_id)'
+        }], 'views': {}}
+
+        def _execute(_, statement: str) -> None:
+            if 'validate constraint' in statement:
+                raise psycopg.errors.ForeignKeyViolation('key (cust_id)=(4) is not present')
+
+        self.execute.side_effect = _execute
+        with mock.patch.object(TableObject, 'copy_frame', return_value=3):
+            result = self.table.shadow_load(self.df, validate=False)
+        self.assertTrue(result['swapped'])
+        self.assertEqual(result['foreign_keys'], {
+            'public.orders.orders_cust_id_fkey': 'psycopg:ForeignKeyViolation: key (cust_id)=(4) is not present'
+        })
+
+    def test_dependent_views_refuse(self):
+        self.dependents.return_value = {'foreign_keys': [], 'views': {'ai.vw_customer': 'materialized view'}}
+        with mock.patch.object(TableObject, 'copy_frame', return_value=3) as copy_frame:
+            with self.assertRaisesRegex(psycopg.errors.DependentObjectsStillExist, 'materialized view ai.vw_customer'):
+                self.table.shadow_load(self.df, validate=False)
+        copy_frame.assert_not_called()
+        self.execute.assert_not_called()
+        self.swap.execute.assert_not_called()
+
+
+class CreateIndexesTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.table = postgres_table({
+            'schemas': {'cust_id': 'integer', 'name': 'varchar( 64 )'},
+            'indexes': {'customer_name_idx': {'columns': ['name']}, 'customer_id_idx': {'columns': ['cust_id']}},
+        })
+        mock.patch.object(PostgresConn, 'query', return_value=[('customer_id_idx', False)]).start()
+        self.pool = mock.patch('src.core.io.database.postgresql_obj.PostgresPool').start().return_value.__enter__()
+        self.conn = self.pool.connection.return_value.__enter__.return_value
+
+    def tearDown(self) -> None:
+        mock.patch.stopall()
+
+    def test_create_indexes(self):
+        results = self.table.create_indexes()
+        self.assertEqual({k: v['status'] for k, v in results.items()}, {
+            'customer_name_idx': 'success', 'customer_id_idx': 'success'
+        })
+        self.assertIn(
+            'drop index concurrently if exists sandbox.public.customer_id_idx',
+            [str(_[0][0].as_string(None)) for _ in self.conn.execute.call_args_list]
+        )
+
+    def test_drop_failed_index_error(self):
+        def _execute(statement):
+            if str(statement.as_string(None)).startswith('drop'):
+                raise psycopg.OperationalError('connection lost')
+            raise psycopg.errors.UniqueViolation('duplicate key')
+
+        self.conn.execute.side_effect = _execute
+        results = self.table.create_indexes()
+        self.assertEqual(results['customer_name_idx'], {
+            'status': 'failed', 'error': 'psycopg:UniqueViolation: duplicate key',
+            'drop_error': 'psycopg:OperationalError: connection lost', 'duration': mock.ANY
+        })
+        self.assertEqual(results['customer_id_idx']['status'], 'failed')
+        self.assertEqual(results['customer_id_idx']['error'], 'psycopg:OperationalError: connection lost')
+
+    def test_connection_error(self):
+        self.pool.connection.side_effect = psycopg.OperationalError('pool timeout')
+        results = self.table.create_indexes()
+        self.assertEqual({k: v['status'] for k, v in results.items()}, {
+            'customer_name_idx': 'failed', 'customer_id_idx': 'failed'
+        })
+        self.assertEqual(results['customer_name_idx']['error'], 'psycopg:OperationalError: pool timeout')
+
+
+class NormalizeDatatypeTest(unittest.TestCase):
+
+    def test_normalize(self):
+        for datatype, expected in (
+                ('varchar( 128 )', 'varchar(128)'),
+                ('character varying(128)', 'varchar(128)'),
+                ('serial', 'integer'),
+                ('int4', 'integer'),
+                ('bigserial', 'bigint'),
+                ('numeric( 20, 6 )', 'numeric(20,6)'),
+                ('decimal(20,6)', 'numeric(20,6)'),
+                ('timestamp(6) without time zone', 'timestamp'),
+                ('timestamp without time zone', 'timestamp'),
+                ('timestamptz', 'timestamp with time zone'),
+                ('TIMESTAMP WITH TIME ZONE', 'timestamp with time zone'),
+                ('integer ARRAY[4]', 'array'),
+                ('text[]', 'array'),
+                ('jsonb', 'jsonb'),
+        ):
+            with self.subTest(datatype=datatype):
+                self.assertEqual(normalize_datatype(datatype), expected)
+
+
+class CompareSchemasTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.schemas = PostgresTable.merge_schemas(
+            {
+                'cust_id': PostgresColumn('serial'),
+                'name': PostgresColumn('varchar( 128 ) not null'),
+                'region_id': PostgresColumn('integer'),
+                'email': PostgresColumn('varchar( 64 )'),
+            },
+            ['cust_id'], ['email'], {'region_id': 'region(region_id)'}
+        )
+
+    def test_missing_table(self):
+        result = compare_schemas('sandbox.public.customer', self.schemas, {})
+        self.assertFalse(result['exists'])
+        self.assertEqual(result['missing'], ['cust_id', 'name', 'region_id', 'email'])
+        self.assertEqual(result['statements'], [
+            'create table sandbox.public.customer ( cust_id serial not null, name varchar( 128 ) not null, '
+            'region_id integer, email varchar( 64 ), unique (email), primary key (cust_id), '
+            'foreign key (region_id) references region(region_id) );'
+        ])
+
+    def test_drift(self):
+        columns = {
+            'cust_id': ColumnObject('cust_id', 1, False, 'integer', "nextval('customer_cust_id_seq')", [
+                {'constraint_type': 'primary key', 'constraint_name': 'customer_pkey'}
+            ]),
+            'name': ColumnObject('name', 2, False, 'character varying(128)'),
+            'region_id': ColumnObject('region_id', 3, True, 'bigint'),
+            'legacy': ColumnObject('legacy', 4, True, 'text'),
+        }
+        result = compare_schemas('sandbox.public.customer', self.schemas, columns)
+        self.assertTrue(result['exists'])
+        self.assertEqual((result['missing'], result['extra']), (['email'], ['legacy']))
+        self.assertEqual(list(result['changed']), ['region_id'])
+        self.assertEqual(set(result['changed']['region_id']), {'datatype', 'foreign_key'})
+        self.assertEqual(result['statements'], [
+            'alter table sandbox.public.customer add column email varchar( 64 ), '
+            'alter column region_id type integer using region_id::integer, '
+            'add foreign key (region_id) references region(region_id);'
+        ])
+
+    def test_no_drift(self):
+        columns = {
+            'cust_id': ColumnObject('cust_id', 1, False, 'integer', None, [
+                {'constraint_type': 'primary key', 'constraint_name': 'customer_pkey'}
+            ]),
+            'name': ColumnObject('name', 2, False, 'character varying(128)'),
+            'region_id': ColumnObject('region_id', 3, True, 'integer', None, [
+                {'constraint_type': 'foreign key', 'foreign_table_name': 'region', 'foreign_column_name': 'region_id'}
+            ]),
+            'email': ColumnObject('email', 4, True, 'character varying(64)', None, [
+                {'constraint_type': 'unique', 'constraint_name': 'customer_email_key'}
+            ]),
+        }
+        result = compare_schemas('sandbox.public.customer', self.schemas, columns)
+        self.assertEqual((result['changed'], result['statements']), ({}, []))
+
+
+class ValidateCatalogsTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.catalogs = {
+            'catalog_customer': {
+                'type': 'src.core.io.database.PostgresTable',
+                'properties': {'catalog_name': 'public.customer', 'schemas': {'cust_id': 'integer'}},
+            },
+        }
+
+    def test_introspection_error(self):
+        with mock.patch.object(
+                SchemaObject, 'generate_columns', side_effect=psycopg.OperationalError('connection refused')
+        ):
+            result = validate_catalogs(self.catalogs)['catalog_customer']
+        self.assertEqual(result['statements'], [])
+        self.assertIsNone(result['exists'])
+        self.assertEqual(result['error'], 'psycopg:OperationalError: connection refused')
+
+    def test_missing_table(self):
+        with mock.patch.object(SchemaObject, 'generate_columns', return_value={}):
+            result = validate_catalogs(self.catalogs)['catalog_customer']
+        self.assertNotIn('error', result)
+        self.assertEqual(result['statements'], ['create table sandbox.public.customer ( cust_id integer );'])
+
+
+class ParseColumnTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        parse_column.cache_clear()
+
+    def test_parse(self):
+        self.assertEqual(dict(parse_column("varchar( 15 ) NOT NULL PRIMARY KEY --The customer ID")), {
+            'default': None, 'constraint': None, 'check': None, 'unique': False, 'nullable': False,
+            'datatype': 'varchar( 15 )', 'description': 'the customer id', 'primary_key': True, 'foreign_key': False,
+        })
+        self.assertEqual(
+            dict(parse_column("integer REFERENCES public.segment(seg_id)"))['foreign_key'], 'public.segment(seg_id)'
+        )
+
+    def test_parse_once_per_definition(self):
+        columns: list = [PostgresColumn("varchar( 64 ) not null unique") for _ in range(100)]
+        self.assertEqual(parse_column.cache_info().misses, 1)
+        self.assertEqual(parse_column.cache_info().hits, 99)
+        self.assertIs(columns[0].datatype, columns[-1].datatype)
+        self.assertIs(columns[0].datatype, sys.intern('varchar( 64 )'))
+        self.assertEqual({(_.nullable, _.unique) for _ in columns}, {(False, True)})
+
+    def test_parse_result_immutable(self):
+        column = PostgresColumn("integer default 0")
+        column.ps_col_default = '1'
+        self.assertEqual(PostgresColumn("integer default 0").default, '0')
+
+
+class PostgresTableConfigTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.table = postgres_table({
+            'schemas': {'cust_id': 'integer primary key', 'seg_id': 'integer references public.segment(seg_id)'},
+        })
+
+    def test_caches_per_version(self):
+        with mock.patch('src.core.io.database.postgresql_obj.hash') as _hash:
+            version: int = self.table.config_version
+            schemas, validator, foreign_keys = self.table.schemas, self.table.validator, self.table.foreign_keys
+            self.assertIs(self.table.schemas, schemas)
+            self.assertIs(self.table.validator, validator)
+            self.assertIs(self.table.foreign_keys, foreign_keys)
+            self.assertEqual(self.table.config_version, version)
+        _hash.assert_not_called()
+        self.assertEqual(list(foreign_keys), ['seg_id'])
+
+    def test_load_config_invalidates(self):
+        version: int = self.table.config_version
+        validator, foreign_keys = self.table.validator, self.table.foreign_keys
+        self.table.load_config({'schemas': {'cust_id': 'integer primary key', 'name': 'varchar( 64 )'}})
+        self.assertNotEqual(self.table.config_version, version)
+        self.assertEqual(list(self.table.schemas), ['cust_id', 'name'])
+        self.assertIsNot(self.table.validator, validator)
+        self.assertIsNot(self.table.foreign_keys, foreign_keys)
+        self.assertEqual(self.table.foreign_keys, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,450 @@
+import sys
+import asyncio
+import timeit
+import tracemalloc
+import unittest
+from typing import Any, Callable, Tuple
+from unittest import mock
+import pandas as pd
+import psycopg
+
+from tests.io_test.sandbox import DB_CONN, sandbox_imports
+
+with sandbox_imports():
+    from src.core.io.database.plugins.postgresql_plugin import (
+        HideMeta, ColumnObject, PostgresConn, PostgresPool, TableObject
+    )
+
+
+def table(cls: type = TableObject) -> TableObject:
+    """Table object that does not query its columns from database"""
+    with mock.patch.object(TableObject, 'generate_columns', return_value={}), \
+            mock.patch.object(TableObject, 'generate_constraints', return_value={}), \
+            mock.patch.object(TableObject, 'exists', new_callable=mock.PropertyMock, return_value=True):
+        return cls(DB_CONN, 'public', 'customer')
+
+
+class DeleteBatchesTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.table = table()
+        self.patches = [
+            mock.patch('psycopg.connect'),
+            mock.patch('time.sleep'),
+            mock.patch.object(TableObject, 'contention', return_value={'lock_waits': 0, 'replication_lag': 0}),
+        ]
+        connect, _, _ = [_.start() for _ in self.patches]
+        self.conn = connect.return_value.__enter__.return_value
+        self.cur = self.conn.cursor.return_value.__enter__.return_value
+
+    def tearDown(self) -> None:
+        for _ in self.patches:
+            _.stop()
+
+    def test_delete_matches_condition(self):
+        self.cur.fetchall.side_effect = [[(1,), (2,)], [(2,)], []]
+        result = self.table.delete_batches("updated < '2022-01-01'", 'cust_id', batch_size=2)
+        self.assertEqual((result['deleted'], result['batches']), (3, 2))
+        statement, params = self.cur.execute.call_args_list[1][0]
+        self.assertIn('ctid = any(array(select ctid from batch))', str(statement))
+        self.assertEqual(str(statement).count("(updated < '2022-01-01')"), 2)
+        self.assertEqual(params, {'last_key': 2})
+
+    def test_lock_retries_bounded(self):
+        self.cur.execute.side_effect = psycopg.errors.LockNotAvailable()
+        with self.assertRaises(psycopg.errors.LockNotAvailable):
+            self.table.delete_batches("updated < '2022-01-01'", 'cust_id', max_lock_retries=2)
+        self.assertEqual(self.cur.execute.call_count, 3)
+        self.assertEqual(self.conn.rollback.call_count, 3)
+
+
+class StatsTest(unittest.TestCase):
+    relation: tuple = ('reltuples', 'relpages', 'table_size', 'indexes_size', 'total_size', 'block_size')
+
+    def setUp(self) -> None:
+        self.table = table()
+        PostgresConn.reset_health()
+        connect = mock.patch('psycopg.connect').start()
+        self.cur = connect.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value
+        self.cur.description = [(_,) for _ in self.relation]
+
+    def tearDown(self) -> None:
+        mock.patch.stopall()
+        PostgresConn.reset_health()
+
+    def statements(self) -> list:
+        return [str(_[0][0].as_string(None)) for _ in self.cur.execute.call_args_list]
+
+    def test_estimated(self):
+        self.cur.fetchall.side_effect = [
+            [(1000.0, 10, 8192 * 20, 16384, 8192 * 22, 8192)],
+            [('cust_id', 0.0, -1.0), ('segment', 0.25, 4.0)],
+        ]
+        self.assertEqual(self.table.stats(), {
+            'rows': 2000,
+            'estimated': True,
+            'size': {'table': 8192 * 20, 'indexes': 16384, 'total': 8192 * 22},
+            'columns': {
+                'cust_id': {'null_frac': 0.0, 'n_distinct': 2000},
+                'segment': {'null_frac': 0.25, 'n_distinct': 4},
+            }
+        })
+        self.assertEqual(len(self.statements()), 2)
+        self.assertIn("'public.customer'::regclass", self.statements()[0])
+
+    def test_never_analyzed_counts(self):
+        self.cur.fetchall.side_effect = [
+            [(-1.0, 0, 8192 * 3, 0, 8192 * 3, 8192)],
+            [(150,)],
+            [],
+        ]
+        result = self.table.stats()
+        self.assertEqual((result['rows'], result['estimated'], result['columns']), (150, False, {}))
+        self.assertIn('select count(*) from sandbox.public.customer', self.statements()[1])
+
+    def test_exact(self):
+        self.cur.fetchall.side_effect = [
+            [(1000.0, 10, 8192 * 10, 0, 8192 * 10, 8192)],
+            [(998,)],
+            [('cust_id', 0.0, -1.0)],
+        ]
+        result = self.table.stats(exact=True)
+        self.assertEqual((result['rows'], result['estimated']), (998, False))
+        self.assertEqual(result['columns'], {'cust_id': {'null_frac': 0.0, 'n_distinct': 998}})
+
+
+class DependentsTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.table = table()
+        PostgresConn.reset_health()
+        connect = mock.patch('psycopg.connect').start()
+        self.cur = connect.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value
+        self.cur.description = [('table_name',), ('constraint_name',), ('definition',)]
+
+    def tearDown(self) -> None:
+        mock.patch.stopall()
+        PostgresConn.reset_health()
+
+    def test_dependents(self):
+        self.cur.fetchall.side_effect = [
+            [('public.orders', 'orders_cust_id_fkey', 'FOREIGN KEY (cust_id) REFERENCES public.customer(cust_id)')],
+            [('ai.vw_customer', 'materialized view')],
+        ]
+        self.assertEqual(self.table.dependents(), {
+            'foreign_keys': [{
+                'table_name': 'public.orders', 'constraint_name': 'orders_cust_id_fkey',
+                'definition': 'FOREIGN KEY (cust_id) REFERENCES public.customer(cust_id)'
+            }],
+            'views': {'ai.vw_customer': 'materialized view'},
+        })
+        statements: list = [str(_[0][0].as_string(None)) for _ in self.cur.execute.call_args_list]
+        self.assertIn("con.confrelid = 'public.customer'::regclass", statements[0])
+        self.assertIn("d.refobjid = 'public.customer'::regclass", statements[1])
+
+
+class CopyFrameTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.table = table()
+        self.pool = mock.MagicMock()
+        conn = self.pool.connection.return_value.__enter__.return_value
+        self.copy = conn.cursor.return_value.__enter__.return_value.copy.return_value.__enter__.return_value
+        self.df = pd.DataFrame({'cust_id': range(10), 'score': [1.0, None] * 5})
+
+    def test_copy_chunks(self):
+        self.assertEqual(self.table.copy_frame(self.df, self.pool, chunk_size=3), 10)
+        self.assertEqual(self.copy.write.call_count, 4)
+
+    def test_copy_raises_chunk_error(self):
+        self.copy.write.side_effect = [None, psycopg.OperationalError('connection lost'), None, None]
+        with self.assertRaises(psycopg.OperationalError):
+            self.table.copy_frame(self.df, self.pool, chunk_size=3)
+
+
+class PostgresPoolTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        PostgresConn.reset_health()
+        self.connect = mock.patch('psycopg.connect', side_effect=lambda **kwargs: mock.MagicMock(closed=False)).start()
+
+    def tearDown(self) -> None:
+        mock.patch.stopall()
+        PostgresConn.reset_health()
+
+    def test_reuse_idle_connection(self):
+        with PostgresPool(DB_CONN, pool_size=2) as pool:
+            with pool.connection() as conn:
+                pass
+            with pool.connection() as _conn:
+                self.assertIs(_conn, conn)
+                with pool.connection() as __conn:
+                    self.assertIsNot(__conn, conn)
+            self.assertEqual(self.connect.call_count, 2)
+            self.assertTrue(self.connect.call_args[1]['autocommit'])
+        self.assertEqual(pool.pool_conns, [])
+        for _ in (conn, __conn):
+            _.close.assert_called_once()
+
+    def test_rollback_on_any_error(self):
+        pool = PostgresPool(DB_CONN, pool_size=1, autocommit=False)
+        with self.assertRaises(KeyError):
+            with pool.connection() as conn:
+                raise KeyError('cust_id')
+        conn.rollback.assert_called_once()
+        self.assertIs(pool.pool_idle.get_nowait(), conn)
+
+    def test_failed_rollback_closes(self):
+        pool = PostgresPool(DB_CONN, pool_size=1, autocommit=False)
+        with self.assertRaises(ValueError):
+            with pool.connection() as conn:
+                conn.rollback.side_effect = psycopg.OperationalError('connection lost')
+                conn.close.side_effect = lambda: setattr(conn, 'closed', True)
+                raise ValueError('bad row')
+        conn.close.assert_called_once()
+        self.assertTrue(pool.pool_idle.empty())
+        with pool.connection() as _conn:
+            self.assertIsNot(_conn, conn)
+
+
+class NotifyTest(unittest.TestCase):
+
+    def test_notify_statement_quotes(self):
+        self.assertEqual(
+            PostgresConn.notify_statement("public.customer'); drop table customer; --", {'name': "O'Neil"})
+            .as_string(None),
+            """select pg_notify('public.customer''); drop table customer; --', '{"name": "O''Neil"}');"""
+        )
+
+    def test_notify(self):
+        with mock.patch('psycopg.connect') as connect:
+            PostgresConn(DB_CONN).notify('public.customer', {'rows': 3})
+        cur = connect.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value
+        self.assertEqual(
+            cur.execute.call_args[0][0].as_string(None), """select pg_notify('public.customer', '{"rows": 3}');"""
+        )
+
+
+class ListenTest(unittest.TestCase):
+
+    def listen(self, notifies: list, delay: float = 0.0, **kwargs) -> list:
+        async def _notifies():
+            # The `notifies` of psycopg 3.0 that does not have `timeout` and `stop_after`
+            for notify in notifies:
+                yield notify
+            await asyncio.sleep(delay)
+
+        conn = mock.MagicMock()
+        conn.execute = mock.AsyncMock()
+        conn.notifies = _notifies
+        conn.__aenter__ = mock.AsyncMock(return_value=conn)
+        conn.__aexit__ = mock.AsyncMock(return_value=False)
+
+        async def run():
+            return [_ async for _ in PostgresConn(DB_CONN).listen('public.customer', **kwargs)]
+
+        with mock.patch('psycopg.AsyncConnection.connect', mock.AsyncMock(return_value=conn)):
+            return asyncio.run(run())
+
+    def test_stop_after(self):
+        notifies = [psycopg.Notify('public.customer', '{"rows": %d}' % i, 42) for i in range(3)]
+        self.assertEqual(
+            self.listen(notifies, stop_after=2),
+            [{'channel': 'public.customer', 'payload': {'rows': i}, 'pid': 42} for i in range(2)]
+        )
+
+    def test_timeout(self):
+        notifies = [psycopg.Notify('public.customer', 'loaded', 42)]
+        self.assertEqual(self.listen(notifies, delay=60.0, timeout=0.1), [
+            {'channel': 'public.customer', 'payload': 'loaded', 'pid': 42}
+        ])
+
+
+class ConnectionHealthTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        PostgresConn.reset_health()
+        self.connect = mock.patch('psycopg.connect', side_effect=psycopg.OperationalError('password failed')).start()
+
+    def tearDown(self) -> None:
+        mock.patch.stopall()
+        PostgresConn.reset_health()
+
+    def test_circuit_opens_for_all_connects(self):
+        for _ in range(PostgresConn.HEALTH_FAILURES):
+            with self.assertRaisesRegex(psycopg.OperationalError, 'password failed'):
+                PostgresConn(DB_CONN).query('select 1')
+        self.assertFalse(PostgresConn(DB_CONN).connectable)
+        with self.assertRaisesRegex(psycopg.OperationalError, 'Circuit'):
+            TableObject(DB_CONN, 'public', 'customer')
+        with self.assertRaisesRegex(psycopg.OperationalError, 'Circuit'):
+            with PostgresPool(DB_CONN).connection():
+                pass
+        self.assertEqual(self.connect.call_count, PostgresConn.HEALTH_FAILURES)
+        self.assertEqual(self.connect.call_args[1]['connect_timeout'], PostgresConn.CONNECT_TIMEOUT)
+
+    def test_circuit_half_open_after_cooldown(self):
+        for _ in range(PostgresConn.HEALTH_FAILURES):
+            with self.assertRaises(psycopg.OperationalError):
+                PostgresConn(DB_CONN).connect()
+        self.connect.side_effect = None
+        with mock.patch.object(PostgresConn, 'HEALTH_COOLDOWN', 0.0):
+            PostgresConn(DB_CONN).connect()
+        self.assertEqual(PostgresConn(DB_CONN).health['failures'], 0)
+        self.assertTrue(PostgresConn(DB_CONN).connectable)
+
+    def test_health_key_with_password(self):
+        for _ in range(PostgresConn.HEALTH_FAILURES):
+            with self.assertRaises(psycopg.OperationalError):
+                PostgresConn(DB_CONN).connect()
+        self.connect.side_effect = None
+        _conn = PostgresConn({**DB_CONN, 'password': 'corrected'})
+        _conn.connect()
+        self.assertTrue(_conn.connectable)
+        self.assertNotIn('corrected', str(_conn.health_key))
+        self.assertNotEqual(_conn.health_key, PostgresConn(DB_CONN).health_key)
+
+    def test_connectable_caches(self):
+        self.connect.side_effect = None
+        self.assertTrue(PostgresConn(DB_CONN).connectable)
+        self.assertTrue(PostgresConn(dict(DB_CONN)).connectable)
+        self.assertEqual(self.connect.call_count, 1)
+        self.assertEqual(self.connect.call_args[1]['connect_timeout'], 1)
+
+
+class HideMetaTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        class _Hidden(TableObject, metaclass=HideMeta):
+            __excluded__ = {'delete_batches'}
+
+            def count(self):
+                return PostgresConn.query(self, 'select 1')
+
+        class _Child(_Hidden):
+            pass
+
+        self.hidden, self.child = _Hidden, _Child
+
+    def test_excluded_attributes_hide(self):
+        _obj = self.hidden.__new__(self.hidden)
+        for name in ('query', 'execute', 'delete_batches'):
+            with self.subTest(name=name):
+                self.assertFalse(hasattr(_obj, name))
+                self.assertNotIn(name, dir(_obj))
+        self.assertIn('copy_frame', dir(_obj))
+        self.assertEqual(self.hidden.__excluded__, frozenset({'query', 'execute', 'delete_batches'}))
+
+    def test_excluded_inherits(self):
+        _obj = self.child.__new__(self.child)
+        self.assertEqual(self.child.__excluded__, self.hidden.__excluded__)
+        with self.assertRaises(AttributeError):
+            _obj.query('select 1')
+
+    def test_parent_method_calls(self):
+        _obj = self.hidden.__new__(self.hidden)
+        with mock.patch.object(PostgresConn, 'query', return_value=[(1,)]) as query:
+            self.assertEqual(_obj.count(), [(1,)])
+        query.assert_called_once_with(_obj, 'select 1')
+
+
+class ColumnObjectTest(unittest.TestCase):
+    constraints: list = [
+        {'constraint_type': 'primary key', 'constraint_name': 'pk_customer'},
+        {'constraint_type': 'foreign key', 'constraint_name': 'fk_customer', 'foreign_table_name': 'public.segment',
+         'foreign_column_name': 'seg_id'},
+    ]
+
+    def test_slots(self):
+        column = ColumnObject('cust_id', 1, False, 'integer', None, self.constraints)
+        self.assertFalse(hasattr(column, '__dict__'))
+        with self.assertRaises(AttributeError):
+            column.col_comment = 'customer'
+        column.unique = True
+        self.assertTrue(column.unique)
+        self.assertEqual(
+            (column.col_primary_key, column.col_foreign_table_name, column.col_foreign_column_name),
+            (True, 'public.segment', 'seg_id')
+        )
+        self.assertEqual(column.constraint_names('foreign key'), ['fk_customer'])
+
+
+class _HookMeta(type):
+    """The `HideMeta` that hooks `__getattribute__` of class, before it hides attributes at class-definition time"""
+    def __new__(mcs, cls_name, cls_bases, cls_dict):
+        cls_dict.setdefault("__excluded__", [])
+        out_cls = super(_HookMeta, mcs).__new__(mcs, cls_name, cls_bases, cls_dict)
+
+        def __getattribute__(self, name):
+            if name in cls_dict["__excluded__"]:
+                raise AttributeError(name)
+            return super(out_cls, self).__getattribute__(name)
+
+        out_cls.__getattribute__ = __getattribute__
+        return out_cls
+
+
+class MetadataBenchmarkTest(unittest.TestCase):
+    """
+    Microbenchmark of metadata objects for catalog with thousands of columns, the attribute access
+    of table object with `HideMeta` before and after it hides attributes at class-definition time,
+    and the memory and attribute access of `ColumnObject` with and without `__slots__`.
+    usage:
+        >> python -m unittest -v tests.io_test.test_postgresql_plugin.MetadataBenchmarkTest
+    """
+    COLUMNS: int = 5000
+    constraints: list = [{'constraint_type': 'primary key', 'constraint_name': 'pk_customer'}]
+
+    @staticmethod
+    def timing(function: Callable[[], Any], number: int) -> float:
+        return min(timeit.repeat(function, number=number, repeat=5))
+
+    @staticmethod
+    def report(name: str, before: float, after: float, unit: str) -> None:
+        print(f"{name:>32}: {before:12,.4f} {unit} -> {after:12,.4f} {unit} ({before / after:5.1f}x)", file=sys.stderr)
+
+    def test_table_attribute_access(self):
+        class _HookedTable(TableObject, metaclass=_HookMeta):
+            __excluded__ = {'query', 'execute'}
+
+        class _HiddenTable(TableObject, metaclass=HideMeta):
+            __excluded__ = {'query', 'execute'}
+
+        hooked, hidden = table(_HookedTable), table(_HiddenTable)
+        with self.assertRaises(AttributeError):
+            hidden.query('select 1')
+        before: float = self.timing(lambda: [hooked.schema_name for _ in range(self.COLUMNS)], number=20)
+        after: float = self.timing(lambda: [hidden.schema_name for _ in range(self.COLUMNS)], number=20)
+        self.report(f'table attribute x {self.COLUMNS}', before, after, 'sec')
+        self.assertLess(after * 2, before)
+
+    def test_column_memory_and_access(self):
+        _dict_column = type('DictColumnObject', (), {
+            k: v for k, v in vars(ColumnObject).items()
+            if k not in {'__slots__', '__dict__', '__weakref__', *ColumnObject.__slots__}
+        })
+
+        def _columns(cls) -> Tuple[list, int]:
+            tracemalloc.start()
+            try:
+                columns: list = [
+                    cls(f'col_{_}', _, True, 'integer', None, self.constraints) for _ in range(self.COLUMNS)
+                ]
+                size, _ = tracemalloc.get_traced_memory()
+                return columns, size
+            finally:
+                tracemalloc.stop()
+
+        (dict_columns, before), (slot_columns, after) = _columns(_dict_column), _columns(ColumnObject)
+        self.report(f'{self.COLUMNS} columns memory', before / 1024, after / 1024, 'KiB')
+        self.report(
+            f'column attribute x {self.COLUMNS}',
+            self.timing(lambda: [_.col_unique for _ in dict_columns], number=20),
+            self.timing(lambda: [_.col_unique for _ in slot_columns], number=20),
+            'sec'
+        )
+        self.assertLess(after, before)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import time
+import tempfile
+import threading
+import unittest
+import pandas as pd
+from src.core.utils.threader import ThreadWithControl, maxThreads
+from src.core.io.dataframe.reader import StreamReader, expand_paths, read_csv_batches
+
+
+class StreamReaderTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        for year in (2021, 2022, 2010):
+            os.makedirs(path := os.path.join(self.tmp.name, str(year)), exist_ok=True)
+            pd.DataFrame({'year': [year] * 5, 'seq': range(5)}).to_csv(
+                os.path.join(path, f'customer_{year}.csv'), index=False
+            )
+        open(os.path.join(self.tmp.name, 'customer_empty.csv'), 'w').close()
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_expand_paths(self):
+        paths = expand_paths(os.path.join(self.tmp.name, '**', 'customer_*.csv'))
+        self.assertEqual(
+            [os.path.basename(_) for _ in paths], ['customer_2010.csv', 'customer_2021.csv', 'customer_2022.csv']
+        )
+
+    def test_stream_keeps_order(self):
+        def read_batches(path):
+            # The first file is the slowest, but its batches still come first
+            for batch in read_csv_batches(path, chunk_size=2):
+                time.sleep(0.05 if '2010' in path else 0)
+                yield batch
+
+        batches = list(StreamReader(read_batches, workers=3, queue_size=1).stream(
+            expand_paths(os.path.join(self.tmp.name, '**', '*.csv'))
+        ))
+        self.assertEqual(len(batches), 9)
+        df = pd.concat(batches, ignore_index=True)
+        self.assertEqual(df['year'].tolist(), [2010] * 5 + [2021] * 5 + [2022] * 5)
+        self.assertEqual(df['seq'].tolist(), list(range(5)) * 3)
+
+    def test_stream_raises_error(self):
+        def read_batches(path):
+            raise ValueError(path)
+            yield
+
+        with self.assertRaises(ValueError):
+            list(StreamReader(read_batches).stream(['a.csv']))
+
+    def test_stream_with_thread_consumer(self):
+        # The consumer starts `ThreadWithControl` for each batch, like `TableObject.copy_frame`,
+        # while producers of all files block on their full queues
+        def read_batches(path):
+            for seq in range(10):
+                yield pd.DataFrame({'path': [path], 'seq': [seq]})
+
+        def copy_frame(df):
+            _thread = ThreadWithControl(target=len, args=(df,))
+            _thread.daemon = True
+            _thread.start()
+            return _thread.join()
+
+        rows: list = []
+        consumer = threading.Thread(target=lambda: rows.extend(
+            copy_frame(df) for df in StreamReader(read_batches, workers=maxThreads, queue_size=1).stream(
+                [f'customer_{i}.csv' for i in range(maxThreads)]
+            )
+        ), daemon=True)
+        consumer.start()
+        consumer.join(timeout=10)
+        self.assertFalse(consumer.is_alive())
+        self.assertEqual(len(rows), maxThreads * 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+from src.core.io.dataframe.validation import CheckParser, FrameValidator
+
+
+def column(datatype='text', nullable=True, unique=False, primary_key=False, check=None, default=None):
+    return SimpleNamespace(
+        datatype=datatype, nullable=nullable, unique=unique, primary_key=primary_key, check=check, default=default
+    )
+
+
+class CheckParserTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.df = pd.DataFrame({'salary': [10, 0, None, 600], 'email': ['a@b.com', 'bad', None, 'c@d.com']})
+
+    def tearDown(self) -> None:
+        pass
+
+    def test_compare_and_null(self):
+        values, nulls = CheckParser("salary > 0").compile()(self.df)
+        self.assertEqual(list(values), [True, False, False, True])
+        self.assertEqual(list(nulls), [False, False, True, False])
+
+    def test_three_valued_logic(self):
+        values, nulls = CheckParser("salary between 1 and 500 or email like '%@%.com'").compile()(self.df)
+        self.assertEqual(list(values), [True, False, False, True])
+        self.assertEqual(list(nulls), [False, False, True, False])
+
+    def test_unsupported(self):
+        with self.assertRaises(ValueError):
+            CheckParser("length(email) > 3").compile()
+
+    def test_in_column_items(self):
+        df = pd.DataFrame({'a': [1, 2, 3, 4, None], 'b': [1, 5, 3, None, 2]})
+        values, nulls = CheckParser("a in (b, 9)").compile()(df)
+        self.assertEqual(list(values), [True, False, True, False, False])
+        self.assertEqual(list(nulls), [False, False, False, True, True])
+        values, nulls = CheckParser("a not in (b, 2)").compile()(df)
+        self.assertEqual(list(values), [False, False, False, False, False])
+        self.assertEqual(list(nulls), [False, False, False, True, True])
+        values, _ = CheckParser("a in (4, 2)").compile()(df)
+        self.assertEqual(list(values), [False, True, False, True, False])
+
+
+class FrameValidatorTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.validator = FrameValidator({
+            'id': column('integer', nullable=False, primary_key=True),
+            'email': column('varchar( 10 )', unique=True, check="email like '%@%.com'"),
+            'salary': column('numeric( 5, 2 )', check='salary > 0'),
+        })
+
+    def tearDown(self) -> None:
+        pass
+
+    def test_split(self):
+        df = pd.DataFrame({
+            'id': [1, 2, 2, None, 5],
+            'email': ['a@b.com', 'bad', 'c@d.com', 'a@b.com', 'long_name@mail.com'],
+            'salary': [10.0, 0.0, None, 20.0, 1000.0],
+        })
+        good, rejected = self.validator.split(df)
+        self.assertEqual(list(good.index), [0])
+        self.assertEqual(list(rejected.index), [1, 2, 3, 4])
+        reasons = rejected[FrameValidator.REJECT_COLUMN].to_dict()
+        self.assertIn('email:check', reasons[1])
+        self.assertIn('salary:check', reasons[1])
+        self.assertIn('id:primary_key', reasons[2])
+        self.assertIn('id:not_null', reasons[3])
+        self.assertIn('email:unique', reasons[3])
+        self.assertIn('email:datatype', reasons[4])
+        self.assertIn('salary:datatype', reasons[4])
+
+    def test_split_without_rejected(self):
+        df = pd.DataFrame({'id': np.arange(3), 'email': ['a@b.com', 'b@b.com', None], 'salary': [1.0, 2.0, 3.0]})
+        good, rejected = self.validator.split(df)
+        self.assertEqual(len(good), 3)
+        self.assertTrue(rejected.empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from src.core.io.dataframe.compression import CompressedWriter, seek_table
+from src.core.io.dataframe.reader import read_csv_batches
+from src.core.io.dataframe.writer import PartitionedWriter
+
+
+class PartitionedWriterTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.df = pd.DataFrame({
+            'customer_id': [f'C{i}' for i in range(100)],
+            'customer_phone': list(range(800, 900)),
+            'year': [2021 + i % 2 for i in range(100)],
+        })
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _read(self, paths) -> pd.DataFrame:
+        return pd.concat([df for path in paths for df in read_csv_batches(path)], ignore_index=True)
+
+    def _files(self) -> list:
+        return sorted(
+            os.path.join(root, name) for root, _, names in os.walk(self.tmp.name) for name in names
+        )
+
+    def test_partition(self):
+        with PartitionedWriter(self.tmp.name, partition_by=['year']) as writer:
+            for i in range(0, 100, 10):
+                writer.write(self.df.iloc[i:i + 10])
+        self.assertEqual(writer.rows, 100)
+        self.assertEqual([os.path.relpath(_, self.tmp.name) for _ in writer.paths], [
+            os.path.join('year=2021', 'part-00000.csv.zst'), os.path.join('year=2022', 'part-00000.csv.zst')
+        ])
+        df = self._read(writer.paths[:1])
+        self.assertEqual(list(df.columns), ['customer_id', 'customer_phone'])
+        self.assertEqual(df['customer_id'].tolist(), self.df.query('year == 2021')['customer_id'].tolist())
+
+    def test_roll(self):
+        with PartitionedWriter(
+                self.tmp.name, partition_by=['year'], compression='gzip', target_size=100, buffer_size=64
+        ) as writer:
+            for i in range(0, 100, 10):
+                writer.write(self.df.iloc[i:i + 10])
+        self.assertGreater(len(writer.paths), 2)
+        self.assertEqual(self._files(), sorted(writer.paths))
+        pd.testing.assert_frame_equal(
+            self._read([_ for _ in writer.paths if 'year=2022' in _]),
+            self.df.query('year == 2022').drop(columns='year').reset_index(drop=True)
+        )
+
+    def test_abort(self):
+        with PartitionedWriter(self.tmp.name, partition_by=['year']) as writer:
+            writer.write(self.df)
+        paths = writer.paths
+        with self.assertRaises(RuntimeError):
+            with PartitionedWriter(self.tmp.name, partition_by=['year'], buffer_size=1) as writer:
+                writer.write(self.df.iloc[:10].assign(year=2023))
+                raise RuntimeError('pipeline fails')
+        self.assertEqual(self._files(), paths)
+
+    def test_overwrite_partition(self):
+        with PartitionedWriter(self.tmp.name, partition_by=['year'], compression=None, buffer_size=1, target_size=1) \
+                as writer:
+            for i in range(0, 100, 10):
+                writer.write(self.df.iloc[i:i + 10])
+        with PartitionedWriter(self.tmp.name, partition_by=['year'], compression=None) as writer:
+            writer.write(self.df.query('year == 2022'))
+        files = self._files()
+        self.assertIn(os.path.join(self.tmp.name, 'year=2022', 'part-00000.csv'), files)
+        self.assertEqual(len([_ for _ in files if 'year=2022' in _]), 1)
+        self.assertEqual(len([_ for _ in files if 'year=2021' in _]), 10)
+
+    def test_compressed_writer(self):
+        path = os.path.join(self.tmp.name, 'customer.csv.zst')
+        with CompressedWriter(path) as writer:
+            writer.write(b'a,b\n')
+            writer.write(b'1,2\n')
+        self.assertEqual(len(seek_table(path)), 2)
+        self.assertEqual(self._files(), [path])
+
+
+if __name__ == '__main__':
+    unittest.main()
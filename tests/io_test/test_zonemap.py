@@ -0,0 +1,78 @@
+import os
+import time
+import tempfile
+import unittest
+import pandas as pd
+from src.core.io.dataframe.writer import PartitionedWriter
+from src.core.io.dataframe.zonemap import ZoneMap, column_statistics, filter_frame, merge_statistics
+
+
+class ZoneMapTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'events.csv')
+        self.df = pd.DataFrame({
+            'ts': pd.array(range(100), dtype='Int64'),
+            'name': [f'n{i % 7}' for i in range(100)],
+            'amount': [None if i % 10 == 0 else float(i) for i in range(100)],
+        })
+        self.df.to_csv(self.path, index=False)
+        self.zone_map = ZoneMap(os.path.join(self.tmp.name, ZoneMap.FILE_NAME))
+        self.chunks = ZoneMap.chunks(self.df.iloc[i:i + 25] for i in range(0, 100, 25))
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_column_statistics(self):
+        statistics = column_statistics(self.df.iloc[:10])
+        self.assertEqual(statistics['ts'], {'nulls': 0, 'min': 0, 'max': 9})
+        self.assertEqual(statistics['name'], {'nulls': 0, 'min': 'n0', 'max': 'n6'})
+        self.assertEqual(statistics['amount'], {'nulls': 1, 'min': 1.0, 'max': 9.0})
+        self.assertEqual(column_statistics(pd.DataFrame({'dt': pd.to_datetime(['2022-01-01'])}))['dt'], {'nulls': 0})
+
+    def test_merge_statistics(self):
+        statistics = merge_statistics(self.chunks)
+        self.assertEqual(statistics['ts'], {'nulls': 0, 'min': 0, 'max': 99})
+        self.assertEqual(statistics['amount']['nulls'], 10)
+        chunks = [
+            {'rows': 1, 'columns': {'dt': {'nulls': 0}}},
+            {'rows': 1, 'columns': {'dt': {'nulls': 0, 'min': 1, 'max': 1}}},
+        ]
+        self.assertEqual(merge_statistics(chunks)['dt'], {'nulls': 0})
+
+    def test_prune(self):
+        self.zone_map.commit(self.path, self.chunks, schema_hash='v1')
+        zone_map = ZoneMap(self.zone_map.zone_map_path)
+        self.assertIsNone(zone_map.prune(self.path, [('ts', '>=', 0)], 'v1'))
+        self.assertEqual(zone_map.prune(self.path, [('ts', '>=', 100)], 'v1'), [])
+        self.assertEqual([_['start'] for _ in zone_map.prune(self.path, [('ts', 'in', {3, 80})], 'v1')], [0, 75])
+        self.assertEqual([_['start'] for _ in zone_map.prune(self.path, [('ts', '>', 60)], 'v1')], [50, 75])
+        self.assertIsNone(zone_map.prune(self.path, [('ts', '>=', 100)], 'v2'))
+        self.assertIsNone(zone_map.prune(self.path, [('ts', '=', 'x')], 'v1'))
+
+    def test_stale(self):
+        self.zone_map.commit(self.path, self.chunks)
+        time.sleep(0.01)
+        self.df.iloc[:10].to_csv(self.path, index=False)
+        self.assertIsNone(self.zone_map.get(self.path))
+        self.assertIsNone(self.zone_map.prune(self.path, [('ts', '>=', 100)]))
+
+    def test_filter_frame(self):
+        df = filter_frame(self.df, [('ts', '<', 30), ('name', 'in', {'n1', 'n2'}), ('unknown', '=', 1)])
+        self.assertEqual(df['ts'].tolist(), [1, 2, 8, 9, 15, 16, 22, 23, 29])
+        self.assertEqual(len(filter_frame(self.df, [('amount', '!=', 1.0)])), 89)
+        self.assertEqual(len(filter_frame(self.df, [('ts', '<', 'x')])), 100)
+
+    def test_writer_zones(self):
+        with PartitionedWriter(self.tmp.name, partition_by=['name'], buffer_size=1) as writer:
+            for i in range(0, 100, 20):
+                writer.write(self.df.iloc[i:i + 20])
+        zones = writer.zones[os.path.join(self.tmp.name, 'name=n0', 'part-00000.csv.zst')]
+        self.assertEqual([(_['start'], _['rows']) for _ in zones], [(0, 3), (3, 3), (6, 3), (9, 3), (12, 3)])
+        self.assertEqual(zones[0]['columns']['ts'], {'nulls': 0, 'min': 0, 'max': 14})
+        self.assertNotIn('name', zones[0]['columns'])
+
+
+if __name__ == '__main__':
+    unittest.main()
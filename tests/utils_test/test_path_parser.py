@@ -0,0 +1,78 @@
+import os
+import json
+import pickle
+import glob
+import time
+import tempfile
+import unittest
+from src.core.utils.path_parser import DirectoryCrawler
+
+
+class DirectoryCrawlerTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        for sub_path in (
+                'customer/cutomer_2021.csv', 'customer/cutomer_2022.csv', 'customer/.cutomer_2023.csv',
+                'sales/region=th/sales_2022_01.csv', 'sales/region=sg/sales_2022_02.csv',
+                'sales/.hidden/sales_2022_03.csv', 'sales/empty.csv'
+        ):
+            os.makedirs(os.path.dirname(path := os.path.join(self.tmp.name, sub_path)), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write('' if sub_path.endswith('empty.csv') else 'C1,Ann\n')
+        self._age()
+        self.cache_path = os.path.join(self.tmp.name, 'listing.json')
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _age(self) -> None:
+        """Set modified time of directories to past, so listings are not racy and cache"""
+        _time: float = time.time() - 60
+        for root, _, _ in os.walk(self.tmp.name):
+            os.utime(root, (_time, _time))
+
+    def _pattern(self, pattern: str) -> str:
+        return os.path.join(self.tmp.name, pattern)
+
+    def test_glob_matches_glob_module(self):
+        crawler = DirectoryCrawler()
+        for pattern in ('**/*.csv', 'customer/cutomer_*.csv', 'sales/region=[st]?/*', 'sales/**', '*/.*'):
+            self.assertEqual(
+                crawler.glob(self._pattern(pattern)),
+                sorted(path for path in glob.glob(self._pattern(pattern), recursive=True) if os.path.isfile(path)),
+                pattern
+            )
+
+    def test_non_empty(self):
+        crawler = DirectoryCrawler()
+        self.assertEqual(len(crawler.glob(self._pattern('sales/*.csv'))), 1)
+        self.assertEqual(crawler.glob(self._pattern('sales/*.csv'), non_empty=True), [])
+        with open(self._pattern('sales/empty.csv'), 'w') as f:
+            f.write('C1,Ann\n')
+        self.assertEqual(len(crawler.glob(self._pattern('sales/*.csv'), non_empty=True)), 1)
+
+    def test_listing_cache(self):
+        DirectoryCrawler(cache_path=self.cache_path).glob(self._pattern('**/*.csv'))
+        crawler = DirectoryCrawler(cache_path=self.cache_path)
+        self.assertIn(self._pattern('customer'), crawler.listings)
+        self.assertEqual(len(crawler.glob(self._pattern('customer/*.csv'))), 2)
+        with open(self._pattern('customer/cutomer_2024.csv'), 'w') as f:
+            f.write('C1,Ann\n')
+        self.assertEqual(len(crawler.glob(self._pattern('customer/*.csv'))), 3)
+        os.remove(self._pattern('customer/cutomer_2021.csv'))
+        self.assertEqual(len(crawler.glob(self._pattern('customer/*.csv'))), 2)
+
+    def test_listing_cache_json(self):
+        paths: list = DirectoryCrawler(cache_path=self.cache_path).glob(self._pattern('**/*.csv'))
+        with open(self.cache_path) as f:
+            cache: dict = json.load(f)
+        self.assertEqual(cache['listings'][self._pattern('customer')]['dirs'], [])
+        self.assertEqual(DirectoryCrawler(cache_path=self.cache_path).glob(self._pattern('**/*.csv')), paths)
+
+    def test_listing_cache_pickle(self):
+        with open(self.cache_path, 'wb') as f:
+            pickle.dump(({self._pattern('customer'): {'mtime_ns': 0, 'files': {}, 'dirs': []}}, {}), f)
+        crawler = DirectoryCrawler(cache_path=self.cache_path)
+        self.assertEqual((crawler.listings, crawler.globs), ({}, {}))
+        self.assertEqual(len(crawler.glob(self._pattern('customer/*.csv'))), 2)
@@ -0,0 +1,45 @@
+import threading
+import time
+import unittest
+
+from src.core.utils.threader import prefetch
+
+
+class PrefetchTest(unittest.TestCase):
+
+    def test_order(self):
+        def _slow(item: int) -> int:
+            time.sleep(0.01 * (5 - item))
+            return item * 2
+
+        self.assertEqual(list(prefetch(_slow, range(5), workers=3)), [0, 2, 4, 6, 8])
+
+    def test_bounded(self):
+        lock = threading.Lock()
+        started: list = []
+
+        def _record(item: int) -> int:
+            with lock:
+                started.append(item)
+            return item
+
+        results = prefetch(_record, range(100), workers=2)
+        self.assertEqual(next(results), 0)
+        time.sleep(0.05)
+        self.assertLessEqual(len(started), 3)
+        self.assertEqual(list(results), list(range(1, 100)))
+
+    def test_error(self):
+        def _fail(item: int) -> int:
+            if item == 2:
+                raise ValueError('bad frame')
+            return item
+
+        results = prefetch(_fail, range(5), workers=2)
+        self.assertEqual([next(results), next(results)], [0, 1])
+        with self.assertRaisesRegex(ValueError, 'bad frame'):
+            next(results)
+
+
+if __name__ == '__main__':
+    unittest.main()